@@ -0,0 +1,43 @@
+# benchmarks/bench_fetch.py
+"""
+Débit de fetch_history_reverse (bougies / seconde) contre le serveur Deriv local :
+écriture SQLite dans la boucle réseau (avant) contre thread writer en pipeline (après).
+La mesure est celle de la suite (benchmarks.suite.bench_fetch).
+Lancement : python -m benchmarks.bench_fetch [jours] [latence_ms]
+"""
+import sys
+import tempfile
+
+from benchmarks.suite import bench_fetch
+
+
+class InlineWriter:
+    """Ancien comportement : save_to_db (connexion + commit) à chaque batch, dans la boucle réseau."""
+
+    def __init__(self, fetcher):
+        self.put = fetcher.save_to_db
+
+    def flush(self):
+        pass
+
+    def pop_error(self):
+        return None
+
+    def close(self):
+        pass
+
+
+def main(days=60, latency_ms=5):
+    results = {}
+    print(f"--- fetch_history_reverse : {days} jours en 1 minute, latence serveur {latency_ms} ms ---")
+    for name, writer in (("avant (inline)", InlineWriter), ("après (pipeline)", None)):
+        with tempfile.TemporaryDirectory() as tmp:
+            run = bench_fetch(days, latency_ms, tmp, writer=writer)
+        results[name] = run['candles_per_s']
+        print(f"{name:18s} {run['candles']} bougies en {run['fetch_s']:6.2f} s  ->  {run['candles_per_s']:10.0f} bougies/s")
+    return results
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
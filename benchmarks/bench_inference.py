@@ -0,0 +1,67 @@
+# benchmarks/bench_inference.py
+"""
+Latence d'inférence pour tous les actifs de config.ASSETS :
+un model.predict par symbole (avant) contre un batch unique via ScoringService (après).
+Lancement : python -m benchmarks.bench_inference [répétitions]
+"""
+import os
+import sys
+import tempfile
+import time
+import joblib
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+
+from config import ASSETS
+from src.ml_logic import build_model, load_artifacts
+from src.model_registry import ModelRegistry
+from src.scoring import ScoringService
+
+
+def make_model(directory, look_back=10):
+    model_path = os.path.join(directory, "model.h5")
+    scaler_path = os.path.join(directory, "scaler.pkl")
+    build_model((look_back, 6)).save(model_path)
+    joblib.dump(MinMaxScaler().fit(np.random.default_rng(0).random((100, 6))), scaler_path)
+    return model_path, scaler_path
+
+
+def timed(func, repeats):
+    func()  # préchauffage (traçage, allocation)
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    return np.median(samples) * 1000, np.percentile(samples, 99) * 1000
+
+
+def main(repeats=30):
+    symbols = [s for group in ASSETS.values() for s in group]
+    rng = np.random.default_rng(1)
+    windows = {(s, 60): rng.random((10, 6)) for s in symbols}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_model(tmp)
+        registry = ModelRegistry(load_artifacts)
+        model, scaler = registry.get(*paths)
+        service = ScoringService(registry, lambda symbol, tf: paths)
+
+        def legacy():
+            for data in windows.values():
+                model.predict(scaler.transform(data).reshape(1, 10, 6), verbose=0)
+
+        def batched():
+            service.score(windows)
+
+        print(f"--- Inférence : {len(symbols)} symboles, {repeats} répétitions ---")
+        results = {}
+        for name, func in (("avant (predict x N)", legacy), ("après (batch)", batched)):
+            p50, p99 = timed(func, repeats)
+            results[name] = (p50, p99)
+            print(f"{name:20s} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
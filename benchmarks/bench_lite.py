@@ -0,0 +1,79 @@
+# benchmarks/bench_lite.py
+"""
+Prédiction live : modèle Keras (.h5 + scaler.pkl, predict_next) contre l'artefact
+léger (.npz rejoué en NumPy, predict_live).
+- Démarrage à froid : nouveau processus, imports + chargement + 1re prédiction.
+- Latence à chaud : une fenêtre (1, look_back, 6), médiane et p99.
+Lancement : python -m benchmarks.bench_lite [répétitions]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from src.lite_model import LiteModel, export_artifacts
+from src.ml_logic import FEATURE_COLS, build_model, predict_next
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLD = {
+    "avant (Keras)": "from src.ml_logic import predict_next; r = predict_next(w, {model!r}, {scaler!r})",
+    "après (léger)": "from src.lite_model import LiteModel; r = LiteModel.load({lite!r}).predict(w)",
+}
+
+
+def cold_start(statement, **paths):
+    code = ("import time; t0 = time.perf_counter(); import numpy as np; import pandas as pd; "
+            "w = pd.DataFrame(np.random.default_rng(0).random((10, 6)), columns={cols!r}); "
+            + statement + "; print(time.perf_counter() - t0)").format(**paths)
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=ROOT, env={**os.environ, "TF_CPP_MIN_LOG_LEVEL": "3"})
+    return time.perf_counter() - t0, float(out.stdout.split()[-1])
+
+
+def timed(func, repeats):
+    func()
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    return np.median(samples) * 1000, np.percentile(samples, 99) * 1000
+
+
+def main(repeats=200):
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path, scaler_path = os.path.join(tmp, "model.h5"), os.path.join(tmp, "scaler.pkl")
+        build_model((10, 6)).save(model_path)
+        joblib.dump(MinMaxScaler().fit(np.random.default_rng(0).random((100, 6))), scaler_path)
+        lite = export_artifacts(model_path, scaler_path)
+
+        print("--- Démarrage à froid (processus neuf, imports + chargement + 1re prédiction) ---")
+        results = {}
+        for name, statement in COLD.items():
+            total, in_process = cold_start(statement, model=model_path, scaler=scaler_path, lite=lite,
+                                           cols=FEATURE_COLS)
+            results[name] = {"cold_total_s": total, "cold_in_process_s": in_process}
+            print(f"{name:16s} processus {total:6.2f} s   dont imports+prédiction {in_process:6.2f} s")
+
+        window = pd.DataFrame(np.random.default_rng(1).random((10, 6)), columns=FEATURE_COLS)
+        model = LiteModel.load(lite)
+        print(f"--- Latence à chaud : 1 fenêtre, {repeats} répétitions ---")
+        assert predict_next(window, model_path, scaler_path)[0] == model.predict(window)[0]
+        for name, func in (("avant (Keras)", lambda: predict_next(window, model_path, scaler_path)),
+                           ("après (léger)", lambda: model.predict(window))):
+            p50, p99 = timed(func, repeats)
+            results[name].update({"p50_ms": p50, "p99_ms": p99})
+            print(f"{name:16s} p50 {p50:7.3f} ms   p99 {p99:7.3f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    main(*args)
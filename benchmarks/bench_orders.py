@@ -0,0 +1,77 @@
+# benchmarks/bench_orders.py
+"""
+Aller-retour d'un ordre contre le serveur Deriv local (latence simulée par réponse) :
+connexion + authorize + buy à chaque ordre (avant) contre la session persistante
+de TradeExecutor, ordres un par un puis tous en parallèle (après).
+Le serveur local est en ws:// : le handshake TLS du vrai serveur n'est pas compté.
+Lancement : python -m benchmarks.bench_orders [ordres] [latence_ms]
+"""
+import asyncio
+import json
+import sys
+import time
+import numpy as np
+import websockets
+
+from src.executor import TradeExecutor
+from src.fake_deriv import FakeDerivServer
+
+
+def order(i):
+    return {"symbol": "R_100", "contract_type": "CALL" if i % 2 else "PUT",
+            "amount": 1, "duration": 1, "duration_unit": "m"}
+
+
+async def legacy_order(url, o):
+    """Ancien send_order : nouvelle connexion, authorize puis buy, à chaque ordre."""
+    async with websockets.connect(url) as ws:
+        await ws.send(json.dumps({"authorize": "token"}))
+        await ws.recv()
+        await ws.send(json.dumps({"buy": 1, "price": o["amount"], "parameters": {
+            "amount": o["amount"], "basis": "stake", "contract_type": o["contract_type"], "currency": "USD",
+            "duration": o["duration"], "duration_unit": o["duration_unit"], "symbol": o["symbol"]}}))
+        return json.loads(await ws.recv())
+
+
+async def timed_sequential(send, n):
+    samples = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        t = time.perf_counter()
+        await send(order(i))
+        samples.append(time.perf_counter() - t)
+    return time.perf_counter() - t0, samples
+
+
+async def run(n, latency):
+    async with FakeDerivServer(latency=latency, concurrent=True, contract_time_scale=1000) as server:
+        results = {}
+        results["avant (connexion/ordre)"] = await timed_sequential(lambda o: legacy_order(server.url, o), n)
+
+        executor = TradeExecutor("token", url=server.url)
+        await executor.connect()
+        results["après (session)"] = await timed_sequential(lambda o: executor.send_order(**o), n)
+
+        t0 = time.perf_counter()
+        orders = await executor.send_orders([order(i) for i in range(n)])
+        total = time.perf_counter() - t0
+        results["après (parallèle)"] = (total, [r["latency_ms"] / 1000 for r in orders])
+        await executor.close()
+        return results, server.connections
+
+
+def main(n=50, latency_ms=20):
+    print(f"--- Ordres : {n} ordres, latence simulée {latency_ms} ms par réponse ---")
+    results, connections = asyncio.run(run(n, latency_ms / 1000))
+    report = {}
+    for name, (total, samples) in results.items():
+        p50, p99 = np.median(samples) * 1000, np.percentile(samples, 99) * 1000
+        report[name] = {"total_s": total, "p50_ms": p50, "p99_ms": p99}
+        print(f"{name:24s} total {total:6.2f} s   aller-retour p50 {p50:7.1f} ms   p99 {p99:7.1f} ms")
+    print(f"Connexions ouvertes : {connections} (dont 1 pour la session)")
+    return report
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
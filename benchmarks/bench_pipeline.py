@@ -0,0 +1,71 @@
+# benchmarks/bench_pipeline.py
+"""
+Pic mémoire (tracemalloc) d'une passe de données d'entraînement :
+historique complet en pandas + fenêtres (train_gru_model) contre le flux tf.data
+par paquets (CandleStream). Le modèle n'est pas entraîné : on mesure l'alimentation.
+Lancement : python -m benchmarks.bench_pipeline [n_bougies] [chunk_rows]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+
+from src.data_fetcher import DataFetcher
+from src.indicators import add_indicators
+from src.ml_logic import WindowDataset, make_windows, prepare_data
+from src.pipeline import CandleStream
+
+
+def in_memory(fetcher, chunk_rows):
+    X_raw, y_raw = prepare_data(add_indicators(fetcher.load_data("R_100", 60)))
+    X_scaled = MinMaxScaler().fit_transform(X_raw).astype(np.float32)
+    dataset = WindowDataset(*make_windows(X_scaled, y_raw, 10), batch_size=64)
+    for i in range(len(dataset)):
+        dataset[i]
+    return len(dataset)
+
+
+def streaming(fetcher, chunk_rows):
+    stream = CandleStream(fetcher.db, "R_100", 60, chunk_rows)
+    scaler = stream.fit_scaler()
+    # Itération dans le graphe, comme pendant model.fit
+    return int(stream.dataset(scaler, 10, 64).reduce(0, lambda n, _: n + 1))
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    batches = func(*args)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, batches
+
+
+def main(n_rows=1_000_000, chunk_rows=100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        fetcher = DataFetcher(db_path=os.path.join(tmp, "bench.db"))
+        close = 1000 + np.cumsum(np.random.default_rng(0).normal(0, 1, n_rows))
+        fetcher.bulk_ingest(("R_100", 60, i * 60, c, c + 0.5, c - 0.5, c) for i, c in enumerate(close))
+
+        print(f"--- Une passe d'entraînement : {n_rows} bougies, paquets de {chunk_rows} ---")
+        results = {}
+        for name, func in (("avant (pandas)", in_memory), ("après (tf.data)", streaming)):
+            elapsed, peak, batches = measure(func, fetcher, chunk_rows)
+            results[name] = (elapsed, peak)
+            # Le cache mémoire du DataFetcher ne doit pas fausser la mesure suivante
+            fetcher.store.invalidate("R_100", 60)
+            print(f"{name:16s} {elapsed:8.2f} s   pic mémoire {peak / 1e6:9.1f} Mo   {batches} batches")
+        fetcher.db.close_all()
+
+    (_, m_old), (_, m_new) = results.values()
+    print(f"Pic mémoire divisé par {m_old / max(m_new, 1):.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
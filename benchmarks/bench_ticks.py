@@ -0,0 +1,45 @@
+# benchmarks/bench_ticks.py
+"""
+Latence tick -> signal à travers le TickHub, contre le serveur de ticks local.
+Chaque tick met à jour les indicateurs incrémentaux du symbole (peek) : la latence
+mesurée va de l'envoi par le serveur au signal calculé.
+Lancement : python -m benchmarks.bench_ticks [secondes] [intervalle_ms]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from config import ASSETS
+from src.fake_deriv import FakeDerivServer
+from src.indicators import StreamingIndicators
+from src.tick_hub import TickHub
+
+
+def main(duration=5, interval_ms=10):
+    symbols = [s for group in ASSETS.values() for s in group]
+    seed = pd.DataFrame({'epoch': np.arange(200), 'open': 100.0, 'high': 101.0, 'low': 99.0,
+                         'close': 100 + np.sin(np.arange(200) / 5)})
+    engines = {s: StreamingIndicators().seed(seed) for s in symbols}
+    latencies = []
+
+    def on_tick(symbol, epoch, quote, tick):
+        engines[symbol].peek(epoch, quote, quote, quote, quote)
+        latencies.append(time.perf_counter() - tick['ts'])
+
+    with FakeDerivServer(tick_interval=interval_ms / 1000) as server:
+        hub = TickHub(url=server.url)
+        hub.add_listener(on_tick)
+        hub.subscribe(symbols).start()
+        time.sleep(duration)
+        hub.stop()
+
+    lat = np.array(latencies) * 1000
+    print(f"--- Tick -> signal : {len(symbols)} symboles, 1 tick / {interval_ms} ms / symbole, {duration} s ---")
+    print(f"{len(lat)} ticks sur {hub.connections} connexion(s)   "
+          f"p50 {np.percentile(lat, 50):6.2f} ms   p99 {np.percentile(lat, 99):6.2f} ms   max {lat.max():6.2f} ms")
+    return {"ticks": len(lat), "p50_ms": float(np.percentile(lat, 50)), "p99_ms": float(np.percentile(lat, 99))}
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:3]])
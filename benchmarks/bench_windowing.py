@@ -0,0 +1,69 @@
+# benchmarks/bench_windowing.py
+"""
+Compare la construction des fenêtres d'entraînement : boucle Python + np.array
+(ancienne version) contre la vue strided de make_windows. Les deux variantes
+parcourent ensuite une époque complète de batches mélangés (WindowDataset).
+Lancement : python -m benchmarks.bench_windowing [n_lignes] [look_back]
+"""
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from src.ml_logic import make_windows
+
+
+def draw_batches(X, batch_size=64, seed=0):
+    """Une époque comme WindowDataset : ordre mélangé, chaque batch copié par indexation."""
+    order = np.random.default_rng(seed).permutation(len(X))
+    for start in range(0, len(X), batch_size):
+        X[order[start:start + batch_size]]
+
+
+def legacy_windows(X_scaled, y_raw, look_back, batch_size=64):
+    X, y = [], []
+    for i in range(look_back, len(X_scaled)):
+        X.append(X_scaled[i-look_back:i])
+        y.append(y_raw[i])
+    X, y = np.array(X), np.array(y)
+    draw_batches(X, batch_size)
+    return X, y
+
+
+def strided_windows(X_scaled, y_raw, look_back, batch_size=64):
+    X, y = make_windows(X_scaled, y_raw, look_back)
+    # Seul le batch courant est matérialisé, comme pendant fit()
+    draw_batches(X, batch_size)
+    return X, y
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    X, _ = func(*args)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, X.shape
+
+
+def main(n_rows=500_000, look_back=10):
+    rng = np.random.default_rng(0)
+    X_scaled = rng.random((n_rows, 6), dtype=np.float32)
+    y_raw = rng.integers(0, 3, n_rows).astype(np.int8)
+
+    print(f"--- Fenêtrage : {n_rows} lignes, look_back={look_back} ---")
+    results = {}
+    for name, func in (("avant (boucle)", legacy_windows), ("après (vue)", strided_windows)):
+        elapsed, peak, shape = measure(func, X_scaled, y_raw, look_back)
+        results[name] = (elapsed, peak)
+        print(f"{name:16s} {elapsed:8.3f} s   pic mémoire {peak / 1e6:9.1f} Mo   forme {shape}")
+
+    (t_old, m_old), (t_new, m_new) = results.values()
+    print(f"Gain : x{t_old / max(t_new, 1e-9):.0f} en temps, x{m_old / max(m_new, 1):.0f} en mémoire")
+    return results
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,269 @@
+# benchmarks/suite.py
+"""
+Suite de benchmarks hors-ligne (aucun accès à Deriv) sur données synthétiques déterministes :
+add_indicators, save_to_db / load_data, prepare_data + fenêtrage, predict_next / predict_live,
+fetch_history_reverse (serveur Deriv local) et agrégation de ticks à la seconde.
+Les résultats sont écrits en JSON pour comparer deux commits :
+
+    python -m benchmarks.suite --out bench.json
+    python -m benchmarks.suite --quick --out new.json --compare bench.json
+
+Convention des métriques : suffixe _s / _ms = durée (plus bas = mieux),
+suffixe _per_s = débit (plus haut = mieux) ; les autres clés sont informatives.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SYMBOL = "R_100"
+
+
+def best_of(func, repeats=3):
+    """Meilleur temps (secondes) de `repeats` exécutions, et le résultat de la dernière."""
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def latencies(func, repeats):
+    """p50 / p99 (ms) d'appels unitaires, après un appel de chauffe."""
+    func()
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    return float(np.median(samples) * 1000), float(np.percentile(samples, 99) * 1000)
+
+
+# --- Benchmarks ---
+def bench_indicators(frame):
+    from src.indicators import add_indicators
+    seconds, _ = best_of(lambda: add_indicators(frame))
+    return {'rows': len(frame), 'add_indicators_s': seconds, 'rows_per_s': len(frame) / seconds}
+
+
+def bench_storage(columns, tmp):
+    from src.data_fetcher import DataFetcher
+    from src.synthetic import candle_rows
+    n = len(columns['epoch'])
+    fetcher = DataFetcher(db_path=os.path.join(tmp, "storage.db"))
+    # save_to_db : lots de 5000 bougies (taille d'une réponse ticks_history), base 60 s + bougies dérivées
+    rows = list(candle_rows(SYMBOL, 60, columns))
+    t0 = time.perf_counter()
+    for lo in range(0, n, 5000):
+        fetcher.save_to_db(rows[lo:lo + 5000])
+    save_s = time.perf_counter() - t0
+    del rows
+
+    fetcher.store.invalidate()
+    t0 = time.perf_counter()
+    cold = fetcher.load_data(SYMBOL, 60)
+    cold_s = time.perf_counter() - t0
+    start, end = (datetime.fromtimestamp(int(cold['epoch'].iloc[i])) for i in (n // 2, n // 2 + 1440))
+    window_p50, window_p99 = latencies(lambda: fetcher.load_data(SYMBOL, 60, start, end), 50)
+    fetcher.columnar.sync(SYMBOL, 60)
+    columnar_s, _ = best_of(lambda: fetcher.load_data(SYMBOL, 60, columnar=True))
+    fetcher.writer.close()
+    return {
+        'rows': n, 'save_to_db_s': save_s, 'save_rows_per_s': n / save_s,
+        'load_data_cold_s': cold_s, 'load_data_day_p50_ms': window_p50, 'load_data_day_p99_ms': window_p99,
+        'load_data_columnar_s': columnar_s,
+    }
+
+
+def bench_prepare(frame, look_back=10, batch_size=1024):
+    from sklearn.preprocessing import MinMaxScaler
+    from src.indicators import add_indicators
+    from src.ml_logic import make_windows, prepare_data
+    data = add_indicators(frame)
+    prepare_s, (X, y) = best_of(lambda: prepare_data(data))
+    scaler = MinMaxScaler().fit(X)
+
+    def windowing():
+        windows, targets = make_windows(scaler.transform(X).astype(np.float32, copy=False), y, look_back)
+        # Coût réel du fenêtrage : chaque batch est matérialisé comme à l'entraînement
+        for lo in range(0, len(windows), batch_size):
+            np.ascontiguousarray(windows[lo:lo + batch_size])
+        return len(windows)
+
+    windowing_s, n_windows = best_of(windowing)
+    return {'rows': len(data), 'prepare_data_s': prepare_s, 'windows': n_windows,
+            'windowing_s': windowing_s, 'windows_per_s': n_windows / windowing_s}
+
+
+def bench_inference(frame, tmp, repeats):
+    import joblib
+    from sklearn.preprocessing import MinMaxScaler
+    from src.indicators import add_indicators
+    from src.lite_model import LiteModel, export_lite, lite_path
+    from src.ml_logic import FEATURE_COLS, build_model, predict_next, prepare_data
+    data = add_indicators(frame.iloc[-5000:]).dropna().reset_index(drop=True)
+    model_path, scaler_path = os.path.join(tmp, "model.h5"), os.path.join(tmp, "scaler.pkl")
+    # Modèle non entraîné : seule la latence compte, pas la qualité du signal
+    model = build_model((10, len(FEATURE_COLS)))
+    scaler = MinMaxScaler().fit(prepare_data(data)[0])
+    model.save(model_path)
+    joblib.dump(scaler, scaler_path)
+    export_lite(model, scaler, lite_path(model_path), FEATURE_COLS)
+
+    window = data.iloc[-10:]
+    assert predict_next(window, model_path, scaler_path)[0] is not None
+    keras_p50, keras_p99 = latencies(lambda: predict_next(window, model_path, scaler_path), repeats)
+    lite_model = LiteModel.load(lite_path(model_path))
+    lite_p50, lite_p99 = latencies(lambda: lite_model.predict(window), repeats)
+    return {'predict_next_p50_ms': keras_p50, 'predict_next_p99_ms': keras_p99,
+            'predict_lite_p50_ms': lite_p50, 'predict_lite_p99_ms': lite_p99}
+
+
+def bench_fetch(days, latency_ms, tmp, writer=None):
+    """writer(fetcher) optionnel : remplace le thread writer (comparaison dans bench_fetch.py)."""
+    from src.data_fetcher import DataFetcher
+    from src.fake_deriv import FIXED_NOW, FakeDerivServer, NullProgress
+    with FakeDerivServer(latency=latency_ms / 1000, now=FIXED_NOW) as server:
+        fetcher = DataFetcher(db_path=os.path.join(tmp, "fetch.db"), ws_url=server.url)
+        fetcher.request_pause = 0  # on mesure le pipeline, pas la pause anti-ban
+        if writer is not None:
+            fetcher.writer = writer(fetcher)
+        t0 = time.perf_counter()
+        count = fetcher.fetch_history_reverse(SYMBOL, 60, datetime.fromtimestamp(FIXED_NOW - days * 86400),
+                                              datetime.fromtimestamp(FIXED_NOW), NullProgress())
+        seconds = time.perf_counter() - t0
+        fetcher.ws.close()
+        fetcher.writer.close()
+    return {'candles': count, 'requests': server.requests, 'fetch_s': seconds, 'candles_per_s': count / seconds}
+
+
+def bench_ticks(n_ticks):
+    from src.aggregator import CandleAggregator
+    from src.synthetic import candles_from_ticks, synthetic_ticks
+    epochs, quotes = synthetic_ticks(SYMBOL, n_ticks)
+    resample_s, _ = best_of(lambda: candles_from_ticks(epochs, quotes, 60))
+
+    aggregator = CandleAggregator()
+    pairs = list(zip(epochs.tolist(), quotes.tolist()))
+    t0 = time.perf_counter()
+    for epoch, quote in pairs:
+        aggregator.on_tick(SYMBOL, epoch, quote)
+    stream_s = time.perf_counter() - t0
+    return {'ticks': n_ticks, 'resample_ticks_per_s': n_ticks / resample_s,
+            'aggregator_ticks_per_s': n_ticks / stream_s, 'bars_closed': aggregator.bars_closed}
+
+
+# --- Exécution et comparaison ---
+def git_commit():
+    out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT)
+    return out.stdout.strip() or None
+
+
+def run_suite(candles=1_000_000, ticks=86400 * 7, fetch_days=30, fetch_latency_ms=2, repeats=200, only=None):
+    from src.synthetic import candle_frame, synthetic_candles
+    columns = synthetic_candles(SYMBOL, candles)
+    frame = candle_frame(SYMBOL, 60, columns)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        benches = {
+            'add_indicators': lambda: bench_indicators(frame),
+            'storage': lambda: bench_storage(columns, tmp),
+            'prepare_data': lambda: bench_prepare(frame),
+            'inference': lambda: bench_inference(frame, tmp, repeats),
+            'fetch_history_reverse': lambda: bench_fetch(fetch_days, fetch_latency_ms, tmp),
+            'ticks': lambda: bench_ticks(ticks),
+        }
+        for name, bench in benches.items():
+            if only and name not in only:
+                continue
+            print(f"--- {name} ---", flush=True)
+            results[name] = bench()
+            for key, value in results[name].items():
+                print(f"  {key:28s} {value:,.3f}" if isinstance(value, float) else f"  {key:28s} {value}")
+    return {
+        'meta': {
+            'commit': git_commit(), 'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+            'params': {'candles': candles, 'ticks': ticks, 'fetch_days': fetch_days,
+                       'fetch_latency_ms': fetch_latency_ms, 'repeats': repeats},
+        },
+        'results': results,
+    }
+
+
+def is_timing(key):
+    return key.endswith(('_per_s', '_s', '_ms'))
+
+
+def compare(new, old, threshold=0.10):
+    """
+    Écarts entre deux exécutions : [(bench, métrique, ancien, nouveau, variation, régression)].
+    variation > 0 = amélioration ; régression si la perte dépasse `threshold`.
+    Un bench dont la charge diffère (clés informatives : lignes, requêtes...) n'est pas comparé.
+    """
+    rows = []
+    for bench, metrics in new['results'].items():
+        previous = old.get('results', {}).get(bench, {})
+        if any(previous.get(k) != v for k, v in metrics.items() if not is_timing(k)):
+            continue
+        for key, value in metrics.items():
+            before = previous.get(key)
+            if not isinstance(value, (int, float)) or not isinstance(before, (int, float)) or not before or not value:
+                continue
+            if key.endswith('_per_s'):
+                change = value / before - 1
+            elif key.endswith(('_s', '_ms')):
+                change = before / value - 1
+            else:
+                continue
+            rows.append((bench, key, before, value, change, change < -threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks hors-ligne sur données synthétiques")
+    parser.add_argument("--candles", type=int, default=1_000_000)
+    parser.add_argument("--ticks", type=int, default=86400 * 7, help="ticks à la seconde (défaut : 7 jours)")
+    parser.add_argument("--fetch-days", type=int, default=30)
+    parser.add_argument("--fetch-latency-ms", type=float, default=2)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--quick", action="store_true", help="tailles réduites (100k bougies, 1 jour de ticks)")
+    parser.add_argument("--only", nargs="*", help="sous-ensemble : add_indicators storage prepare_data "
+                                                  "inference fetch_history_reverse ticks")
+    parser.add_argument("--out", help="fichier JSON des résultats")
+    parser.add_argument("--compare", help="JSON d'une exécution précédente")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.candles, args.ticks, args.fetch_days, args.repeats = 100_000, 86400, 7, 50
+
+    report = run_suite(args.candles, args.ticks, args.fetch_days, args.fetch_latency_ms, args.repeats, args.only)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Résultats : {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        rows = compare(report, old, args.threshold)
+        print(f"--- comparaison avec {old['meta'].get('commit')} ({args.compare}) ---")
+        for bench, key, before, value, change, regression in rows:
+            flag = "  RÉGRESSION" if regression else ""
+            print(f"{bench:22s} {key:28s} {before:12.3f} -> {value:12.3f}  {change:+7.1%}{flag}")
+        if any(r[-1] for r in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
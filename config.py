@@ -1,6 +1,10 @@
 # config.py
+import os
+
 APP_ID = 122241  # Remplacez par votre ID si nécessaire
 WS_URL = "wss://ws.derivws.com/websockets/v3"
+# Jeton API Deriv (trading) : lu dans l'environnement, jamais écrit dans le code
+DERIV_TOKEN = os.environ.get("DERIV_TOKEN", "")
 
 ASSETS = {
     'Forex / Métaux': ['frxXAUUSD'],
@@ -15,6 +19,15 @@ TIMEFRAMES = {
     '15 Minutes': 900,
     '1 Heure': 3600
 }
+# Seule granularité téléchargée : les autres sont calculées localement (src/resample.py)
+BASE_TIMEFRAME = 60
+
+# Export Prometheus des métriques sur http://<hôte>:METRICS_PORT/metrics (0 = désactivé)
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+
+# Graphique live : images par seconde max et nombre de ticks affichés
+LIVE_MAX_FPS = 4
+LIVE_WINDOW = 50
 
 DB_PATH = 'database/trading_history.db'
 MODEL_PATH = 'models/model_v1.h5'
@@ -1,16 +1,28 @@
-import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
 import time
-import json
-import ssl
-import websocket
+from src.startup import startup_profile, import_costs, STARTUP_MODULES, LAZY_MODULES
+from src.metrics import metrics, serve_prometheus, LoopProfiler
+
+with startup_profile.measure("streamlit, pandas, plotly"):
+    import streamlit as st
+    import pandas as pd
+    import plotly.graph_objects as go
+import os
+import threading
 from datetime import date, datetime, timedelta
 
-from config import ASSETS, TIMEFRAMES, APP_ID, WS_URL
-from src.data_fetcher import DataFetcher
-from src.indicators import add_indicators
-from src.ml_logic import train_gru_model, predict_next
+with startup_profile.measure("données (DataFetcher, SQLite, Arrow)"):
+    from config import ASSETS, TIMEFRAMES, LIVE_MAX_FPS, LIVE_WINDOW, METRICS_PORT
+    from src.data_fetcher import DataFetcher
+# TensorFlow, scikit-learn et TA-Lib ne sont importés que dans l'onglet qui s'en sert
+with startup_profile.measure("live (ticks, bougies, modèle léger)"):
+    from src.indicators import add_indicators, StreamingIndicators
+    from src.model_registry import model_paths
+    from src.lite_model import model_look_back, predict_live
+    from src.training import train_many
+    from src.tick_hub import TickHub
+    from src.aggregator import CandleAggregator
+    from src.live_chart import RenderScheduler
+    from src.signals import SignalStore
 
 # --- CONFIGURATION PAGE ---
 st.set_page_config(page_title="OtmAnalytics", layout="wide", page_icon="📈")
@@ -23,8 +35,50 @@ st.markdown("""
 
 st.title("📊 OtmAnalytics - Deriv Trader (Reverse Fetch)")
 
-if 'fetcher' not in st.session_state:
-    st.session_state.fetcher = DataFetcher()
+# --- RESSOURCES PARTAGÉES ---
+# Une instance par processus pour toutes les sessions (onglets, utilisateurs) : connexions,
+# caches mémoire et modèles ne se multiplient pas avec le nombre de navigateurs ouverts.
+@st.cache_resource
+def shared_fetcher():
+    """DataFetcher unique : pool SQLite, cache des bougies, writer, websocket de téléchargement."""
+    return DataFetcher()
+
+@st.cache_resource
+def shared_live():
+    """Hub de ticks unique (une connexion, tous les symboles suivis) et son agrégateur de bougies."""
+    hub = TickHub().start()
+    # Bougies construites localement à partir des ticks, écrites par lots en base (une seule fois)
+    aggregator = CandleAggregator(writer=shared_fetcher().writer)
+    hub.add_listener(aggregator.on_tick)
+    return hub, aggregator
+
+@st.cache_resource
+def shared_metrics_server(port):
+    """Endpoint /metrics pour Prometheus (un serveur par processus)."""
+    return serve_prometheus(port)
+
+fetcher = shared_fetcher()
+if METRICS_PORT:
+    shared_metrics_server(METRICS_PORT)
+# État propre à la session : indicateurs incrémentaux des paires affichées
+if 'engines' not in st.session_state:
+    st.session_state.engines = {}
+
+def get_engine(sym, tf):
+    """
+    Indicateurs incrémentaux de la paire : amorcés une fois, puis mis à jour par delta.
+    La fenêtre suit le look_back du modèle de la paire (réamorcée s'il est ré-entraîné autrement).
+    """
+    look_back = model_look_back(sym, tf)
+    engine = st.session_state.engines.get((sym, tf))
+    if engine is None or engine.window != look_back:
+        df_hist = fetcher.load_data(sym, tf)
+        engine = st.session_state.engines[(sym, tf)] = StreamingIndicators(window=look_back).seed(df_hist)
+    else:
+        new_c = fetcher.candles_since(sym, tf, engine.last_epoch)
+        for row in zip(new_c['epoch'], new_c['open'], new_c['high'], new_c['low'], new_c['close']):
+            engine.push(*row)
+    return engine
 
 # --- SIDEBAR ---
 st.sidebar.header("⚙️ Configuration")
@@ -34,11 +88,45 @@ tf_label = st.sidebar.selectbox("Timeframe", list(TIMEFRAMES.keys()))
 tf_seconds = TIMEFRAMES[tf_label]
 
 if st.sidebar.button("Test Connexion"):
-    if st.session_state.fetcher.connect_ws():
+    if fetcher.connect_ws():
         st.sidebar.success("Connecté !")
     else:
         st.sidebar.error("Erreur.")
 
+# --- DIAGNOSTIC DÉMARRAGE ---
+if startup_profile.mark_ready():
+    print(startup_profile.as_text())  # une fois par processus, dans les logs du serveur
+with st.sidebar.expander("⏱️ Démarrage"):
+    st.caption(f"Interface prête en {startup_profile.ready_after:.2f} s (imports + initialisation)")
+    st.dataframe(pd.DataFrame(startup_profile.report(), columns=['label', 'seconds', 'modules']),
+                 hide_index=True, use_container_width=True)
+    if st.button("Profil des imports (processus neuf)"):
+        with st.spinner("python -X importtime..."):
+            st.dataframe(pd.DataFrame(import_costs(STARTUP_MODULES + LAZY_MODULES)),
+                         hide_index=True, use_container_width=True)
+
+# --- DIAGNOSTICS (latences des chemins chauds) ---
+PROFILE_MODES = {"Désactivé": None, "Échantillonnage": "sampling", "cProfile": "cprofile"}
+
+def show_metrics(box):
+    rows = metrics.summary()
+    if rows:
+        box.dataframe(pd.DataFrame(rows).round(2), hide_index=True, use_container_width=True)
+    else:
+        box.caption("Aucune mesure pour l'instant.")
+
+with st.sidebar.expander("📈 Diagnostics"):
+    if st.button("Remettre à zéro"):
+        metrics.reset()
+    metrics_box = st.empty()
+    show_metrics(metrics_box)
+    if metrics.counters:
+        st.caption(" · ".join(f"{k} : {v}" for k, v in sorted(metrics.counters.items())))
+    st.download_button("Export Prometheus", metrics.prometheus(), file_name="metrics.prom", mime="text/plain")
+    profile_mode = st.selectbox("Profilage de la boucle live", list(PROFILE_MODES))
+    if st.session_state.get('live_profile'):
+        st.code(st.session_state.live_profile, language=None)
+
 # --- TABS ---
 tab1, tab2, tab3 = st.tabs(["📥 Données", "🧠 Modèle IA", "🔴 Live Trading"])
 
@@ -59,7 +147,7 @@ with tab1:
     end_dt = datetime.combine(end_d, datetime.max.time())
     
     # On compte ce qu'on a déjà en base pour cet intervalle précis
-    existing_count = st.session_state.fetcher.count_period(symbol, tf_seconds, start_dt, end_dt)
+    existing_count = fetcher.count_period(symbol, tf_seconds, start_dt, end_dt)
     
     # Affichage stylé avec des colonnes
     m1, m2 = st.columns(2)
@@ -70,30 +158,42 @@ with tab1:
     if st.button("🔄 Lancer le Téléchargement (Fin -> Début)", type="primary"):
         prog_bar = st.progress(0, text="Connexion...")
         # Appel de la méthode REVERSE
-        new_count = st.session_state.fetcher.fetch_history_reverse(symbol, tf_seconds, start_dt, end_dt, prog_bar)
+        new_count = fetcher.fetch_history_reverse(symbol, tf_seconds, start_dt, end_dt, prog_bar)
         
         st.success(f"Opération terminée. {new_count} bougies ajoutées/mises à jour.")
         time.sleep(1)
         st.rerun() # Rafraîchir pour mettre à jour le compteur
 
+    if st.button("⏬ Télécharger TOUS les actifs / timeframes (parallèle)"):
+        prog_bar = st.progress(0, text="Connexion...")
+        all_symbols = [s for group in ASSETS.values() for s in group]
+        jobs = fetcher.fetch_history_all(
+            all_symbols, list(TIMEFRAMES.values()), start_dt, end_dt, prog_bar
+        )
+        failed = [j for j in jobs if j.status != "done"]
+        st.success(f"Opération terminée. {sum(j.fetched for j in jobs)} bougies ajoutées/mises à jour.")
+        for j in failed:
+            st.error(f"{j.symbol} ({j.timeframe}s) : {j.error}")
+        if not failed:
+            time.sleep(1)
+            st.rerun()
+
     # Graphique
     st.divider()
-    df = st.session_state.fetcher.load_data(symbol, tf_seconds)
+    # Seule la fenêtre affichée est extraite du cache (recherche binaire sur epoch)
+    df_view = fetcher.load_data(symbol, tf_seconds, start_dt, end_dt)
     
-    if not df.empty:
-        # Filtre local pour l'affichage graphique uniquement sur la période
-        mask = (df['date'] >= pd.Timestamp(start_dt)) & (df['date'] <= pd.Timestamp(end_dt))
-        df_view = df.loc[mask]
-        
+    if fetcher.store.count(symbol, tf_seconds):
         if not df_view.empty:
             df_view = add_indicators(df_view)
-            fig = go.Figure(data=[go.Candlestick(
-                x=df_view['date'], open=df_view['open'], high=df_view['high'],
-                low=df_view['low'], close=df_view['close'], name='Prix'
-            )])
-            fig.add_trace(go.Scatter(x=df_view['date'], y=df_view['MA5'], line=dict(color='orange'), name='MA5'))
-            fig.update_layout(height=500, template="plotly_dark", title=f"{symbol} ({tf_label})")
-            st.plotly_chart(fig, use_container_width=True)
+            with metrics.timer("plotly_render"):
+                fig = go.Figure(data=[go.Candlestick(
+                    x=df_view['date'], open=df_view['open'], high=df_view['high'],
+                    low=df_view['low'], close=df_view['close'], name='Prix'
+                )])
+                fig.add_trace(go.Scatter(x=df_view['date'], y=df_view['MA5'], line=dict(color='orange'), name='MA5'))
+                fig.update_layout(height=500, template="plotly_dark", title=f"{symbol} ({tf_label})")
+                st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning("Des données existent, mais pas dans l'intervalle de dates sélectionné ci-dessus.")
     else:
@@ -103,12 +203,81 @@ with tab1:
 with tab2:
     st.write("Entraînement sur les données téléchargées.")
     if st.button("Entraîner le Modèle"):
-        df_train = st.session_state.fetcher.load_data(symbol, tf_seconds)
-        if len(df_train) > 100:
-            df_train = add_indicators(df_train)
-            with st.spinner("Entraînement..."):
-                res = train_gru_model(df_train)
-                st.success(res)
+        # Lecture en flux par paquets (tf.data) : mémoire constante quelle que soit la taille de l'historique
+        with st.spinner("Entraînement..."):
+            with startup_profile.measure("IA : entraînement (TensorFlow)"):
+                from src.pipeline import train_gru_streaming
+            res = train_gru_streaming(fetcher.db, symbol, tf_seconds)
+        if res.startswith("Pas assez"):
+            st.error(res)
+        else:
+            st.success(res)
+
+    # Walk-forward + grille sur plusieurs paires, dans un pool de processus (hors session)
+    with st.expander("Entraînement multi-paires (walk-forward)"):
+        all_symbols = [s for syms in ASSETS.values() for s in syms]
+        m1, m2 = st.columns(2)
+        tr_symbols = m1.multiselect("Actifs", all_symbols, default=[symbol])
+        tr_tfs = m2.multiselect("Timeframes", list(TIMEFRAMES.keys()), default=[tf_label])
+        g1, g2, g3, g4 = st.columns(4)
+        tr_lookbacks = g1.multiselect("Look-back", [5, 10, 20, 30], default=[10])
+        tr_epochs = g2.multiselect("Epochs", [5, 10, 20], default=[10])
+        tr_splits = g3.number_input("Plis walk-forward", min_value=2, max_value=10, value=3)
+        tr_workers = g4.number_input("Processus", min_value=1, max_value=os.cpu_count() or 1,
+                                     value=max(1, (os.cpu_count() or 1) // 2))
+
+        job = st.session_state.get('training')
+        running = job is not None and job['thread'].is_alive()
+        if st.button("Lancer l'entraînement", disabled=running or not (tr_symbols and tr_tfs and tr_lookbacks and tr_epochs)):
+            pairs = [(s, TIMEFRAMES[t]) for s in tr_symbols for t in tr_tfs]
+            grid = {'look_back': tr_lookbacks, 'epochs': tr_epochs, 'batch_size': [64], 'units': [(64, 32)]}
+            job = {'results': [], 'total': len(pairs)}
+            job['thread'] = threading.Thread(
+                target=train_many, daemon=True,
+                args=(pairs, grid, fetcher.db_path),
+                kwargs={'n_splits': tr_splits, 'workers': tr_workers, 'on_result': job['results'].append},
+            )
+            job['thread'].start()
+            st.session_state.training = job
+            running = True
+
+        if job is not None:
+            st.progress(len(job['results']) / job['total'], text=f"{len(job['results'])}/{job['total']} paires")
+            if job['results']:
+                st.dataframe(pd.DataFrame([{
+                    'Actif': r['symbol'], 'TF': r['timeframe'],
+                    'Précision WF': r.get('walk_forward_accuracy'),
+                    'Paramètres': str(r.get('best_params', '')), 'Erreur': r.get('error', ''),
+                } for r in job['results']]), use_container_width=True)
+            if running:
+                st.button("🔄 Actualiser")
+
+    # Backtest vectorisé sur tout l'historique stocké
+    st.divider()
+    st.subheader("Backtest")
+    b1, b2, b3, b4 = st.columns(4)
+    bt_source = b1.selectbox("Signaux", ["Modèle GRU", "Indicateurs (Stoch/RSI)"])
+    bt_stake = b2.number_input("Mise (USD)", min_value=0.35, value=1.0)
+    bt_duration = b3.number_input("Durée", min_value=1, value=1)
+    bt_unit = b4.selectbox("Unité", ["m", "s", "h", "d"])
+    if st.button("Lancer le Backtest"):
+        df_bt = fetcher.load_data(symbol, tf_seconds, columnar=True)
+        if len(df_bt) > 100:
+            df_bt = add_indicators(df_bt).reset_index(drop=True)
+            with st.spinner("Backtest..."):
+                with startup_profile.measure("IA : backtest (TensorFlow)"):
+                    from src.backtest import gru_signals, indicator_signals, run_backtest
+                if bt_source == "Modèle GRU":
+                    signals = gru_signals(df_bt, *model_paths(symbol, tf_seconds))
+                else:
+                    signals = indicator_signals(df_bt)
+                report = run_backtest(df_bt, signals, tf_seconds, bt_stake, bt_duration, bt_unit)
+            r1, r2, r3, r4 = st.columns(4)
+            r1.metric("P&L", f"{report['pnl']:.2f} $")
+            r2.metric("Taux de réussite", f"{report['hit_rate']:.1%}")
+            r3.metric("Trades", f"{report['trades']}")
+            r4.metric("Drawdown max", f"{report['max_drawdown']:.2f} $")
+            st.line_chart(pd.DataFrame({'Capital': report['equity']}, index=df_bt['date']))
         else:
             st.error("Pas assez de données.")
 
@@ -119,36 +288,85 @@ with tab3:
     c1, c2 = st.columns([1, 2])
     with c1:
         live_on = st.checkbox("Activer Connexion Live")
+        max_fps = st.slider("Rafraîchissement graphique (images/s max)", 1, 30, LIVE_MAX_FPS)
         st.divider()
         price_metric = st.empty()
+        bar_box = st.empty()
         signal_box = st.empty()
         
     with c2:
         chart_live = st.empty()
 
+    # Signaux publiés par le daemon (python -m src.signal_daemon), sans garder cet onglet ouvert
+    with st.expander("📡 Signaux du daemon (tous les actifs)"):
+        daemon_signals = SignalStore(fetcher.db).latest(tf_seconds)
+        if daemon_signals:
+            df_sig = pd.DataFrame(daemon_signals)
+            df_sig['bougie'] = pd.to_datetime(df_sig['epoch'], unit='s')
+            df_sig['publié'] = pd.to_datetime(df_sig['published'], unit='s')
+            st.dataframe(df_sig[['symbol', 'action', 'confidence', 'bougie', 'publié']],
+                         hide_index=True, use_container_width=True)
+        else:
+            st.caption(f"Aucun signal en {tf_label}. Lancer : python -m src.signal_daemon")
+
+    # Scan multi-actifs : toutes les fenêtres passent dans le modèle en un seul batch
+    if st.button("🔍 Scanner tous les actifs"):
+        all_symbols = [s for group in ASSETS.values() for s in group]
+        windows = {}
+        for s in all_symbols:
+            eng = get_engine(s, tf_seconds)
+            if eng.ready:
+                windows[(s, tf_seconds)] = eng.frame()
+        with startup_profile.measure("Live : scan (TensorFlow)"):
+            from src.scoring import ScoringService
+        results = ScoringService().score(windows)
+        labels = {0: "ATTENTE", 1: "ACHAT 🚀", 2: "VENTE 📉"}
+        st.dataframe(pd.DataFrame([
+            {"Actif": s, "Signal": labels.get(results.get((s, tf_seconds), (None, 0))[0], "—"),
+             "Confiance": results.get((s, tf_seconds), (None, 0.0))[1]}
+            for s in all_symbols
+        ]), use_container_width=True)
+
     if live_on:
+        # Profilage à la demande : le rapport s'affiche dans Diagnostics à l'arrêt de la boucle
+        profiler = LoopProfiler(PROFILE_MODES[profile_mode]).start() if PROFILE_MODES[profile_mode] else None
         try:
-            full_url = f"{WS_URL}?app_id={APP_ID}"
-            ws = websocket.create_connection(full_url, sslopt={"cert_reqs": ssl.CERT_NONE})
-            ws.send(json.dumps({"ticks": symbol}))
+            # Hub de ticks partagé en arrière-plan : une connexion, plusieurs symboles, ring buffers
+            hub, aggregator = shared_live()
+            hub.subscribe(symbol)
+            buf = hub.buffer(symbol)
             
             last_p = 0.0
-            ticks = []
+            seen = buf.count
+            scheduler = RenderScheduler(max_fps=max_fps, window=LIVE_WINDOW)
+            _, history = buf.snapshot(LIVE_WINDOW)
+            scheduler.push(history, seen - len(history))
+            line = None
+            metrics_shown = time.perf_counter()
             
             while live_on:
-                data = json.loads(ws.recv())
-                if 'tick' in data:
-                    p = float(data['tick']['quote'])
+                # L'UI lit un instantané : les ticks arrivés pendant le rendu ne s'accumulent pas
+                if buf.count != seen:
+                    tick_started = time.perf_counter()
+                    n_new = buf.count - seen
+                    seen = buf.count
+                    _, ticks = buf.snapshot(n_new)
+                    scheduler.push(ticks, seen - len(ticks))
+                    p = float(ticks[-1])
                     delta = p - last_p if last_p != 0 else 0
                     
                     price_metric.metric("Prix", f"{p:.2f}", f"{delta:.2f}")
                     last_p = p
+                    bar = aggregator.current_bar(symbol, tf_seconds)
+                    if bar:
+                        bar_box.caption(f"Bougie en cours ({tf_label}) : O {bar[1]:.2f}  H {bar[2]:.2f}  L {bar[3]:.2f}  C {bar[4]:.2f}")
                     
+                    # Indicateurs incrémentaux (nouvelles bougies en base uniquement)
+                    engine = get_engine(symbol, tf_seconds)
+
                     # Logique Signal Simple
-                    df_live = st.session_state.fetcher.load_data(symbol, tf_seconds)
-                    if len(df_live) > 50:
-                        df_live = add_indicators(df_live)
-                        pred, conf = predict_next(df_live.tail(10))
+                    if engine.ready:
+                        pred, conf = predict_live(engine.frame(), symbol, tf_seconds)
                         
                         color = "gray"
                         txt = "ATTENTE"
@@ -161,14 +379,26 @@ with tab3:
                             <small style='color:black;'>Confiance: {conf:.1%}</small>
                         </div>
                         """, unsafe_allow_html=True)
+                    # Ticks -> prix, bougie, indicateurs, signal affichés
+                    metrics.observe("live_update", time.perf_counter() - tick_started)
+
+                # Graphique Tick : max_fps images/s, seuls les nouveaux points sont envoyés (add_rows)
+                if scheduler.due():
+                    with metrics.timer("live_render"):
+                        mode, points = scheduler.frame()
+                        if mode == 'reset':
+                            line = chart_live.line_chart(points, height=300)
+                        else:
+                            line.add_rows(points)
 
-                    # Graphique Tick
-                    ticks.append(p)
-                    if len(ticks) > 50: ticks.pop(0)
-                    f_live = go.Figure(go.Scatter(y=ticks))
-                    f_live.update_layout(height=300, margin=dict(t=0,b=0,l=0,r=0), template="plotly_dark")
-                    chart_live.plotly_chart(f_live, use_container_width=True)
+                # Le panneau Diagnostics suit la boucle (toutes les 2 s)
+                if time.perf_counter() - metrics_shown > 2:
+                    show_metrics(metrics_box)
+                    metrics_shown = time.perf_counter()
 
-                time.sleep(0.05)
+                time.sleep(0.02)
         except Exception as e:
             st.error(f"Erreur Live: {e}")
+        finally:
+            if profiler is not None:
+                st.session_state.live_profile = profiler.stop()
@@ -0,0 +1,94 @@
+# src/aggregator.py
+import threading
+import time
+from config import BASE_TIMEFRAME, TIMEFRAMES
+
+
+class CandleAggregator:
+    """
+    Construit localement les bougies OHLC de toutes les granularités à partir des ticks.
+    - on_tick() peut être branché directement comme listener du TickHub.
+    - Les bougies clôturées sont envoyées aux callbacks on_close(symbol, timeframe, bar).
+    - Seules les bougies de BASE_TIMEFRAME (et des granularités qui n'en dérivent pas)
+      sont écrites par lots au writer : les granularités dérivées (5m, 15m, 1h) sont
+      calculées par le Resampler à partir des bougies de base, seule source en base.
+    - current_bar() expose la bougie en cours de formation.
+    La toute première bougie de chaque paire démarre en cours d'intervalle :
+    elle n'est pas écrite en base (incomplète), seulement exposée.
+    """
+
+    def __init__(self, timeframes=None, writer=None, batch_size=500, flush_interval=5.0):
+        self.timeframes = sorted(timeframes or TIMEFRAMES.values())
+        self.writer = writer            # objet avec put(rows), ex. CandleWriter
+        # La base est suivie dès qu'il y a un writer, même si elle n'est pas demandée
+        self._tracked = sorted(set(self.timeframes) | {BASE_TIMEFRAME}) if writer is not None else self.timeframes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_close = []
+        self.bars_closed = 0
+        self._bars = {}                 # (symbol, tf) -> [epoch, open, high, low, close, complete]
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def on_tick(self, symbol, epoch, quote, tick=None):
+        closed = []
+        with self._lock:
+            for tf in self._tracked:
+                start = epoch - epoch % tf
+                bar = self._bars.get((symbol, tf))
+                if bar is None:
+                    # Première bougie : commencée avant notre premier tick
+                    self._bars[(symbol, tf)] = [start, quote, quote, quote, quote, False]
+                elif start > bar[0]:
+                    closed.append((symbol, tf, tuple(bar[:5]), bar[5]))
+                    self._bars[(symbol, tf)] = [start, quote, quote, quote, quote, True]
+                elif start == bar[0]:
+                    bar[2] = max(bar[2], quote)
+                    bar[3] = min(bar[3], quote)
+                    bar[4] = quote
+                # Tick en retard (bougie déjà clôturée) : ignoré
+
+            for symbol_, tf, bar, complete in closed:
+                if tf in self.timeframes:
+                    self.bars_closed += 1
+                if complete and self._persisted(tf):
+                    self._pending.append((symbol_, tf) + bar)
+            to_write = self._take_pending()
+
+        if to_write and self.writer is not None:
+            self.writer.put(to_write)
+        for symbol_, tf, bar, complete in closed:
+            if tf not in self.timeframes:
+                continue
+            for callback in self.on_close:
+                callback(symbol_, tf, bar)
+
+    @staticmethod
+    def _persisted(timeframe):
+        """Vrai si la bougie va en base (le Resampler fait autorité sur les granularités dérivées)."""
+        return timeframe == BASE_TIMEFRAME or timeframe % BASE_TIMEFRAME != 0
+
+    def _take_pending(self, force=False):
+        """Lot à écrire si assez de bougies ou délai écoulé (appelé sous verrou)."""
+        now = time.monotonic()
+        if self._pending and (force or len(self._pending) >= self.batch_size
+                              or now - self._last_flush >= self.flush_interval):
+            batch, self._pending = self._pending, []
+            self._last_flush = now
+            return batch
+        return []
+
+    def flush(self):
+        """Envoie immédiatement les bougies clôturées en attente."""
+        with self._lock:
+            batch = self._take_pending(force=True)
+        if batch and self.writer is not None:
+            self.writer.put(batch)
+        return len(batch)
+
+    def current_bar(self, symbol, timeframe):
+        """Bougie en cours (epoch, open, high, low, close), ou None."""
+        with self._lock:
+            bar = self._bars.get((symbol, timeframe))
+            return tuple(bar[:5]) if bar else None
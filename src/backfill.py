@@ -0,0 +1,191 @@
+# src/backfill.py
+"""
+Téléchargement d'historique en parallèle : plusieurs paires (symbol, timeframe)
+sont traitées en même temps sur un petit pool de connexions WebSocket, sous un
+budget global de requêtes par seconde (au lieu d'une pause fixe).
+"""
+import asyncio
+import itertools
+import json
+import time
+import websockets
+from config import APP_ID, WS_URL
+from src.metrics import metrics
+
+
+class RateLimiter:
+    """Seau à jetons partagé par toutes les connexions (requêtes / seconde)."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BackfillJob:
+    """Une paire à télécharger sur [start_epoch, end_epoch], avec son avancement."""
+
+    def __init__(self, symbol, timeframe, start_epoch, end_epoch):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.start_epoch = start_epoch
+        self.end_epoch = end_epoch
+        self.cursor = end_epoch  # on remonte de la fin vers le début
+        self.fetched = 0
+        self.requests = 0
+        self.status = "pending"  # pending / running / done / error
+        self.error = None
+
+    @property
+    def progress(self):
+        if self.status == "done":
+            return 1.0
+        total = self.end_epoch - self.start_epoch
+        if total <= 0:
+            return 0.0
+        return min(1.0, max(0.0, (self.end_epoch - self.cursor) / total))
+
+    def __repr__(self):
+        return f"BackfillJob({self.symbol}, {self.timeframe}, {self.status}, {self.fetched} bougies)"
+
+
+class BackfillEngine:
+    def __init__(self, save, url=None, connections=3, rate=5.0, count=5000,
+                 max_retries=3, on_progress=None):
+        # save(batch) : écriture bloquante des tuples (symbol, tf, epoch, o, h, l, c)
+        self.save = save
+        self.url = url or f"{WS_URL}?app_id={APP_ID}"
+        self.connections = connections
+        self.rate = rate
+        self.count = count
+        self.max_retries = max_retries
+        self.on_progress = on_progress
+        self.jobs = []
+        self._req_ids = itertools.count(1)
+
+    async def _request(self, ws, limiter, payload):
+        """Envoie une requête sous le budget global et attend la réponse du même req_id."""
+        await limiter.acquire()
+        req_id = next(self._req_ids)
+        await ws.send(json.dumps({**payload, "req_id": req_id}))
+        while True:
+            with metrics.timer("ws_recv"):
+                message = await ws.recv()
+            data = json.loads(message)
+            if data.get("req_id") == req_id:
+                return data
+
+    async def _run_job(self, ws, limiter, job):
+        job.status = "running"
+        while job.cursor > job.start_epoch:
+            data = await self._request(ws, limiter, {
+                "ticks_history": job.symbol,
+                "adjust_start_time": 1,
+                "count": self.count,
+                "end": job.cursor,
+                "style": "candles",
+                "granularity": job.timeframe,
+            })
+            job.requests += 1
+
+            if "error" in data:
+                raise RuntimeError(data["error"]["message"])
+
+            candles = data.get("candles", [])
+            if not candles:
+                # Trou dans l'historique : on saute une semaine en arrière
+                job.cursor -= 86400 * 7
+                continue
+
+            oldest = candles[0]["epoch"]
+            batch = [
+                (job.symbol, job.timeframe, c["epoch"], c["open"], c["high"], c["low"], c["close"])
+                for c in candles if job.start_epoch <= c["epoch"] <= job.end_epoch
+            ]
+            # L'écriture SQLite ne bloque pas la boucle réseau
+            await asyncio.to_thread(self.save, batch)
+            job.fetched += len(batch)
+            metrics.count("candles_fetched", len(batch))
+            job.cursor = oldest - 1
+            self._notify(job)
+
+            if oldest <= job.start_epoch:
+                break
+
+        job.status = "done"
+        self._notify(job)
+
+    async def _worker(self, queue, limiter):
+        ws = None
+        try:
+            while True:
+                try:
+                    job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        if ws is None:
+                            ws = await websockets.connect(self.url, max_size=None)
+                        await self._run_job(ws, limiter, job)
+                        break
+                    except (OSError, websockets.ConnectionClosed) as e:
+                        # Connexion perdue : on ferme l'ancienne, on reconnecte et on reprend au curseur
+                        await self._close_quietly(ws)
+                        ws = None
+                        job.error = str(e)
+                        await asyncio.sleep(min(2 ** attempt, 10))
+                    except Exception as e:
+                        job.error = str(e)
+                        break
+                if job.status != "done":
+                    job.status = "error"
+                    self._notify(job)
+        finally:
+            await self._close_quietly(ws)
+
+    @staticmethod
+    async def _close_quietly(ws):
+        """Ferme une connexion (éventuellement déjà cassée) sans propager d'erreur."""
+        if ws is None:
+            return
+        try:
+            await ws.close()
+        except Exception:
+            pass
+
+    def _notify(self, job):
+        if self.on_progress:
+            self.on_progress(job, self.jobs)
+
+    async def run(self, jobs):
+        """Exécute tous les jobs et les retourne avec leur état final."""
+        self.jobs = list(jobs)
+        queue = asyncio.Queue()
+        for job in self.jobs:
+            queue.put_nowait(job)
+        limiter = RateLimiter(self.rate)
+        workers = [self._worker(queue, limiter) for _ in range(min(self.connections, len(self.jobs)))]
+        await asyncio.gather(*workers)
+        return self.jobs
+
+    def run_sync(self, jobs):
+        return asyncio.run(self.run(jobs))
+
+
+def overall_progress(jobs):
+    """Avancement moyen d'une liste de jobs (0..1)."""
+    return sum(j.progress for j in jobs) / len(jobs) if jobs else 1.0
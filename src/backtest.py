@@ -0,0 +1,126 @@
+# src/backtest.py
+"""
+Backtest vectorisé des signaux (GRU ou indicateurs) sur l'historique stocké.
+Les contrats CALL/PUT reprennent les paramètres de TradeExecutor.send_order
+(mise, durée, unité) : entrée à la clôture de la bougie du signal, sortie à la
+clôture située `durée` plus loin. Tout est calculé en NumPy, sans boucle Python.
+Les signaux GRU suivent la convention d'entraînement (make_windows) : la fenêtre
+des lignes i-look_back..i-1 vise la variation close[i] -> close[i+1], son signal
+est donc porté par la bougie i.
+"""
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from src.ml_logic import FEATURE_COLS, model_registry, predict_proba
+
+UNIT_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def contract_horizon(duration, duration_unit, timeframe):
+    """Nombre de bougies couvertes par un contrat (au moins 1)."""
+    if duration_unit not in UNIT_SECONDS:
+        # Les contrats en ticks ('t') ne sont pas représentables sur des bougies
+        raise ValueError(f"Unité de durée non supportée pour un backtest sur bougies : {duration_unit}")
+    return max(1, math.ceil(duration * UNIT_SECONDS[duration_unit] / timeframe))
+
+
+def simulate_contracts(close, signals, stake=1.0, duration=1, duration_unit="m", timeframe=60, payout=0.95):
+    """
+    signals[i] : 0 = rien, 1 = CALL, 2 = PUT, décidé à la clôture de la bougie i.
+    Gain = stake * payout si le contrat finit dans le bon sens, perte = -stake sinon
+    (prix de sortie égal au prix d'entrée = perdu, comme chez Deriv).
+    Retourne un dict : trades, wins, hit_rate, pnl, max_drawdown, equity (par bougie).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signals = np.asarray(signals)
+    h = contract_horizon(duration, duration_unit, timeframe)
+
+    n = len(close)
+    entry = close[:max(n - h, 0)]
+    exit_ = close[h:]
+    sig = signals[:len(entry)]
+
+    traded = (sig == 1) | (sig == 2)
+    win = ((sig == 1) & (exit_ > entry)) | ((sig == 2) & (exit_ < entry))
+    trade_pnl = np.where(traded, np.where(win, stake * payout, -stake), 0.0)
+
+    # Le résultat est encaissé à l'échéance (bougie i + h)
+    settled = np.zeros(n)
+    settled[h:h + len(trade_pnl)] = trade_pnl
+    equity = np.cumsum(settled)
+    drawdown = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity
+
+    trades = int(traded.sum())
+    wins = int((traded & win).sum())
+    return {
+        "trades": trades,
+        "wins": wins,
+        "hit_rate": wins / trades if trades else 0.0,
+        "pnl": float(equity[-1]) if n else 0.0,
+        "max_drawdown": float(drawdown.max()) if n else 0.0,
+        "equity": equity,
+    }
+
+
+def place_window_signals(signals, classes, look_back, start=0):
+    """
+    Place les classes de fenêtres consécutives (la première commence à la ligne `start`)
+    sur leur bougie cible, comme make_windows : fenêtre des lignes k..k+look_back-1 ->
+    bougie k+look_back. Les fenêtres sans bougie cible (fin de l'historique) sont ignorées.
+    """
+    first = start + look_back
+    classes = classes[:max(len(signals) - first, 0)]
+    signals[first:first + len(classes)] = classes
+    return signals
+
+
+def gru_signals(df, model_path, scaler_path, min_confidence=0.0, batch_size=8192):
+    """
+    Signal du modèle pour chaque bougie de df (après add_indicators), en inférence par batch.
+    La fenêtre qui se termine à la bougie i-1 donne le signal de la bougie i : c'est la
+    variation close[i] -> close[i+1] que le modèle a apprise (prepare_data + make_windows).
+    Les look_back premières bougies valent 0.
+    """
+    model, scaler = model_registry.get(model_path, scaler_path)
+    look_back = model.input_shape[1]
+    X = scaler.transform(df[FEATURE_COLS].to_numpy(dtype=np.float64)).astype(np.float32)
+
+    signals = np.zeros(len(df), dtype=np.int8)
+    if len(X) <= look_back:
+        return signals
+    # La dernière fenêtre (jusqu'à la dernière bougie) n'a pas de bougie cible
+    windows = sliding_window_view(X, (look_back, X.shape[1]))[:-1, 0]
+
+    for start in range(0, len(windows), batch_size):
+        probs = predict_proba(model, windows[start:start + batch_size])
+        cls = probs.argmax(axis=1)
+        cls[probs.max(axis=1) < min_confidence] = 0
+        place_window_signals(signals, cls, look_back, start)
+    return signals
+
+
+def indicator_signals(df, rsi_low=30, rsi_high=70):
+    """
+    Règle de référence sur les indicateurs : CALL quand %K croise %D à la hausse
+    sans RSI5 en surachat, PUT quand %K croise %D à la baisse sans RSI5 en survente.
+    """
+    k = df['Stoch_K'].to_numpy()
+    d = df['Stoch_D'].to_numpy()
+    rsi = df['RSI5'].to_numpy()
+    above = k > d
+    cross_up = np.zeros(len(k), dtype=bool)
+    cross_down = np.zeros(len(k), dtype=bool)
+    cross_up[1:] = above[1:] & ~above[:-1]
+    cross_down[1:] = ~above[1:] & above[:-1]
+
+    signals = np.zeros(len(k), dtype=np.int8)
+    signals[cross_up & (rsi < rsi_high)] = 1
+    signals[cross_down & (rsi > rsi_low)] = 2
+    return signals
+
+
+def run_backtest(df, signals, timeframe, stake=1.0, duration=1, duration_unit="m", payout=0.95):
+    """Backtest d'un vecteur de signaux aligné sur df ; ajoute le nombre de bougies au rapport."""
+    report = simulate_contracts(df['close'].to_numpy(), signals, stake, duration, duration_unit, timeframe, payout)
+    report["bars"] = len(df)
+    return report
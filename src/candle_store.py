@@ -0,0 +1,158 @@
+# src/candle_store.py
+import threading
+import numpy as np
+import pandas as pd
+
+
+class CandleSeries:
+    """Historique d'une paire (symbol, timeframe) en tableaux NumPy triés par epoch."""
+
+    FIELDS = ('epoch', 'open', 'high', 'low', 'close')
+
+    def __init__(self):
+        self.size = 0
+        self._arrays = {f: np.empty(0, dtype=np.int64 if f == 'epoch' else np.float64) for f in self.FIELDS}
+
+    @property
+    def last_epoch(self):
+        return int(self._arrays['epoch'][self.size - 1]) if self.size else None
+
+    def append(self, rows):
+        """Ajoute des lignes (epoch, open, high, low, close) plus récentes que last_epoch."""
+        if not rows:
+            return 0
+        block = np.asarray(rows, dtype=np.float64)
+        return self.append_columns({f: block[:, i] for i, f in enumerate(self.FIELDS)})
+
+    def append_columns(self, columns):
+        """Ajoute des colonnes NumPy (mêmes noms que FIELDS), plus récentes que last_epoch."""
+        n = len(columns['epoch'])
+        if not n:
+            return 0
+        needed = self.size + n
+        capacity = len(self._arrays['epoch'])
+        if needed > capacity:
+            # Croissance par doublement : coût amorti O(1) par bougie
+            new_capacity = max(needed, 2 * capacity, 1024)
+            for f, arr in self._arrays.items():
+                grown = np.empty(new_capacity, dtype=arr.dtype)
+                grown[:self.size] = arr[:self.size]
+                self._arrays[f] = grown
+        for f in self.FIELDS:
+            self._arrays[f][self.size:needed] = columns[f]
+        self.size = needed
+        return n
+
+    def truncate(self, epoch):
+        """
+        Retire les bougies d'epoch >= `epoch` (réécrites en base) ; le prochain delta les relit.
+        Les vues déjà rendues sur cette fin de série seront écrasées par l'ajout suivant.
+        """
+        self.size = self.bounds(start_epoch=epoch)[0]
+
+    def bounds(self, start_epoch=None, end_epoch=None):
+        """Indices [lo, hi) des bougies dans [start_epoch, end_epoch] (recherche binaire)."""
+        epochs = self._arrays['epoch'][:self.size]
+        lo = 0 if start_epoch is None else int(np.searchsorted(epochs, start_epoch, side='left'))
+        hi = self.size if end_epoch is None else int(np.searchsorted(epochs, end_epoch, side='right'))
+        return lo, max(lo, hi)
+
+    def view(self, lo, hi):
+        """Vues (sans copie) des colonnes sur l'intervalle d'indices [lo, hi)."""
+        return {f: arr[lo:hi] for f, arr in self._arrays.items()}
+
+
+class CandleStore:
+    """
+    Cache mémoire de la table `candles`, par (symbol, timeframe).
+    Le premier accès charge tout l'historique, les suivants ne lisent que
+    les lignes `epoch > last_epoch`. Les fenêtres de dates sont servies
+    par recherche binaire sur les epochs.
+    """
+
+    def __init__(self, db, snapshot=None):
+        # db : src.db.Database
+        self.db = db
+        # snapshot : src.columnar.ColumnarSnapshot optionnel, pour un premier chargement sans SQL
+        self.snapshot = snapshot
+        self._series = {}
+        self._lock = threading.RLock()
+
+    def refresh(self, symbol, timeframe):
+        """Charge les bougies manquantes (delta) et retourne la série à jour."""
+        with self._lock:
+            series = self._series.get((symbol, timeframe))
+            if series is None:
+                series = self._series[(symbol, timeframe)] = CandleSeries()
+                if self.snapshot is not None and self.snapshot.exists(symbol, timeframe):
+                    # Amorçage depuis l'instantané mappé en mémoire, puis delta SQL
+                    series.append_columns(self.snapshot.arrays(symbol, timeframe))
+                    if not self._matches_db(symbol, timeframe, series):
+                        # Bougies écrites avant la fin de l'instantané (backfill) : chargement SQL complet
+                        series = self._series[(symbol, timeframe)] = CandleSeries()
+            last = series.last_epoch
+            rows = self.db.query(
+                "SELECT epoch, open, high, low, close FROM candles "
+                "WHERE symbol=? AND timeframe=? AND epoch > ? ORDER BY epoch ASC",
+                (symbol, timeframe, -1 if last is None else last)
+            )
+            series.append(rows)
+            return series
+
+    def _matches_db(self, symbol, timeframe, series):
+        """Vrai si la table contient exactement les bougies de la série jusqu'à son dernier epoch."""
+        if not series.size:
+            return True
+        count, first = self.db.query(
+            "SELECT COUNT(*), MIN(epoch) FROM candles WHERE symbol=? AND timeframe=? AND epoch <= ?",
+            (symbol, timeframe, series.last_epoch)
+        )[0]
+        return count == series.size and first == int(series.view(0, 1)['epoch'][0])
+
+    def mark_written(self, symbol, timeframe, min_epoch):
+        """
+        À appeler après une insertion. Si des bougies ont été écrites avant
+        last_epoch (backfill, barre réécrite), la série est tronquée à min_epoch :
+        seule la fin est relue par le delta suivant.
+        """
+        with self._lock:
+            series = self._series.get((symbol, timeframe))
+            if series is not None and series.size and min_epoch <= series.last_epoch:
+                series.truncate(min_epoch)
+
+    def invalidate(self, symbol=None, timeframe=None):
+        with self._lock:
+            if symbol is None:
+                self._series.clear()
+            else:
+                self._series.pop((symbol, timeframe), None)
+
+    def arrays(self, symbol, timeframe, start_epoch=None, end_epoch=None):
+        """Colonnes NumPy (vues) de l'intervalle demandé."""
+        with self._lock:
+            series = self.refresh(symbol, timeframe)
+            return series.view(*series.bounds(start_epoch, end_epoch))
+
+    def since(self, symbol, timeframe, epoch):
+        """Bougies strictement plus récentes que `epoch` (None = tout)."""
+        start = None if epoch is None else epoch + 1
+        return self.arrays(symbol, timeframe, start_epoch=start)
+
+    def count(self, symbol, timeframe, start_epoch=None, end_epoch=None):
+        with self._lock:
+            series = self.refresh(symbol, timeframe)
+            lo, hi = series.bounds(start_epoch, end_epoch)
+            return hi - lo
+
+    def frame(self, symbol, timeframe, start_epoch=None, end_epoch=None):
+        """DataFrame au format de DataFetcher.load_data (copie de l'intervalle seulement)."""
+        cols = self.arrays(symbol, timeframe, start_epoch, end_epoch)
+        if len(cols['epoch']) == 0:
+            return pd.DataFrame(columns=['symbol', 'timeframe', *CandleSeries.FIELDS])
+        df = pd.DataFrame({
+            'symbol': symbol,
+            'timeframe': timeframe,
+            **{f: cols[f].copy() for f in CandleSeries.FIELDS},
+        })
+        df['date'] = pd.to_datetime(df['epoch'], unit='s')
+        return df
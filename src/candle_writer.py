@@ -0,0 +1,107 @@
+# src/candle_writer.py
+import queue
+import threading
+from src.metrics import metrics
+
+
+class CandleWriter:
+    """
+    Thread d'écriture dédié à la table candles.
+    Une seule connexion SQLite (mode WAL) reste ouverte ; les batches reçus
+    via put() sont regroupés et validés en grosses transactions, pendant que
+    le code réseau continue de télécharger.
+    """
+
+    def __init__(self, db, commit_rows=50000, max_pending=64, on_commit=None):
+        self.db = db  # src.db.Database
+        self.commit_rows = commit_rows  # taille cible d'une transaction
+        self.on_commit = on_commit      # on_commit(rows) appelé après chaque COMMIT
+        self.rows_written = 0
+        self.commits = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=max_pending)  # contre-pression si le disque est lent
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="candle-writer", daemon=True)
+                self._thread.start()
+        return self
+
+    def put(self, rows):
+        """Ajoute un batch de tuples (symbol, tf, epoch, o, h, l, c) à écrire."""
+        if rows:
+            self.start()
+            self._queue.put(list(rows))
+
+    def flush(self):
+        """Attend que tout ce qui a été envoyé soit validé en base."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def pop_error(self):
+        """Dernière erreur d'écriture depuis l'appel précédent, remise à zéro (None si tout est validé)."""
+        with self._lock:
+            error, self.error = self.error, None
+        return error
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+
+    def _commit(self, conn, pending):
+        try:
+            with metrics.timer("writer_commit"):
+                self.db.bulk_ingest(pending, conn=conn)
+        except Exception as e:
+            with self._lock:
+                self.error = e
+            print(f"Erreur DB Save: {e}")
+            return
+        metrics.count("candles_written", len(pending))
+        self.rows_written += len(pending)
+        self.commits += 1
+        if self.on_commit:
+            # Les bougies sont validées : une erreur du hook (cache, granularités dérivées)
+            # n'est pas une erreur d'écriture et ne doit pas faire retélécharger l'intervalle
+            try:
+                self.on_commit(pending)
+            except Exception as e:
+                metrics.count("writer_hook_errors")
+                print(f"Erreur après écriture (on_commit): {e}")
+
+    def _run(self):
+        # Connexion réservée au writer, hors du pool de lecture
+        conn = self.db.open()
+        pending = []
+        n_items = 0  # éléments de la queue couverts par la transaction en cours
+        try:
+            while True:
+                try:
+                    # Tant qu'il y a du travail en attente, on n'attend pas plus de 50 ms
+                    item = self._queue.get(timeout=0.05 if pending else None)
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    n_items += 1
+                    break
+                if item:
+                    pending.extend(item)
+                    n_items += 1
+                if pending and (len(pending) >= self.commit_rows or self._queue.empty()):
+                    self._commit(conn, pending)
+                    pending = []
+                    for _ in range(n_items):
+                        self._queue.task_done()
+                    n_items = 0
+        finally:
+            if pending:
+                self._commit(conn, pending)
+            for _ in range(n_items):
+                self._queue.task_done()
+            self.db.discard(conn)
+
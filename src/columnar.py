@@ -0,0 +1,202 @@
+# src/columnar.py
+"""
+Instantanés colonnes (Arrow IPC non compressé) de la table candles,
+partitionnés par (symbol, timeframe) et lisibles par memory-map : les
+colonnes sont exposées en vues NumPy sans copie ni objets Python par ligne.
+La synchronisation depuis SQLite est incrémentale (epoch > dernier epoch exporté).
+"""
+import glob
+import os
+import shutil
+import threading
+import numpy as np
+import pyarrow as pa
+
+FIELDS = ('epoch', 'open', 'high', 'low', 'close')
+SCHEMA = pa.schema([('epoch', pa.int64())] + [(f, pa.float64()) for f in FIELDS[1:]])
+
+
+class ColumnarSnapshot:
+    def __init__(self, db, root, chunk_rows=500_000, max_parts=8):
+        self.db = db                # src.db.Database
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self.max_parts = max_parts  # au-delà, les fichiers d'une partition sont fusionnés
+        self._lock = threading.RLock()
+        self._maps = {}             # chemin -> (mtime, fichier mappé, colonnes NumPy), fermé quand le fichier disparaît
+
+    def partition_dir(self, symbol, timeframe):
+        return os.path.join(self.root, f"symbol={symbol}", f"timeframe={timeframe}")
+
+    def parts(self, symbol, timeframe):
+        """Fichiers de la partition, dans l'ordre des epochs."""
+        return sorted(glob.glob(os.path.join(self.partition_dir(symbol, timeframe), "part-*.arrow")))
+
+    def exists(self, symbol, timeframe):
+        return bool(self.parts(symbol, timeframe))
+
+    @staticmethod
+    def _part_range(path):
+        first, last = os.path.basename(path)[len("part-"):-len(".arrow")].split("-")
+        return int(first), int(last)
+
+    def last_epoch(self, symbol, timeframe):
+        parts = self.parts(symbol, timeframe)
+        return self._part_range(parts[-1])[1] if parts else None
+
+    # --- Écriture ---
+    def _write_part(self, symbol, timeframe, columns):
+        """Écrit un fichier (atomique via renommage) à partir de colonnes NumPy."""
+        directory = self.partition_dir(symbol, timeframe)
+        os.makedirs(directory, exist_ok=True)
+        epochs = columns['epoch']
+        name = f"part-{int(epochs[0]):012d}-{int(epochs[-1]):012d}.arrow"
+        path = os.path.join(directory, name)
+        table = pa.Table.from_arrays([pa.array(columns[f]) for f in FIELDS], schema=SCHEMA)
+        tmp = path + ".tmp"
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, SCHEMA) as writer:
+                writer.write_table(table, max_chunksize=len(epochs))
+        os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    def _rows_in_db(conn, symbol, timeframe, until):
+        """Bougies en base jusqu'au dernier epoch exporté (les écritures plus récentes ne comptent pas)."""
+        return conn.execute(
+            "SELECT COUNT(*) FROM candles WHERE symbol=? AND timeframe=? AND epoch <= ?", (symbol, timeframe, until)
+        ).fetchone()[0]
+
+    def _rows_in_snapshot(self, symbol, timeframe):
+        total = 0
+        for path in self.parts(symbol, timeframe):
+            with pa.memory_map(path, "r") as source:
+                reader = pa.ipc.open_file(source)
+                total += sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        return total
+
+    def sync(self, symbol, timeframe):
+        """
+        Exporte les bougies plus récentes que le dernier epoch de l'instantané.
+        Si des bougies plus anciennes ont été ajoutées (backfill), la partition est reconstruite.
+        Retourne le nombre de lignes exportées.
+        """
+        with self._lock:
+            last = self.last_epoch(symbol, timeframe)
+            exported = 0
+            with self.db.connection() as conn:
+                # Une seule transaction de lecture : export et comptage voient le même état de la base
+                conn.execute("BEGIN")
+                cursor = conn.execute(
+                    "SELECT epoch, open, high, low, close FROM candles "
+                    "WHERE symbol=? AND timeframe=? AND epoch > ? ORDER BY epoch ASC",
+                    (symbol, timeframe, -1 if last is None else last)
+                )
+                while True:
+                    rows = cursor.fetchmany(self.chunk_rows)
+                    if not rows:
+                        break
+                    block = np.asarray(rows, dtype=np.float64)
+                    columns = {f: block[:, i] for i, f in enumerate(FIELDS)}
+                    columns['epoch'] = columns['epoch'].astype(np.int64)
+                    self._write_part(symbol, timeframe, columns)
+                    exported += len(rows)
+                stale = last is not None and self._rows_in_snapshot(symbol, timeframe) != self._rows_in_db(
+                    conn, symbol, timeframe, self.last_epoch(symbol, timeframe))
+                conn.rollback()
+
+            if stale:
+                return self.rebuild(symbol, timeframe)
+            if len(self.parts(symbol, timeframe)) > self.max_parts:
+                self.compact(symbol, timeframe)
+            return exported
+
+    def rebuild(self, symbol, timeframe):
+        with self._lock:
+            self._release(self.parts(symbol, timeframe))
+            shutil.rmtree(self.partition_dir(symbol, timeframe), ignore_errors=True)
+            return self.sync(symbol, timeframe)
+
+    def drop(self, symbol, timeframe):
+        """Supprime la partition ; la prochaine sync la réexporte entièrement."""
+        with self._lock:
+            self._release(self.parts(symbol, timeframe))
+            shutil.rmtree(self.partition_dir(symbol, timeframe), ignore_errors=True)
+
+    def truncate(self, symbol, timeframe, epoch):
+        """
+        Retire de l'instantané les bougies d'epoch >= `epoch` (réécrites en base) :
+        les fichiers qui commencent après sont supprimés, celui qui chevauche est
+        réécrit sans sa fin. La prochaine sync réexporte seulement cette fin.
+        """
+        with self._lock:
+            for path in self.parts(symbol, timeframe):
+                first, last = self._part_range(path)
+                if last < epoch:
+                    continue
+                if first < epoch:
+                    cols = self._columns(path)
+                    keep = int(np.searchsorted(cols['epoch'], epoch, side='left'))
+                    self._write_part(symbol, timeframe, {f: np.array(arr[:keep]) for f, arr in cols.items()})
+                self._release([path])
+                os.remove(path)
+
+    def compact(self, symbol, timeframe):
+        """Fusionne les fichiers d'une partition en un seul (lecture ensuite 100% zero-copy)."""
+        with self._lock:
+            parts = self.parts(symbol, timeframe)
+            if len(parts) <= 1:
+                return
+            columns = self.arrays(symbol, timeframe)
+            merged = {f: np.array(columns[f]) for f in FIELDS}
+            self._release(parts)
+            for path in parts:
+                os.remove(path)
+            self._write_part(symbol, timeframe, merged)
+
+    # --- Lecture ---
+    def _columns(self, path):
+        """Colonnes (vues zero-copy) d'un fichier, mappé une seule fois tant qu'il existe."""
+        with self._lock:
+            mtime = os.stat(path).st_mtime_ns
+            entry = self._maps.get(path)
+            if entry is not None and entry[0] != mtime:
+                # Fichier remplacé par une autre instance (même nom, autre contenu)
+                self._release([path])
+                entry = None
+            if entry is None:
+                source = pa.memory_map(path, "r")
+                batch = pa.ipc.open_file(source).get_batch(0)
+                cols = {f: batch.column(i).to_numpy(zero_copy_only=True) for i, f in enumerate(FIELDS)}
+                entry = self._maps[path] = (mtime, source, cols)
+            return entry[2]
+
+    def _release(self, paths):
+        """Ferme les fichiers mappés avant suppression (les vues déjà rendues gardent leur région)."""
+        with self._lock:
+            for path in paths:
+                entry = self._maps.pop(path, None)
+                if entry is not None:
+                    entry[1].close()
+
+    def arrays(self, symbol, timeframe, start_epoch=None, end_epoch=None):
+        """
+        Colonnes NumPy de [start_epoch, end_epoch]. Vues en lecture seule sur le fichier
+        mappé quand la partition tient en un fichier, concaténation sinon.
+        """
+        pieces = []
+        for path in self.parts(symbol, timeframe):
+            first, last = self._part_range(path)
+            if (start_epoch is not None and last < start_epoch) or (end_epoch is not None and first > end_epoch):
+                continue
+            cols = self._columns(path)
+            epochs = cols['epoch']
+            lo = 0 if start_epoch is None else int(np.searchsorted(epochs, start_epoch, side='left'))
+            hi = len(epochs) if end_epoch is None else int(np.searchsorted(epochs, end_epoch, side='right'))
+            pieces.append({f: arr[lo:hi] for f, arr in cols.items()})
+
+        if not pieces:
+            return {f: np.empty(0, dtype=np.int64 if f == 'epoch' else np.float64) for f in FIELDS}
+        if len(pieces) == 1:
+            return pieces[0]
+        return {f: np.concatenate([p[f] for p in pieces]) for f in FIELDS}
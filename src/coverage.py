@@ -0,0 +1,85 @@
+# src/coverage.py
+"""
+Index de couverture : intervalles d'epochs déjà téléchargés par (symbol, timeframe).
+Permet de ne demander à l'API que les sous-intervalles manquants.
+"""
+import threading
+
+
+def _holds_candle(start, end, timeframe):
+    """Vrai si [start, end] contient au moins un epoch de bougie (multiple de timeframe)."""
+    return start + (-start) % timeframe <= end
+
+
+def merge_intervals(intervals, timeframe):
+    """Fusionne les intervalles [start, end] qui se chevauchent ou dont l'écart ne peut contenir aucune bougie."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and not _holds_candle(merged[-1][1] + 1, start - 1, timeframe):
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(iv) for iv in merged]
+
+
+def missing_ranges(covered, start_epoch, end_epoch, timeframe):
+    """Sous-intervalles de [start_epoch, end_epoch] non couverts (sans les trous qui ne peuvent contenir aucune bougie)."""
+    missing = []
+    cursor = start_epoch
+    for start, end in merge_intervals(covered, timeframe):
+        if end < cursor:
+            continue
+        if start > end_epoch:
+            break
+        if start > cursor and _holds_candle(cursor, start - 1, timeframe):
+            missing.append((cursor, start - 1))
+        cursor = max(cursor, end + 1)
+    if cursor <= end_epoch and _holds_candle(cursor, end_epoch, timeframe):
+        missing.append((cursor, end_epoch))
+    return missing
+
+
+class CoverageIndex:
+    def __init__(self, db):
+        # db : src.db.Database
+        self.db = db
+        self._lock = threading.Lock()
+        self.init_table()
+
+    def init_table(self):
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS coverage (
+                symbol TEXT,
+                timeframe INTEGER,
+                start_epoch INTEGER,
+                end_epoch INTEGER
+            )
+        ''')
+        self.db.execute('CREATE INDEX IF NOT EXISTS idx_coverage ON coverage (symbol, timeframe)')
+
+    def covered(self, symbol, timeframe):
+        return self.db.query(
+            "SELECT start_epoch, end_epoch FROM coverage WHERE symbol=? AND timeframe=? ORDER BY start_epoch",
+            (symbol, timeframe)
+        )
+
+    def missing(self, symbol, timeframe, start_epoch, end_epoch):
+        return missing_ranges(self.covered(symbol, timeframe), start_epoch, end_epoch, timeframe)
+
+    def add(self, symbol, timeframe, start_epoch, end_epoch):
+        """Déclare [start_epoch, end_epoch] comme téléchargé (fusion avec l'existant)."""
+        if end_epoch < start_epoch:
+            return
+        with self._lock:
+            with self.db.connection() as conn:
+                with conn:
+                    rows = conn.execute(
+                        "SELECT start_epoch, end_epoch FROM coverage WHERE symbol=? AND timeframe=?",
+                        (symbol, timeframe)
+                    ).fetchall()
+                    merged = merge_intervals(rows + [(start_epoch, end_epoch)], timeframe)
+                    conn.execute("DELETE FROM coverage WHERE symbol=? AND timeframe=?", (symbol, timeframe))
+                    conn.executemany(
+                        "INSERT INTO coverage VALUES (?,?,?,?)",
+                        [(symbol, timeframe, s, e) for s, e in merged]
+                    )
@@ -1,26 +1,50 @@
 import json
+import os
 import ssl
-import sqlite3
+import threading
 import time
 import websocket
 import pandas as pd
 from datetime import datetime
 import streamlit as st
 from config import APP_ID, WS_URL, DB_PATH
+from src.db import Database
+from src.candle_store import CandleStore
+from src.columnar import ColumnarSnapshot
+from src.coverage import CoverageIndex
+from src.candle_writer import CandleWriter
+from src.backfill import BackfillEngine, BackfillJob, overall_progress
+from src.resample import Resampler
+from src.metrics import metrics, timed
 
 class DataFetcher:
-    def __init__(self):
+    def __init__(self, db_path=DB_PATH, ws_url=None, columnar_path=None):
         self.ws = None
+        self.db_path = db_path
+        self.ws_url = ws_url or f"{WS_URL}?app_id={APP_ID}"
+        # Connexions SQLite persistantes (pool, mode WAL) partagées par tous les composants
+        self.db = Database(db_path)
         self.init_db()
-
-    def get_db_connection(self):
-        return sqlite3.connect(DB_PATH, timeout=10)
+        # Intervalles déjà téléchargés, par paire
+        self.coverage = CoverageIndex(self.db)
+        # Instantanés colonnes (Arrow, memory-map) à côté de la base SQLite
+        self.columnar = ColumnarSnapshot(
+            self.db, columnar_path or os.path.join(os.path.dirname(db_path) or '.', 'columnar')
+        )
+        # Cache mémoire de la table candles (chargement par delta)
+        self.store = CandleStore(self.db, snapshot=self.columnar)
+        # 5m / 15m / 1h calculées depuis les bougies 60 s à chaque écriture de la base
+        self.resampler = Resampler(self.db)
+        # Écritures du téléchargement : thread dédié, connexion WAL persistante
+        self.writer = CandleWriter(self.db, on_commit=self._mark_written)
+        self.request_pause = 0.2  # pause anti-ban entre deux requêtes (secondes)
+        # Instance partagée entre sessions Streamlit : un seul téléchargement à la fois.
+        # Une session qui attend trouve ensuite l'intervalle couvert et ne refait aucune requête.
+        self._fetch_lock = threading.RLock()
 
     def init_db(self):
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
         # On ajoute une contrainte UNIQUE pour éviter les doublons
-        cursor.execute('''
+        self.db.execute('''
             CREATE TABLE IF NOT EXISTS candles (
                 symbol TEXT,
                 timeframe INTEGER,
@@ -32,83 +56,190 @@ class DataFetcher:
                 PRIMARY KEY (symbol, timeframe, epoch)
             )
         ''')
-        conn.commit()
-        conn.close()
 
     def connect_ws(self):
         ssl_context = ssl.create_default_context()
         ssl_context.check_hostname = False
         ssl_context.verify_mode = ssl.CERT_NONE
-        try:
-            full_url = f"{WS_URL}?app_id={APP_ID}"
-            self.ws = websocket.create_connection(
-                full_url, sslopt={"cert_reqs": ssl.CERT_NONE}, timeout=10
-            )
-            return True
-        except Exception as e:
-            st.error(f"Erreur Connexion WebSocket: {e}")
-            return False
+        with self._fetch_lock:
+            try:
+                if self.ws is not None:
+                    self.ws.close()  # une seule connexion de téléchargement par processus
+                # Validation UTF-8 de websocket-client en Python pur : ~0,3 s par réponse de 5000 bougies.
+                # json.loads décode de toute façon le message.
+                self.ws = websocket.create_connection(
+                    self.ws_url, sslopt={"cert_reqs": ssl.CERT_NONE}, timeout=10, skip_utf8_validation=True
+                )
+                return True
+            except Exception as e:
+                st.error(f"Erreur Connexion WebSocket: {e}")
+                return False
 
     def count_period(self, symbol, timeframe, start_dt, end_dt):
         """Compte les bougies existantes DANS l'intervalle choisi."""
         try:
             start_epoch = int(start_dt.timestamp())
             end_epoch = int(end_dt.timestamp())
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
-            query = """
-                SELECT COUNT(*) FROM candles 
-                WHERE symbol=? AND timeframe=? 
-                AND epoch >= ? AND epoch <= ?
-            """
-            cursor.execute(query, (symbol, timeframe, start_epoch, end_epoch))
-            count = cursor.fetchone()[0]
-            conn.close()
-            return count
+            return self.store.count(symbol, timeframe, start_epoch, end_epoch)
         except Exception:
             return 0
 
-    def load_data(self, symbol, timeframe):
-        conn = self.get_db_connection()
-        df = pd.read_sql(
-            "SELECT * FROM candles WHERE symbol=? AND timeframe=? ORDER BY epoch ASC",
-            conn, params=(symbol, timeframe)
-        )
-        conn.close()
-        if not df.empty:
-            df['date'] = pd.to_datetime(df['epoch'], unit='s')
+    @timed("load_data")
+    def load_data(self, symbol, timeframe, start_dt=None, end_dt=None, columnar=False):
+        """
+        Bougies de la paire, éventuellement limitées à [start_dt, end_dt].
+        columnar=True : l'instantané Arrow est synchronisé puis lu par memory-map,
+        les colonnes du DataFrame sont des vues sans copie (lecture seule).
+        """
+        start_epoch = int(start_dt.timestamp()) if start_dt is not None else None
+        end_epoch = int(end_dt.timestamp()) if end_dt is not None else None
+        if not columnar:
+            return self.store.frame(symbol, timeframe, start_epoch, end_epoch)
+
+        self.columnar.sync(symbol, timeframe)
+        cols = self.columnar.arrays(symbol, timeframe, start_epoch, end_epoch)
+        if len(cols['epoch']) == 0:
+            return pd.DataFrame(columns=['symbol', 'timeframe', *cols])
+        df = pd.DataFrame({'symbol': symbol, 'timeframe': timeframe, **cols}, copy=False)
+        df['date'] = pd.to_datetime(df['epoch'], unit='s')
         return df
 
+    def candles_since(self, symbol, timeframe, epoch):
+        """Colonnes NumPy des bougies plus récentes que `epoch` (pour le live)."""
+        return self.store.since(symbol, timeframe, epoch)
+
+    @timed("save_to_db")
     def save_to_db(self, data):
         if not data: return
         try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
-            cursor.executemany('INSERT OR IGNORE INTO candles VALUES (?,?,?,?,?,?,?)', data)
-            conn.commit()
-            conn.close()
+            self.db.bulk_ingest(data)
+            self._mark_written(data)
         except Exception as e:
             print(f"Erreur DB Save: {e}")
 
+    def bulk_ingest(self, rows, chunk_size=100000):
+        """
+        Import massif (millions de bougies, générateur accepté) en une transaction.
+        Le cache mémoire des paires concernées est ensuite rechargé.
+        """
+        keys = set()
+        spans = {}  # symbol -> [min, max] des epochs de base importés
+
+        def tracked(it):
+            for row in it:
+                keys.add((row[0], row[1]))
+                if row[1] == self.resampler.base:
+                    span = spans.setdefault(row[0], [row[2], row[2]])
+                    span[0], span[1] = min(span[0], row[2]), max(span[1], row[2])
+                yield row
+
+        inserted = self.db.bulk_ingest(tracked(rows), chunk_size)
+        for symbol, (lo, hi) in spans.items():
+            for tf in self.resampler.timeframes:
+                keys.add((symbol, tf))
+            self.resampler.update(symbol, lo, hi)
+        for symbol, timeframe in keys:
+            self.store.invalidate(symbol, timeframe)
+        return inserted
+
+    def _mark_written(self, data):
+        """
+        Prévient le cache mémoire des bougies écrites (epoch minimal par paire) et
+        recalcule les granularités dérivées couvertes par les bougies de base écrites.
+        """
+        oldest = {}
+        spans = {}
+        for row in data:
+            key = (row[0], row[1])
+            oldest[key] = min(row[2], oldest.get(key, row[2]))
+            if row[1] == self.resampler.base:
+                span = spans.setdefault(row[0], [row[2], row[2]])
+                span[0], span[1] = min(span[0], row[2]), max(span[1], row[2])
+        for (symbol, timeframe), epoch in oldest.items():
+            self.store.mark_written(symbol, timeframe, epoch)
+        for symbol, (lo, hi) in spans.items():
+            self._mark_derived(symbol, self.resampler.update(symbol, lo, hi))
+
+    def _mark_derived(self, symbol, rows):
+        """Barres dérivées nouvelles ou modifiées : cache mémoire et instantané colonnes à jour."""
+        oldest = {}
+        for row in rows:
+            oldest[row[1]] = min(row[2], oldest.get(row[1], row[2]))
+        for timeframe, epoch in oldest.items():
+            self.store.mark_written(symbol, timeframe, epoch)
+            last = self.columnar.last_epoch(symbol, timeframe)
+            if last is not None and epoch <= last:
+                # Une barre déjà exportée a changé (INSERT OR REPLACE) : seule la fin est réexportée
+                self.columnar.truncate(symbol, timeframe, epoch)
+
+    def fetch_timeframe(self, timeframe):
+        """Granularité à télécharger pour obtenir `timeframe` (la base si elle est dérivable)."""
+        return self.resampler.base if self.resampler.derives(timeframe) else timeframe
+
+    def covered_until(self, end_epoch, timeframe):
+        """Fin de couverture enregistrable : jamais au-delà de la dernière bougie clôturée."""
+        now = int(time.time())
+        return min(end_epoch, now - now % timeframe - 1)
+
     def fetch_history_reverse(self, symbol, timeframe_sec, start_dt, end_dt, progress_bar):
         """
         Récupère l'historique en partant de la FIN vers le DÉBUT (Reverse).
         C'est plus fiable pour éviter les blocages sur les dates vides.
+        Seuls les intervalles absents de l'index de couverture sont demandés.
+        Une granularité dérivée (5m, 15m, 1h) est obtenue en téléchargeant la base 60 s.
         """
-        if not self.ws or not self.ws.connected:
-            if not self.connect_ws(): return 0
+        with self._fetch_lock:
+            timeframe_sec = self.fetch_timeframe(timeframe_sec)
+            start_epoch = int(start_dt.timestamp())
+            end_epoch = int(end_dt.timestamp())
+            covered_end = self.covered_until(end_epoch, timeframe_sec)
+
+            missing = self.coverage.missing(symbol, timeframe_sec, start_epoch, end_epoch)
+            if not missing:
+                progress_bar.progress(1.0, text="✅ Déjà à jour, aucune bougie à télécharger.")
+                return 0
+
+            if not self.ws or not self.ws.connected:
+                if not self.connect_ws(): return 0
+
+            st.info(f"🔙 Démarrage récupération inversée (du {end_dt} vers {start_dt}), {len(missing)} intervalle(s) manquant(s)...")
 
-        start_epoch = int(start_dt.timestamp())
-        end_epoch = int(end_dt.timestamp())
-        
+            # Pour la barre de progression (inversée visuellement)
+            total_duration = sum(e - s for s, e in missing) or 1
+            done_duration = 0
+            total_fetched = 0
+
+            # Du plus récent au plus ancien
+            for range_start, range_end in reversed(missing):
+                fetched, reached = self._fetch_range(
+                    symbol, timeframe_sec, range_start, range_end, progress_bar,
+                    total_fetched, done_duration, total_duration
+                )
+                total_fetched += fetched
+                done_duration += range_end - range_start
+                # La couverture n'est enregistrée qu'une fois les bougies en base
+                self.writer.flush()
+                error = self.writer.pop_error()
+                if error is not None:
+                    # Écriture échouée : l'intervalle reste manquant et sera redemandé
+                    st.error(f"Erreur écriture base: {error}")
+                    continue
+                # On n'enregistre que la partie réellement parcourue
+                self.coverage.add(symbol, timeframe_sec, reached, min(range_end, covered_end))
+
+            progress_bar.progress(1.0, text=f"✅ Terminé ! {total_fetched} bougies sauvegardées.")
+            return total_fetched
+
+    def _fetch_range(self, symbol, timeframe_sec, start_epoch, end_epoch, progress_bar,
+                     fetched_before=0, done_duration=0, total_duration=1):
+        """
+        Télécharge [start_epoch, end_epoch] de la fin vers le début.
+        Retourne (bougies sauvegardées, epoch le plus ancien atteint).
+        """
         # Le curseur commence à la fin
         current_request_end = end_epoch
         total_fetched = 0
-        
-        # Pour la barre de progression (inversée visuellement)
-        total_duration = end_epoch - start_epoch
-        
-        st.info(f"🔙 Démarrage récupération inversée (du {end_dt} vers {start_dt})...")
+        reached = end_epoch + 1
 
         while current_request_end > start_epoch:
             # On demande 5000 bougies qui se terminent à 'current_request_end'
@@ -121,9 +252,11 @@ class DataFetcher:
                 "granularity": timeframe_sec
             }
             
+            batch_started = time.perf_counter()
             try:
                 self.ws.send(json.dumps(req))
-                resp = self.ws.recv()
+                with metrics.timer("ws_recv"):
+                    resp = self.ws.recv()
                 data = json.loads(resp)
 
                 if 'error' in data:
@@ -135,6 +268,7 @@ class DataFetcher:
                 if not candles:
                     # Si vide, on essaie de sauter une semaine en arrière pour trouver des données
                     current_request_end -= (86400 * 7)
+                    reached = max(start_epoch, current_request_end + 1)
                     continue
 
                 # Filtrage : On ne garde que ce qui est >= start_epoch
@@ -149,15 +283,20 @@ class DataFetcher:
                             c['open'], c['high'], c['low'], c['close']
                         ))
 
-                self.save_to_db(batch_data)
+                # Écriture déléguée au thread writer : on enchaîne directement sur la requête suivante
+                self.writer.put(batch_data)
                 total_fetched += len(batch_data)
+                metrics.count("candles_fetched", len(batch_data))
+                # Lot complet : requête, réponse, filtrage et mise en file d'écriture
+                metrics.observe("fetch_batch", time.perf_counter() - batch_started)
+                reached = max(start_epoch, oldest_candle_epoch)
 
                 # --- MISE A JOUR BARRE PROGRESSION ---
                 # Plus oldest_candle_epoch se rapproche de start_epoch, plus on a fini.
-                covered = end_epoch - oldest_candle_epoch
+                covered = done_duration + (end_epoch - max(oldest_candle_epoch, start_epoch))
                 prog = min(1.0, max(0.0, covered / total_duration))
                 current_date_str = datetime.fromtimestamp(oldest_candle_epoch).strftime('%Y-%m-%d')
-                progress_bar.progress(prog, text=f"📥 {total_fetched} bougies... (Arrivé au : {current_date_str})")
+                progress_bar.progress(prog, text=f"📥 {fetched_before + total_fetched} bougies... (Arrivé au : {current_date_str})")
 
                 # --- CONDITION DE SORTIE ---
                 # Si la plus vieille bougie reçue est déjà avant notre date de début, on a tout.
@@ -168,12 +307,63 @@ class DataFetcher:
                 # On demande la suite en finissant juste avant la plus vieille bougie reçue
                 current_request_end = oldest_candle_epoch - 1
                 
-                time.sleep(0.2) # Pause anti-ban
+                time.sleep(self.request_pause) # Pause anti-ban
 
             except Exception as e:
                 st.error(f"Erreur fetch loop: {e}")
                 self.connect_ws()
                 time.sleep(1)
 
-        progress_bar.progress(1.0, text=f"✅ Terminé ! {total_fetched} bougies sauvegardées.")
-        return total_fetched
+        if current_request_end <= start_epoch:
+            reached = start_epoch
+        return total_fetched, reached
+
+    def fetch_history_all(self, symbols, timeframes, start_dt, end_dt, progress_bar=None,
+                          connections=3, rate=5.0):
+        """
+        Télécharge en parallèle toutes les paires (symbol, timeframe) sur [start_dt, end_dt]
+        via un pool de connexions WebSocket. Un job est créé par intervalle manquant
+        (index de couverture). Retourne la liste des BackfillJob.
+        Les granularités dérivées ne sont pas téléchargées : seule la base l'est, une fois.
+        """
+        with self._fetch_lock:
+            start_epoch = int(start_dt.timestamp())
+            end_epoch = int(end_dt.timestamp())
+            timeframes = sorted({self.fetch_timeframe(tf) for tf in timeframes})
+            jobs = [
+                BackfillJob(s, tf, range_start, range_end)
+                for s in symbols for tf in timeframes
+                for range_start, range_end in self.coverage.missing(s, tf, start_epoch, end_epoch)
+            ]
+            if not jobs:
+                if progress_bar is not None:
+                    progress_bar.progress(1.0, text="✅ Déjà à jour, aucune bougie à télécharger.")
+                return jobs
+
+            def on_progress(job, all_jobs):
+                if progress_bar is not None:
+                    done = sum(j.status == "done" for j in all_jobs)
+                    fetched = sum(j.fetched for j in all_jobs)
+                    progress_bar.progress(
+                        overall_progress(all_jobs),
+                        text=f"📥 {fetched} bougies... ({done}/{len(all_jobs)} intervalles terminés)"
+                    )
+
+            engine = BackfillEngine(
+                self.writer.put, url=self.ws_url, connections=connections, rate=rate, on_progress=on_progress
+            )
+            engine.run_sync(jobs)
+            self.writer.flush()
+            error = self.writer.pop_error()
+            if error is not None:
+                # Écriture échouée (lot non attribuable à un job) : aucun intervalle n'est marqué couvert
+                print(f"Erreur écriture base: {error}")
+                for job in jobs:
+                    job.status, job.error = "error", str(error)
+                return jobs
+
+            for job in jobs:
+                # Job interrompu : seule la partie déjà parcourue (cursor -> fin) est couverte
+                reached = job.start_epoch if job.status == "done" else job.cursor + 1
+                self.coverage.add(job.symbol, job.timeframe, reached, self.covered_until(job.end_epoch, job.timeframe))
+            return jobs
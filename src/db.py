@@ -0,0 +1,99 @@
+# src/db.py
+import itertools
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+INSERT_CANDLES = 'INSERT OR IGNORE INTO candles VALUES (?,?,?,?,?,?,?)'
+
+
+class Database:
+    """
+    Gestionnaire de connexions SQLite partagé entre threads.
+    - Les connexions restent ouvertes et sont prêtées depuis un pool (pas de connect/close par requête).
+    - Mode WAL : les lectures de l'UI ne sont pas bloquées par l'écriture du téléchargement.
+    - bulk_ingest() insère des millions de bougies en une transaction, par paquets.
+    """
+
+    def __init__(self, db_path, pool_size=4, cache_size_kb=65536, mmap_size=256 * 1024 * 1024):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self._pool = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Nouvelle connexion réglée (WAL, synchronous=NORMAL, cache). Le pool s'en sert aussi."""
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kb}")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Prête une connexion du pool (créée à la demande) puis la rend."""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self.open()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._pool.qsize() < self.pool_size:
+                self._pool.put(conn)
+            else:
+                self.discard(conn)
+
+    def discard(self, conn):
+        """Ferme une connexion ouverte par open() et l'oublie (close_all ne la voit plus)."""
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        conn.close()
+
+    def query(self, sql, params=()):
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def execute(self, sql, params=()):
+        with self.connection() as conn:
+            with conn:
+                conn.execute(sql, params)
+
+    def bulk_ingest(self, rows, chunk_size=100000, conn=None):
+        """
+        Insère des tuples (symbol, tf, epoch, o, h, l, c) en une seule transaction.
+        `rows` peut être un générateur : il est consommé par paquets de chunk_size.
+        Retourne le nombre de lignes réellement insérées.
+        """
+        if conn is None:
+            with self.connection() as pooled:
+                return self.bulk_ingest(rows, chunk_size, pooled)
+
+        before = conn.total_changes
+        it = iter(rows)
+        with conn:
+            while True:
+                chunk = list(itertools.islice(it, chunk_size))
+                if not chunk:
+                    break
+                conn.executemany(INSERT_CANDLES, chunk)
+        return conn.total_changes - before
+
+    def close_all(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        while not self._pool.empty():
+            self._pool.get_nowait()
+        for conn in conns:
+            conn.close()
@@ -1,51 +1,232 @@
 import asyncio
-import websockets
+import concurrent.futures
+import itertools
 import json
+import threading
+import time
+import websockets
 import config
 
 class TradeExecutor:
-    def __init__(self, token):
+    """
+    Session d'exécution persistante : une connexion WebSocket ouverte et autorisée
+    une seule fois, réutilisée par tous les ordres.
+    - Chaque requête porte un req_id ; une tâche de lecture unique route les réponses
+      vers la requête correspondante, plusieurs ordres peuvent donc être en vol.
+    - Chaque contrat acheté est suivi par un abonnement proposal_open_contract :
+      `contracts` garde son dernier état, `active_contracts` les contrats non réglés.
+    - start() fait tourner la session dans un thread dédié pour le code synchrone (Streamlit).
+    """
+
+    def __init__(self, token, url=None, timeout=10.0):
         self.token = token
-        self.api_url = "wss://ws.derivws.com/websockets/v3?app_id=" + config.APP_ID
+        self.api_url = url or f"{config.WS_URL}?app_id={config.APP_ID}"
+        self.timeout = timeout
         self.active_contracts = []
+        self.contracts = {}       # contract_id -> dernier proposal_open_contract
+        self.account = None       # réponse authorize
+        self.on_contract = []     # callbacks(état) à chaque mise à jour de contrat
+        self.connections = 0
+        self._ws = None
+        self._reader = None
+        self._pending = {}        # req_id -> Future
+        self._req_ids = itertools.count(1)
+        self._connect_lock = None
+        self._loop = None
+        self._thread = None
+
+    # --- Connexion ---
+    @property
+    def connected(self):
+        return self._ws is not None
+
+    async def connect(self):
+        """Ouvre et autorise la connexion si besoin (idempotent)."""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._ws is not None:
+                return self.account
+            ws = await websockets.connect(self.api_url, max_size=None)
+            self._ws = ws
+            self.connections += 1
+            self._reader = asyncio.ensure_future(self._read(ws))
+            try:
+                data = await self._send({"authorize": self.token})
+            except BaseException:
+                # Délai dépassé, connexion perdue... : pas de session non autorisée en place
+                await self.close()
+                raise
+            if "error" in data:
+                await self.close()
+                raise PermissionError(data["error"]["message"])
+            self.account = data["authorize"]
+            # Après une reconnexion, les contrats encore ouverts sont ré-abonnés
+            for contract_id in list(self.active_contracts):
+                asyncio.ensure_future(self._subscribe_contract(contract_id))
+            return self.account
 
+    async def close(self):
+        ws, self._ws = self._ws, None
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if ws is not None:
+            await ws.close()
+        self._fail_pending(ConnectionError("Session fermée"))
+
+    async def _read(self, ws):
+        """Unique lecteur de la connexion : route chaque message vers son req_id."""
+        try:
+            async for message in ws:
+                data = json.loads(message)
+                future = self._pending.pop(data.get("req_id"), None)
+                if future is not None and not future.done():
+                    future.set_result(data)
+                if data.get("msg_type") == "proposal_open_contract" and "proposal_open_contract" in data:
+                    self._update_contract(data["proposal_open_contract"])
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if self._ws is ws:
+                self._ws = None
+            self._fail_pending(ConnectionError("Connexion perdue"))
+
+    def _fail_pending(self, error):
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def _send(self, payload):
+        """Envoie une requête sur la connexion courante et attend la réponse de même req_id."""
+        req_id = next(self._req_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = future
+        try:
+            await self._ws.send(json.dumps({**payload, "req_id": req_id}))
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(req_id, None)
+
+    async def request(self, payload):
+        """Requête sur la session (connexion + autorisation à la demande)."""
+        await self.connect()
+        return await self._send(payload)
+
+    # --- Ordres ---
     async def send_order(self, symbol, contract_type, amount, duration, duration_unit="m"):
         """
         Envoie un ordre d'achat (CALL ou PUT).
         duration_unit: 'm' pour minutes, 't' pour ticks, 's' pour secondes.
         """
-        async with websockets.connect(self.api_url) as websocket:
-            # 1. Authentification
-            await websocket.send(json.dumps({"authorize": self.token}))
-            auth_response = await websocket.recv()
-            
-            # 2. Envoi de l'ordre
-            buy_request = {
-                "buy": 1,
-                "price": amount,
-                "parameters": {
-                    "amount": amount,
-                    "basis": "stake",
-                    "contract_type": contract_type, # 'CALL' ou 'PUT'
-                    "currency": "USD",
-                    "duration": duration,
-                    "duration_unit": duration_unit,
-                    "symbol": symbol
-                }
+        buy_request = {
+            "buy": 1,
+            "price": amount,
+            "parameters": {
+                "amount": amount,
+                "basis": "stake",
+                "contract_type": contract_type, # 'CALL' ou 'PUT'
+                "currency": "USD",
+                "duration": duration,
+                "duration_unit": duration_unit,
+                "symbol": symbol
             }
-            
-            await websocket.send(json.dumps(buy_request))
-            response = await websocket.recv()
-            data = json.loads(response)
+        }
+        t0 = time.perf_counter()
+        try:
+            data = await self.request(buy_request)
+        except (OSError, PermissionError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+            return {"status": "error", "message": str(e) or type(e).__name__}
+        latency_ms = (time.perf_counter() - t0) * 1000
 
-            if "error" in data:
-                return {"status": "error", "message": data["error"]["message"]}
-            
-            # Stockage de l'ID pour suivi multi-positions
-            contract_id = data["buy"]["contract_id"]
-            self.active_contracts.append(contract_id)
-            
-            return {"status": "success", "contract_id": contract_id}
+        if "error" in data:
+            return {"status": "error", "message": data["error"]["message"], "latency_ms": latency_ms}
+
+        # Stockage de l'ID pour suivi multi-positions
+        contract_id = data["buy"]["contract_id"]
+        self.active_contracts.append(contract_id)
+        self.contracts[contract_id] = {"contract_id": contract_id, "status": "open"}
+        # Suivi en tâche de fond : l'ordre ne paie pas l'aller-retour de l'abonnement
+        asyncio.ensure_future(self._subscribe_contract(contract_id))
+
+        return {"status": "success", "contract_id": contract_id,
+                "buy_price": data["buy"].get("buy_price"), "latency_ms": latency_ms}
+
+    async def send_orders(self, orders):
+        """Envoie plusieurs ordres en parallèle ; orders = [dict(symbol, contract_type, amount, duration[, duration_unit])]."""
+        return await asyncio.gather(*(self.send_order(**order) for order in orders))
+
+    async def _subscribe_contract(self, contract_id):
+        try:
+            data = await self._send({"proposal_open_contract": 1, "contract_id": contract_id, "subscribe": 1})
+        except Exception:
+            return  # ré-abonné à la prochaine connexion
+        if "error" in data and contract_id in self.active_contracts:
+            self.active_contracts.remove(contract_id)
+
+    def _update_contract(self, state):
+        contract_id = state.get("contract_id")
+        if contract_id is None:
+            return
+        self.contracts[contract_id] = state
+        if state.get("is_sold") and contract_id in self.active_contracts:
+            self.active_contracts.remove(contract_id)
+        for callback in self.on_contract:
+            callback(state)
+
+    # --- Thread dédié (code synchrone) ---
+    def start(self):
+        """Lance la boucle asyncio de la session dans un thread (une seule fois)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="trade-executor", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, coro):
+        """Planifie une coroutine de la session depuis un autre thread, sans attendre (concurrent Future)."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout=None):
+        """Exécute une coroutine de la session depuis un autre thread et attend son résultat."""
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        if self._thread is not None and self._thread.is_alive():
+            self.run(self.close(), 10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(10)
+        self._thread = None
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+def get_executor(token=None, url=None):
+    """Session partagée du processus pour un jeton (créée et démarrée au premier appel)."""
+    token = token if token is not None else config.DERIV_TOKEN
+    with _executors_lock:
+        executor = _executors.get((token, url))
+        if executor is None:
+            executor = _executors[(token, url)] = TradeExecutor(token, url).start()
+        return executor
+
+def submit_trade(symbol, action, amount=1, duration=1):
+    """
+    Comme execute_trade, sans attendre la réponse : retourne un concurrent.futures.Future
+    du même dict résultat. Les ordres partent sur la boucle de la session persistante.
+    """
+    contract_type = "CALL" if "ACHAT" in action else "PUT"
+    if not config.DERIV_TOKEN:
+        future = concurrent.futures.Future()
+        future.set_result({"status": "error", "message": "DERIV_TOKEN non configuré"})
+        return future
+
+    # Session persistante : pas de nouvelle boucle, connexion ni authorize par ordre
+    executor = get_executor()
+    return executor.submit(executor.send_order(symbol, contract_type, amount, duration))
 
 # Fonction utilitaire pour lancer l'ordre depuis main.py ou trader.py
 def execute_trade(symbol, action, amount=1, duration=1):
@@ -53,11 +234,4 @@ def execute_trade(symbol, action, amount=1, duration=1):
     Traduit l'action de l'IA en ordre réel.
     action: '🚀 SIGNAL ACHAT (CALL)' ou '📉 SIGNAL VENTE (PUT)'
     """
-    contract_type = "CALL" if "ACHAT" in action else "PUT"
-    
-    # Création d'une boucle asynchrone pour l'envoi
-    executor = TradeExecutor(config.DERIV_TOKEN)
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    result = loop.run_until_complete(executor.send_order(symbol, contract_type, amount, duration))
-    return result
\ No newline at end of file
+    return submit_trade(symbol, action, amount, duration).result()
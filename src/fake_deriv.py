@@ -0,0 +1,311 @@
+# src/fake_deriv.py
+"""
+Serveur WebSocket local qui imite l'API Deriv (ticks_history, ticks, ping,
+authorize, buy, proposal_open_contract) pour les tests et les benchmarks
+hors-ligne. Les prix sont déterministes : une même bougie est identique
+d'une requête à l'autre, l'issue d'un contrat aussi.
+"""
+import asyncio
+import itertools
+import json
+import threading
+import time
+import zlib
+import numpy as np
+import websockets
+
+
+# Epoch "courant" fixe des tests et benchmarks (minuit UTC) : mêmes bougies d'une exécution à l'autre
+FIXED_NOW = 1_700_000_000 - 1_700_000_000 % 86400
+
+
+class NullProgress:
+    """Barre de progression muette pour fetch_history_* hors Streamlit."""
+
+    def progress(self, value, text=None):
+        pass
+
+
+def synthetic_price(symbol, epochs):
+    """Prix déterministe (vectorisé) d'un symbole aux epochs donnés."""
+    e = np.asarray(epochs, dtype=np.float64)
+    base = 1000 + zlib.crc32(symbol.encode()) % 500
+    # Bruit pseudo-aléatoire reproductible dérivé de l'epoch
+    noise = ((e * 2654435761) % 4294967296) / 4294967296 - 0.5
+    return base + 20 * np.sin(2 * np.pi * e / 86400) + 3 * np.sin(2 * np.pi * e / 3571) + noise
+
+
+class FakeDerivServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, history_start=0, now=None,
+                 tick_interval=1.0, concurrent=False, contract_time_scale=1.0, balance=10000.0):
+        self.host = host
+        self.port = port
+        self.latency = latency              # délai artificiel par réponse (secondes)
+        self.history_start = history_start  # pas de bougies avant cet epoch
+        self.now = now                      # epoch "courant" (None = horloge réelle)
+        self.tick_interval = tick_interval  # période d'émission des ticks (secondes)
+        self.concurrent = concurrent        # True : requêtes d'une connexion traitées en parallèle (comme Deriv)
+        self.contract_time_scale = contract_time_scale  # durée réelle d'un contrat = durée * échelle
+        self.balance = balance
+        self.contracts = {}                 # contract_id -> contrat acheté
+        self.authorizations = 0
+        self._authorized = set()
+        self._contract_ids = itertools.count(1000)
+        self.ticks_sent = 0
+        self._streams = {}                  # connexion -> tâches d'abonnement
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = 0
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    # --- Données ---
+    def current_epoch(self):
+        if self.now is not None:
+            return self.now
+        return int(time.time())
+
+    def candles(self, symbol, granularity, end, count, start=None):
+        end = min(int(end), self.current_epoch())
+        last = end - end % granularity
+        first = last - (count - 1) * granularity
+        first = max(first, self.history_start - self.history_start % granularity)
+        if start is not None:
+            first = max(first, int(start) + (-int(start)) % granularity)
+        if first > last:
+            return []
+        epochs = np.arange(first, last + 1, granularity, dtype=np.int64)
+        opens = synthetic_price(symbol, epochs)
+        closes = synthetic_price(symbol, epochs + granularity - 1)
+        mid = synthetic_price(symbol, epochs + granularity // 2)
+        highs = np.maximum(np.maximum(opens, closes), mid) + 0.1
+        lows = np.minimum(np.minimum(opens, closes), mid) - 0.1
+        return [
+            {"epoch": int(e), "open": round(o, 4), "high": round(h, 4), "low": round(l, 4), "close": round(c, 4)}
+            for e, o, h, l, c in zip(epochs.tolist(), opens.tolist(), highs.tolist(), lows.tolist(), closes.tolist())
+        ]
+
+    # --- Protocole ---
+    async def handle_request(self, ws, req):
+        """Construit la réponse à une requête (None = pas de réponse)."""
+        if "ticks_history" in req:
+            end = req.get("end", "latest")
+            end = self.current_epoch() if end == "latest" else int(end)
+            candles = self.candles(
+                req["ticks_history"], int(req.get("granularity", 60)), end,
+                int(req.get("count", 5000)), req.get("start")
+            )
+            return {"msg_type": "candles", "candles": candles}
+        if "ticks" in req:
+            symbols = req["ticks"] if isinstance(req["ticks"], list) else [req["ticks"]]
+            for symbol in symbols:
+                self._streams.setdefault(ws, []).append(asyncio.create_task(self._stream_ticks(ws, symbol, req)))
+            return None
+        if "forget_all" in req:
+            self._cancel_streams(ws)
+            return {"msg_type": "forget_all", "forget_all": []}
+        if "ping" in req:
+            return {"msg_type": "ping", "ping": "pong"}
+        if "authorize" in req:
+            if not req["authorize"]:
+                return {"msg_type": "authorize", "error": {"code": "InvalidToken", "message": "The token is invalid."}}
+            self.authorizations += 1
+            self._authorized.add(ws)
+            return {"msg_type": "authorize",
+                    "authorize": {"loginid": "VRTC0000001", "currency": "USD", "balance": self.balance}}
+        if "buy" in req:
+            return self._buy(ws, req)
+        if "proposal_open_contract" in req:
+            contract = self.contracts.get(req.get("contract_id"))
+            if contract is None:
+                return {"msg_type": "proposal_open_contract",
+                        "error": {"code": "ContractNotFound", "message": "Contract not found."}}
+            if req.get("subscribe"):
+                self._streams.setdefault(ws, []).append(asyncio.create_task(self._stream_contract(ws, contract, req)))
+            return {"msg_type": "proposal_open_contract", "proposal_open_contract": self._contract_state(contract)}
+        return {"msg_type": "error", "error": {"code": "UnrecognisedRequest", "message": "Unrecognised request"}}
+
+    UNIT_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+    def _buy(self, ws, req):
+        if ws not in self._authorized:
+            return {"msg_type": "buy", "error": {"code": "AuthorizationRequired", "message": "Please log in."}}
+        params = req.get("parameters", {})
+        stake = float(params.get("amount", 0))
+        unit = params.get("duration_unit", "m")
+        duration = int(params.get("duration", 1))
+        seconds = duration * self.tick_interval if unit == "t" else duration * self.UNIT_SECONDS[unit]
+        if params.get("contract_type") not in ("CALL", "PUT") or stake <= 0 or stake > self.balance:
+            return {"msg_type": "buy", "error": {"code": "InvalidContract", "message": "Invalid contract parameters."}}
+
+        contract_id = next(self._contract_ids)
+        start = self.current_epoch()
+        self.balance -= stake
+        self.contracts[contract_id] = {
+            "contract_id": contract_id, "symbol": params["symbol"], "contract_type": params["contract_type"],
+            "buy_price": stake, "payout": round(stake * 1.95, 2), "date_start": start,
+            "date_expiry": start + int(seconds), "expires_at": time.monotonic() + seconds * self.contract_time_scale,
+        }
+        return {"msg_type": "buy", "buy": {
+            "contract_id": contract_id, "buy_price": stake, "payout": round(stake * 1.95, 2), "start_time": start,
+            "transaction_id": contract_id * 10, "balance_after": round(self.balance, 2),
+            "longcode": f"Win payout if {params['symbol']} goes {'up' if params['contract_type'] == 'CALL' else 'down'}.",
+        }}
+
+    def _contract_state(self, contract):
+        """État courant d'un contrat ; réglé (won / lost) une fois l'échéance passée."""
+        entry, exit_ = synthetic_price(contract["symbol"], [contract["date_start"], contract["date_expiry"]])
+        expired = time.monotonic() >= contract["expires_at"]
+        won = exit_ > entry if contract["contract_type"] == "CALL" else exit_ < entry
+        state = {
+            "contract_id": contract["contract_id"], "underlying": contract["symbol"],
+            "contract_type": contract["contract_type"], "buy_price": contract["buy_price"],
+            "entry_spot": round(float(entry), 4), "is_expired": int(expired), "is_sold": int(expired),
+            "status": "open",
+        }
+        if expired:
+            if "profit" not in contract:
+                contract["profit"] = round(contract["payout"] - contract["buy_price"], 2) if won else -contract["buy_price"]
+                if won:
+                    self.balance += contract["payout"]
+            state.update({"status": "won" if won else "lost", "exit_spot": round(float(exit_), 4),
+                          "profit": contract["profit"]})
+        return state
+
+    async def _stream_contract(self, ws, contract, req):
+        """Mises à jour proposal_open_contract jusqu'au règlement du contrat."""
+        sub_id = f"poc-{contract['contract_id']}-{id(ws)}"
+        while True:
+            await asyncio.sleep(max(0.0, min(self.tick_interval, contract["expires_at"] - time.monotonic())))
+            state = self._contract_state(contract)
+            msg = {"msg_type": "proposal_open_contract", "echo_req": req,
+                   "proposal_open_contract": state, "subscription": {"id": sub_id}}
+            if "req_id" in req:
+                msg["req_id"] = req["req_id"]
+            try:
+                await ws.send(json.dumps(msg))
+            except websockets.ConnectionClosed:
+                return
+            if state["is_sold"]:
+                return
+
+    async def _stream_ticks(self, ws, symbol, req):
+        """Pousse un tick toutes les tick_interval secondes ; `ts` = heure d'envoi (perf_counter)."""
+        sub_id = f"{symbol}-{id(ws)}"
+        n = 0
+        while True:
+            epoch = self.current_epoch() if self.now is None else self.now + n
+            quote = round(float(synthetic_price(symbol, [epoch + n * 0.001])[0]), 4)
+            msg = {
+                "msg_type": "tick", "echo_req": req,
+                "tick": {"symbol": symbol, "epoch": epoch, "quote": quote, "id": sub_id, "ts": time.perf_counter()},
+                "subscription": {"id": sub_id},
+            }
+            if "req_id" in req:
+                msg["req_id"] = req["req_id"]
+            try:
+                await ws.send(json.dumps(msg))
+            except websockets.ConnectionClosed:
+                return
+            self.ticks_sent += 1
+            n += 1
+            await asyncio.sleep(self.tick_interval)
+
+    def _cancel_streams(self, ws):
+        for task in self._streams.pop(ws, []):
+            task.cancel()
+
+    async def _handler(self, ws):
+        self.connections += 1
+        try:
+            await self._serve(ws)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._cancel_streams(ws)
+
+    async def _serve(self, ws):
+        pending = set()
+        try:
+            async for message in ws:
+                req = json.loads(message)
+                if self.concurrent:
+                    task = asyncio.create_task(self._respond(ws, req))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                else:
+                    await self._respond(ws, req)
+        finally:
+            for task in pending:
+                task.cancel()
+            self._authorized.discard(ws)
+
+    async def _respond(self, ws, req):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            resp = await self.handle_request(ws, req)
+        finally:
+            self.in_flight -= 1
+        if resp is not None:
+            resp["echo_req"] = req
+            if "req_id" in req:
+                resp["req_id"] = req["req_id"]
+            try:
+                await ws.send(json.dumps(resp))
+            except websockets.ConnectionClosed:
+                pass
+
+    # --- Cycle de vie (asyncio) ---
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await websockets.serve(self._handler, self.host, self.port, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    # --- Cycle de vie (thread dédié, pour le code synchrone) ---
+    def start_in_thread(self):
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-deriv", daemon=True)
+        self._thread.start()
+        ready.wait(10)
+        return self
+
+    def stop_thread(self):
+        loop = self._loop
+        asyncio.run_coroutine_threadsafe(self.stop(), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(10)
+
+    def __enter__(self):
+        return self.start_in_thread()
+
+    def __exit__(self, *exc):
+        self.stop_thread()
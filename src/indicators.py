@@ -1,18 +1,21 @@
 # src/indicators.py
-import talib
 import pandas as pd
 import numpy as np
+from collections import deque
+from src.metrics import timed
 
 def calculate_smma(series, period):
     """Calcule la Smoothed Moving Average (SMMA) manuellement car TA-Lib ne l'a pas directement."""
     return series.ewm(alpha=1/period, adjust=False).mean()
 
+@timed("add_indicators")
 def add_indicators(df):
     """
     Ajoute: MA5, SMMA35, RSI5, Stoch(47,14,15)
     """
     if df.empty:
         return df
+    import talib  # import différé : TA-Lib n'est chargé qu'au premier calcul
 
     data = df.copy()
     close = data['close'].values
@@ -42,3 +45,139 @@ def add_indicators(df):
 
     data.dropna(inplace=True)
     return data
+
+
+class StreamingIndicators:
+    """
+    Version incrémentale de add_indicators (MA5, SMMA35, RSI5, Stoch(47,14,15)).
+    On l'amorce une fois sur l'historique (seed), puis chaque nouvelle bougie
+    coûte O(1) (push). peek() calcule les valeurs d'une bougie en cours (tick)
+    sans modifier l'état. Les valeurs sont identiques à celles de add_indicators.
+    """
+
+    FEATURES = ['MA5', 'SMMA35', 'RSI5', 'Stoch_K', 'Stoch_D']
+    COLUMNS = ['epoch', 'open', 'high', 'low', 'close'] + FEATURES
+
+    def __init__(self, window=10, ma_period=5, smma_period=35, rsi_period=5,
+                 fastk_period=47, slowk_period=14, slowd_period=15):
+        self.ma_period = ma_period
+        self.smma_alpha = 1 / smma_period
+        self.rsi_period = rsi_period
+        self.fastk_period = fastk_period
+        self.slowk_period = slowk_period
+        self.slowd_period = slowd_period
+        # Dernières lignes complètes (sans NaN), comme après le dropna de add_indicators
+        self.rows = deque(maxlen=window)
+        self.last_epoch = None
+        self._state = self._new_state()
+
+    def _new_state(self):
+        return {
+            'closes': deque(maxlen=self.ma_period),
+            'smma': None,
+            'prev_close': None,
+            'rsi_n': 0,        # nombre de variations vues
+            'avg_gain': 0.0,
+            'avg_loss': 0.0,
+            'highs': deque(maxlen=self.fastk_period),
+            'lows': deque(maxlen=self.fastk_period),
+            'fastk': deque(maxlen=self.slowk_period),
+            'slowk': deque(maxlen=self.slowd_period),
+        }
+
+    def _copy_state(self):
+        s = self._state
+        copy = dict(s)
+        for key in ('closes', 'highs', 'lows', 'fastk', 'slowk'):
+            copy[key] = deque(s[key], maxlen=s[key].maxlen)
+        return copy
+
+    def _advance(self, s, high, low, close):
+        """Fait avancer l'état `s` d'une bougie et retourne les indicateurs (NaN si pas prêts)."""
+        nan = float('nan')
+
+        # 1. MA5
+        s['closes'].append(close)
+        ma = sum(s['closes']) / self.ma_period if len(s['closes']) == self.ma_period else nan
+
+        # 2. SMMA 35 (ewm adjust=False)
+        if s['smma'] is None:
+            s['smma'] = close
+        else:
+            s['smma'] = (1 - self.smma_alpha) * s['smma'] + self.smma_alpha * close
+
+        # 3. RSI (lissage de Wilder, amorcé par une moyenne simple comme TA-Lib)
+        rsi = nan
+        if s['prev_close'] is not None:
+            diff = close - s['prev_close']
+            gain = diff if diff > 0 else 0.0
+            loss = -diff if diff < 0 else 0.0
+            n = self.rsi_period
+            s['rsi_n'] += 1
+            if s['rsi_n'] <= n:
+                s['avg_gain'] += gain
+                s['avg_loss'] += loss
+                if s['rsi_n'] == n:
+                    s['avg_gain'] /= n
+                    s['avg_loss'] /= n
+            else:
+                s['avg_gain'] = (s['avg_gain'] * (n - 1) + gain) / n
+                s['avg_loss'] = (s['avg_loss'] * (n - 1) + loss) / n
+            if s['rsi_n'] >= n:
+                total = s['avg_gain'] + s['avg_loss']
+                rsi = 100 * s['avg_gain'] / total if abs(total) > 1e-14 else 0.0
+        s['prev_close'] = close
+
+        # 4. Stochastique : %K rapide sur 47, lissé par SMA 14 (%K lent) puis SMA 15 (%D)
+        s['highs'].append(high)
+        s['lows'].append(low)
+        slowk = slowd = nan
+        if len(s['highs']) == self.fastk_period:
+            highest = max(s['highs'])
+            lowest = min(s['lows'])
+            diff = (highest - lowest) / 100
+            s['fastk'].append((close - lowest) / diff if diff != 0 else 0.0)
+            if len(s['fastk']) == self.slowk_period:
+                s['slowk'].append(sum(s['fastk']) / self.slowk_period)
+                if len(s['slowk']) == self.slowd_period:
+                    # TA-Lib aligne %K sur le premier %D disponible
+                    slowk = s['slowk'][-1]
+                    slowd = sum(s['slowk']) / self.slowd_period
+
+        return {'MA5': ma, 'SMMA35': s['smma'], 'RSI5': rsi, 'Stoch_K': slowk, 'Stoch_D': slowd}
+
+    def push(self, epoch, open_price, high, low, close):
+        """Intègre une bougie clôturée et retourne ses indicateurs."""
+        values = self._advance(self._state, high, low, close)
+        self.last_epoch = epoch
+        if not any(np.isnan(v) for v in values.values()):
+            self.rows.append((epoch, open_price, high, low, close) + tuple(values[k] for k in self.FEATURES))
+        return values
+
+    def peek(self, epoch, open_price, high, low, close):
+        """Indicateurs d'une bougie en cours de formation, sans modifier l'état."""
+        return self._advance(self._copy_state(), high, low, close)
+
+    def seed(self, df):
+        """(Ré)amorce l'état à partir d'un historique OHLC trié par epoch."""
+        self.rows.clear()
+        self.last_epoch = None
+        self._state = self._new_state()
+        if df.empty:
+            return self
+        cols = [df[c].tolist() for c in ('epoch', 'open', 'high', 'low', 'close')]
+        for epoch, o, h, l, c in zip(*cols):
+            self.push(epoch, o, h, l, c)
+        return self
+
+    @property
+    def window(self):
+        return self.rows.maxlen
+
+    @property
+    def ready(self):
+        return len(self.rows) == self.rows.maxlen
+
+    def frame(self):
+        """Dernières lignes complètes sous forme de DataFrame (mêmes colonnes que add_indicators)."""
+        return pd.DataFrame(list(self.rows), columns=self.COLUMNS)
@@ -0,0 +1,229 @@
+# src/lite_model.py
+"""
+Export léger du GRU pour l'inférence live : les poids Keras et le MinMaxScaler
+sont écrits dans un seul .npz, rejoué ici en NumPy pur (GRU reset_after, Dense softmax).
+Ce module n'importe ni TensorFlow ni scikit-learn : démarrage à froid et
+prédiction unitaire ne paient plus le coût de la pile Keras.
+"""
+import os
+import numpy as np
+from src.metrics import timed
+from src.model_registry import ModelRegistry, model_paths
+
+
+def lite_path(model_path):
+    """Artefact léger associé à un modèle Keras : models/model_v1.h5 -> models/model_v1.npz."""
+    return os.path.splitext(model_path)[0] + '.npz'
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def export_lite(model, scaler, path, feature_cols=None):
+    """
+    Écrit les poids du modèle (couches GRU / Dropout / Dense de build_model) et le scaler.
+    Lève ValueError pour une couche ou une configuration non rejouée par LiteModel.
+    """
+    arrays = {}
+    kinds = []
+    for layer in model.layers:
+        name = type(layer).__name__
+        if name == 'Dropout':
+            continue  # sans effet en inférence
+        i = len(kinds)
+        weights = layer.get_weights()
+        if name == 'GRU':
+            if not layer.reset_after or layer.activation.__name__ != 'tanh' \
+                    or layer.recurrent_activation.__name__ != 'sigmoid':
+                raise ValueError(f"Configuration GRU non supportée : {layer.name}")
+            arrays[f'l{i}_kernel'], arrays[f'l{i}_recurrent'], arrays[f'l{i}_bias'] = weights
+            arrays[f'l{i}_sequences'] = np.array(layer.return_sequences)
+        elif name == 'Dense':
+            if layer.activation.__name__ not in ('softmax', 'linear'):
+                raise ValueError(f"Activation non supportée : {layer.activation.__name__}")
+            arrays[f'l{i}_kernel'], arrays[f'l{i}_bias'] = weights
+            arrays[f'l{i}_softmax'] = np.array(layer.activation.__name__ == 'softmax')
+        else:
+            raise ValueError(f"Couche non supportée : {name}")
+        kinds.append(name.lower())
+
+    if feature_cols is None:
+        from src.ml_logic import FEATURE_COLS
+        feature_cols = FEATURE_COLS
+    tmp = path + '.tmp.npz'
+    np.savez(
+        tmp, layers=np.array(kinds), features=np.array(feature_cols),
+        look_back=np.array(model.input_shape[1]),
+        scale=scaler.scale_.astype(np.float32), min=scaler.min_.astype(np.float32),
+        **{k: np.asarray(v, dtype=np.float32) if v.dtype.kind == 'f' else v for k, v in arrays.items()},
+    )
+    os.replace(tmp, path)  # écriture atomique : le live ne lit jamais un fichier partiel
+    return path
+
+
+def export_artifacts(model_path, scaler_path, path=None):
+    """Exporte un couple (.h5, scaler.pkl) déjà sauvegardé ; retourne le chemin du .npz."""
+    from src.ml_logic import load_artifacts
+    model, scaler = load_artifacts(model_path, scaler_path)
+    return export_lite(model, scaler, path or lite_path(model_path))
+
+
+class LiteModel:
+    """Rejoue le modèle exporté : scaling + GRU empilés + Dense, par batch."""
+
+    def __init__(self, arrays):
+        self.features = [str(f) for f in arrays['features']]
+        self.look_back = int(arrays['look_back'])
+        self.scale = arrays['scale']
+        self.min = arrays['min']
+        self.layers = []
+        for i, kind in enumerate(arrays['layers']):
+            if kind == 'gru':
+                self.layers.append(('gru', arrays[f'l{i}_kernel'], arrays[f'l{i}_recurrent'],
+                                    arrays[f'l{i}_bias'], bool(arrays[f'l{i}_sequences'])))
+            else:
+                self.layers.append(('dense', arrays[f'l{i}_kernel'], arrays[f'l{i}_bias'],
+                                    bool(arrays[f'l{i}_softmax'])))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({k: data[k] for k in data.files})
+
+    def transform(self, X):
+        """Équivalent de MinMaxScaler.transform (en float32)."""
+        return np.asarray(X, dtype=np.float32) * self.scale + self.min
+
+    @staticmethod
+    def _gru(x, kernel, recurrent, bias, return_sequences):
+        """GRU Keras (reset_after=True, portes z, r, h) sur x (batch, temps, features)."""
+        units = recurrent.shape[0]
+        xw = x @ kernel + bias[0]  # projection des entrées pour tous les pas de temps d'un coup
+        h = np.zeros((x.shape[0], units), dtype=np.float32)
+        outputs = []
+        for t in range(x.shape[1]):
+            hu = h @ recurrent + bias[1]
+            z = _sigmoid(xw[:, t, :units] + hu[:, :units])
+            r = _sigmoid(xw[:, t, units:2 * units] + hu[:, units:2 * units])
+            candidate = np.tanh(xw[:, t, 2 * units:] + r * hu[:, 2 * units:])
+            h = z * h + (1 - z) * candidate
+            if return_sequences:
+                outputs.append(h)
+        return np.stack(outputs, axis=1) if return_sequences else h
+
+    def predict_proba(self, X):
+        """Probabilités (batch, 3) pour des fenêtres déjà normalisées (batch, look_back, n_features)."""
+        out = np.asarray(X, dtype=np.float32)
+        for layer in self.layers:
+            if layer[0] == 'gru':
+                out = self._gru(out, *layer[1:])
+            else:
+                _, kernel, bias, softmax = layer
+                out = out @ kernel + bias
+                if softmax:
+                    out = _softmax(out)
+        return out
+
+    def predict(self, window):
+        """(classe, confiance) d'une fenêtre brute (DataFrame des features ou tableau (look_back, 6))."""
+        data = window[self.features].to_numpy() if hasattr(window, 'columns') else window
+        probs = self.predict_proba(self.transform(data)[None])[0]
+        return int(probs.argmax()), float(probs.max())
+
+
+def _load_lite(path, _):
+    """Loader du registre : le .npz contient aussi le scaler."""
+    return LiteModel.load(path), None
+
+
+lite_registry = ModelRegistry(_load_lite, max_models=16)
+
+
+def fresh_lite_model(symbol=None, timeframe=None):
+    """LiteModel de la paire si son artefact est à jour (plus récent que le .h5), sinon None."""
+    model_path, _ = model_paths(symbol, timeframe)
+    path = lite_path(model_path)
+    if os.path.exists(path) and (not os.path.exists(model_path)
+                                 or os.path.getmtime(path) >= os.path.getmtime(model_path)):
+        return lite_registry.get(path, path)[0]
+    return None
+
+
+def model_look_back(symbol=None, timeframe=None, default=10):
+    """
+    Taille des fenêtres attendue par le modèle de la paire : lue dans l'artefact léger
+    s'il est à jour, sinon dans le modèle Keras (import de TensorFlow), `default` sans modèle.
+    """
+    try:
+        model = fresh_lite_model(symbol, timeframe)
+        if model is not None:
+            return model.look_back
+        model_path, scaler_path = model_paths(symbol, timeframe)
+        if os.path.exists(model_path):
+            from src.ml_logic import model_registry
+            return int(model_registry.get(model_path, scaler_path)[0].input_shape[1])
+    except Exception:
+        pass
+    return default
+
+
+@timed("predict_live")
+def predict_live(df_window, symbol=None, timeframe=None):
+    """
+    Prédiction live de la paire : artefact léger s'il est à jour (plus récent que le .h5),
+    sinon predict_next sur le modèle Keras (import de TensorFlow à ce moment-là seulement).
+    Même retour que predict_next : (classe, confiance) ou (None, 0.0).
+    """
+    try:
+        model = fresh_lite_model(symbol, timeframe)
+        if model is not None:
+            data = df_window[model.features].to_numpy() if hasattr(df_window, 'columns') else df_window
+            if len(data) != model.look_back or not np.isfinite(data).all():
+                return None, 0.0
+            return model.predict(data)
+    except Exception:
+        return None, 0.0
+
+    from src.ml_logic import predict_next
+    model_path, scaler_path = model_paths(symbol, timeframe)
+    return predict_next(df_window, model_path, scaler_path)
+
+
+def score_windows(windows):
+    """
+    Score d'un lot de fenêtres brutes {(symbol, timeframe): tableau (look_back, 6)} ->
+    {(symbol, timeframe): (classe, confiance)}. Les fenêtres d'un même modèle léger passent
+    en un seul batch ; les paires sans artefact léger passent par ScoringService (Keras).
+    Fonction de module sans état : exécutable dans un worker (ProcessPoolExecutor).
+    """
+    results, groups, keras = {}, {}, {}
+    for key, window in windows.items():
+        try:
+            model = fresh_lite_model(*key)
+        except Exception:
+            results[key] = (None, 0.0)
+            continue
+        if model is None:
+            keras[key] = window
+            continue
+        data = np.asarray(window, dtype=np.float32)
+        if data.shape != (model.look_back, len(model.features)) or not np.isfinite(data).all():
+            results[key] = (None, 0.0)
+        else:
+            groups.setdefault(id(model), (model, []))[1].append((key, data))
+
+    for model, items in groups.values():
+        probs = model.predict_proba(model.transform(np.stack([data for _, data in items])))
+        for (key, _), p in zip(items, probs):
+            results[key] = (int(p.argmax()), float(p.max()))
+
+    if keras:
+        from src.scoring import ScoringService
+        results.update(ScoringService().score(keras))
+    return results
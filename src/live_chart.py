@@ -0,0 +1,54 @@
+# src/live_chart.py
+import time
+from collections import deque
+import pandas as pd
+
+
+class RenderScheduler:
+    """
+    Cadence le graphique live : au plus `max_fps` images par seconde, les ticks
+    arrivés entre deux images sont regroupés. Une image est soit un envoi
+    incrémental des nouveaux ticks ('append', pour element.add_rows), soit un
+    redessin complet de la fenêtre ('reset') quand l'incrémental a rempli une
+    fenêtre entière (le graphique reste ainsi borné à `window` points environ).
+    """
+
+    def __init__(self, max_fps=4, window=50, clock=time.monotonic):
+        self.max_fps = max_fps
+        self.window = deque(maxlen=window)  # (index, prix) affichés
+        self.pending = []                   # ticks reçus depuis la dernière image
+        self.frames = 0
+        self.ticks = 0
+        self._clock = clock
+        self._last_frame = None
+        self._appended = None               # None = aucun graphique encore dessiné
+
+    def push(self, quotes, first_index):
+        """Enregistre des nouveaux ticks ; first_index = numéro du premier (compteur du TickBuffer)."""
+        for i, q in enumerate(quotes):
+            point = (first_index + i, float(q))
+            self.window.append(point)
+            self.pending.append(point)
+        self.ticks += len(quotes)
+
+    def due(self):
+        """Vrai si une image doit être rendue maintenant."""
+        if not self.pending:
+            return False
+        if self._last_frame is None:
+            return True
+        return self._clock() - self._last_frame >= 1.0 / self.max_fps
+
+    def frame(self):
+        """Retourne ('reset' | 'append', DataFrame indexé par numéro de tick) et vide l'attente."""
+        self._last_frame = self._clock()
+        self.frames += 1
+        if self._appended is None or self._appended + len(self.pending) > self.window.maxlen:
+            mode, points = 'reset', list(self.window)
+            self._appended = 0
+        else:
+            mode, points = 'append', self.pending
+            self._appended += len(points)
+        self.pending = []
+        df = pd.DataFrame(points, columns=['tick', 'Prix']).set_index('tick')
+        return mode, df
@@ -0,0 +1,240 @@
+# src/metrics.py
+"""
+Instrumentation des chemins chauds (téléchargement, indicateurs, inférence, boucle live) :
+- timers : histogramme de durées par étape (buckets cumulés façon Prometheus
+  + derniers échantillons pour des p50 / p99 exacts), `metrics.timer("étape")` ou `@timed("étape")` ;
+- compteurs : `metrics.count("évènement", n)` ;
+- export texte Prometheus (metrics.prometheus(), serveur HTTP optionnel) ;
+- LoopProfiler : cProfile ou échantillonnage de pile, à activer à la demande sur la boucle live.
+Uniquement la bibliothèque standard : importé au démarrage, coût négligeable par appel.
+"""
+import bisect
+import cProfile
+import functools
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bornes des buckets (secondes) : de 0,1 ms à 30 s
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Durées d'une étape, thread-safe : buckets cumulés (export) + `window` derniers échantillons (quantiles)."""
+
+    def __init__(self, buckets=BUCKETS, window=2048):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # dernier = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.sum += seconds
+            self.max = max(self.max, seconds)
+            self.samples.append(seconds)
+
+    def quantile(self, q):
+        """Quantile q (0..1) des derniers échantillons, None sans échantillon."""
+        with self._lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def cumulative(self):
+        """[(borne, nombre <= borne)] jusqu'à +Inf, pour l'export Prometheus."""
+        with self._lock:
+            counts = list(self.counts)
+        out, total = [], 0
+        for bound, n in zip((*self.buckets, float('inf')), counts):
+            total += n
+            out.append((bound, total))
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self, prefix="trading"):
+        self.prefix = prefix
+        self.histograms = {}
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(name, Histogram())
+        return hist
+
+    def observe(self, name, seconds):
+        self.histogram(name).observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """Chronomètre le bloc (aussi en cas d'exception)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def summary(self):
+        """Une ligne par étape : appels, p50 / p99 / max en ms, temps total en s."""
+        rows = []
+        for name, hist in sorted(self.histograms.items()):
+            p50, p99 = hist.quantile(0.5), hist.quantile(0.99)
+            rows.append({
+                'étape': name, 'appels': hist.count,
+                'p50_ms': p50 * 1000 if p50 is not None else None,
+                'p99_ms': p99 * 1000 if p99 is not None else None,
+                'max_ms': hist.max * 1000, 'total_s': hist.sum,
+            })
+        return rows
+
+    def prometheus(self):
+        """Export au format texte Prometheus (exposition 0.0.4)."""
+        lines = []
+        if self.histograms:
+            name = f"{self.prefix}_stage_seconds"
+            lines += [f"# HELP {name} Durée des étapes instrumentées.", f"# TYPE {name} histogram"]
+            for stage, hist in sorted(self.histograms.items()):
+                for bound, n in hist.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {n}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {hist.sum!r}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+        with self._lock:
+            counters = sorted(self.counters.items())
+        if counters:
+            name = f"{self.prefix}_events_total"
+            lines += [f"# HELP {name} Compteurs d'évènements.", f"# TYPE {name} counter"]
+            lines += [f'{name}{{event="{event}"}} {n}' for event, n in counters]
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = Counter()
+
+
+# Un registre par processus, partagé par toutes les sessions et tous les threads
+metrics = MetricsRegistry()
+
+
+def timed(name):
+    """Décorateur : chronomètre chaque appel de la fonction sous `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def serve_prometheus(port, registry=metrics, host="0.0.0.0"):
+    """Expose GET /metrics sur `port` (thread démon) ; retourne le serveur."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = registry.prometheus().encode()
+            self.send_response(200 if self.path in ("/", "/metrics") else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+class LoopProfiler:
+    """
+    Profilage à la demande d'une boucle (thread courant) :
+    - mode 'cprofile' : cProfile déterministe, rapport pstats trié par temps cumulé ;
+    - mode 'sampling' : un thread relève la pile du thread profilé toutes les `interval`
+      secondes (surcoût quasi nul pour la boucle), rapport des fonctions les plus vues.
+    """
+
+    def __init__(self, mode='sampling', interval=0.005, top=25):
+        if mode not in ('cprofile', 'sampling'):
+            raise ValueError(f"Mode de profilage inconnu : {mode}")
+        self.mode = mode
+        self.interval = interval
+        self.top = top
+        self.samples = Counter()  # (fichier, ligne, fonction) -> nombre d'échantillons
+        self.n_samples = 0
+        self._profile = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.mode == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            target = threading.get_ident()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample, args=(target,), name="loop-profiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def _sample(self, target):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                return
+            self.n_samples += 1
+            # Chaque fonction de la pile compte une fois (temps inclusif)
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_filename, code.co_firstlineno, code.co_name)
+                if key not in seen:
+                    seen.add(key)
+                    self.samples[key] += 1
+                frame = frame.f_back
+
+    def stop(self):
+        """Arrête le profilage et retourne le rapport texte."""
+        if self.mode == 'cprofile':
+            self._profile.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profile, stream=out).sort_stats('cumulative').print_stats(self.top)
+            return out.getvalue()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        lines = [f"{self.n_samples} échantillons toutes les {self.interval * 1000:.0f} ms (temps inclusif)"]
+        for (filename, line, name), n in self.samples.most_common(self.top):
+            lines.append(f"{n / max(self.n_samples, 1):6.1%}  {name}  ({filename}:{line})")
+        return "\n".join(lines)
+
+    @contextmanager
+    def running(self):
+        """Profile le bloc ; le rapport est dans `report` à la sortie."""
+        self.report = None
+        self.start()
+        try:
+            yield self
+        finally:
+            self.report = self.stop()
@@ -4,102 +4,178 @@ import pandas as pd
 import tensorflow as tf
 from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import GRU, Dense, Dropout
-from tensorflow.keras.utils import to_categorical
+from tensorflow.keras.utils import to_categorical, PyDataset
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.preprocessing import MinMaxScaler
 import joblib
 import os
+import threading
+import weakref
 from config import MODEL_PATH, SCALER_PATH
+from src.model_registry import ModelRegistry, model_dir, model_paths
+from src.lite_model import export_lite, lite_path
+from src.metrics import timed
+
+FEATURE_COLS = ['close', 'MA5', 'SMMA35', 'RSI5', 'Stoch_K', 'Stoch_D']
+
+TARGET_PCT = 2.5  # variation (en %) de la bougie suivante pour un signal Buy / Sell
+
+def make_targets(pct_change):
+    """Classes int8 : 0 (neutre), 1 (hausse >= TARGET_PCT %), 2 (baisse >= TARGET_PCT %)."""
+    y = np.zeros(len(pct_change), dtype=np.int8)
+    y[pct_change >= TARGET_PCT] = 1
+    y[pct_change <= -TARGET_PCT] = 2
+    return y
 
 def prepare_data(df):
     """
-    Features: close, MA5, SMMA35, RSI5, Stoch_K, Stoch_D
-    Target: 
+    Features: close, MA5, SMMA35, RSI5, Stoch_K, Stoch_D (float32)
+    Target (int8):
         0 = Neutre (< 2.5%)
         1 = Buy (>= 2.5%)
         2 = Sell (<= -2.5% mais on va utiliser la baisse comme classe séparée)
+    Une seule passe sur les colonnes NumPy : df n'est pas modifié ni copié.
+    La dernière ligne (pas de bougie suivante) et les lignes incomplètes sont écartées.
     """
-    df['future_close'] = df['close'].shift(-1)
-    df['pct_change'] = ((df['future_close'] - df['close']) / df['close']) * 100
-    
-    # Création des cibles (1: Hausse >= 2.5%, 2: Baisse >= 2.5% (approx), 0: Autres)
-    # Note: Le prompt demande "2 si = 2", je suppose qu'on veut dire une classe distincte pour la baisse forte.
-    conditions = [
-        (df['pct_change'] >= 2.5),
-        (df['pct_change'] <= -2.5) 
-    ]
-    choices = [1, 2]
-    df['target'] = np.select(conditions, choices, default=0)
-    
-    feature_cols = ['close', 'MA5', 'SMMA35', 'RSI5', 'Stoch_K', 'Stoch_D']
-    # Nettoyage des NaN générés par le shift et les indicateurs
-    df_clean = df.dropna().copy()
-    
-    return df_clean[feature_cols].values, df_clean['target'].values
+    n = len(df)
+    X = np.empty((n, len(FEATURE_COLS)), dtype=np.float32)
+    for j, col in enumerate(FEATURE_COLS):
+        X[:, j] = df[col].to_numpy()
+
+    # Variation (%) vers la bougie suivante
+    close = df['close'].to_numpy(dtype=np.float64)
+    pct = np.full(n, np.nan)
+    pct[:-1] = (close[1:] - close[:-1]) / close[:-1] * 100
+    y = make_targets(pct)
+
+    valid = np.isfinite(pct) & np.isfinite(X).all(axis=1)
+    if valid[:-1].all():
+        # Cas courant (sortie de add_indicators) : seule la dernière ligne tombe, pas de copie
+        return X[:-1], y[:-1]
+    return X[valid], y[valid]
 
-def build_model(input_shape):
+def load_artifacts(model_path, scaler_path):
+    """Chargement disque du modèle Keras et du scaler (utilisé par le registre)."""
+    return load_model(model_path, compile=False), joblib.load(scaler_path)
+
+# Cache process : chaque modèle n'est désérialisé qu'une fois (puis à chaque modification du fichier)
+model_registry = ModelRegistry(load_artifacts, max_models=4)
+
+_inference_fns = weakref.WeakKeyDictionary()
+_inference_lock = threading.Lock()
+
+def inference_fn(model):
+    """
+    Fonction d'inférence compilée (tf.function) du modèle, taille de batch libre :
+    évite le coût fixe de model.predict à chaque appel.
+    """
+    with _inference_lock:
+        fn = _inference_fns.get(model)
+        if fn is None:
+            spec = tf.TensorSpec([None, *model.input_shape[1:]], tf.float32)
+            fn = tf.function(lambda x: model(x, training=False), input_signature=[spec])
+            _inference_fns[model] = fn
+        return fn
+
+def predict_proba(model, X):
+    """Probabilités (batch, 3) pour un tenseur (batch, look_back, n_features)."""
+    return inference_fn(model)(tf.convert_to_tensor(X, dtype=tf.float32)).numpy()
+
+def build_model(input_shape, units=(64, 32), dropout=0.2):
     model = Sequential()
     # Couche 1
-    model.add(GRU(64, return_sequences=True, input_shape=input_shape))
-    model.add(Dropout(0.2))
+    model.add(GRU(units[0], return_sequences=True, input_shape=input_shape))
+    model.add(Dropout(dropout))
     # Couche 2
-    model.add(GRU(32, return_sequences=False))
-    model.add(Dropout(0.2))
+    model.add(GRU(units[1], return_sequences=False))
+    model.add(Dropout(dropout))
     # Sortie
     model.add(Dense(3, activation='softmax'))
     
     model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
     return model
 
-def train_gru_model(df):
+def make_windows(X, y=None, look_back=10):
+    """
+    Fenêtres (N - look_back, look_back, n_features) : la fenêtre i couvre X[i:i+look_back]
+    et sa cible est y[i+look_back]. Vue strided sur X : ni boucle Python ni copie.
+    """
+    windows = sliding_window_view(X, (look_back, X.shape[1]))[:-1, 0]
+    if y is None:
+        return windows
+    return windows, y[look_back:]
+
+class WindowDataset(PyDataset):
+    """Batches tirés de la vue fenêtrée : seul le batch courant est copié en mémoire."""
+
+    def __init__(self, windows, y, batch_size=64, shuffle=True, **kwargs):
+        super().__init__(**kwargs)
+        self.windows = windows
+        self.y = y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.order = np.arange(len(windows))
+        self.on_epoch_end()
+
+    def __len__(self):
+        return int(np.ceil(len(self.windows) / self.batch_size))
+
+    def __getitem__(self, idx):
+        batch = self.order[idx * self.batch_size:(idx + 1) * self.batch_size]
+        return self.windows[batch], to_categorical(self.y[batch], num_classes=3)
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.order)
+
+def fit_gru(X_raw, y_raw, look_back=10, epochs=10, batch_size=64, units=(64, 32), dropout=0.2):
+    """Scaling + fenêtrage + entraînement ; retourne (model, scaler, history)."""
+    scaler = MinMaxScaler()
+    X_scaled = scaler.fit_transform(X_raw).astype(np.float32, copy=False)
+
+    # Séquençage (Lookback) : vue fenêtrée, les batches sont matérialisés à la volée
+    X, y = make_windows(X_scaled, y_raw, look_back)
+    dataset = WindowDataset(X, y, batch_size=batch_size)
+
+    model = build_model((X.shape[1], X.shape[2]), units, dropout)
+    history = model.fit(dataset, epochs=epochs, verbose=0)
+    return model, scaler, history
+
+def train_gru_model(df, look_back=10):
     X_raw, y_raw = prepare_data(df)
     
     if len(X_raw) < 100:
         return "Pas assez de données pour l'entraînement."
 
-    # Scaling
-    scaler = MinMaxScaler()
-    X_scaled = scaler.fit_transform(X_raw)
-    
-    # Séquençage (Lookback)
-    X, y = [], []
-    look_back = 10 
-    
-    for i in range(look_back, len(X_scaled)):
-        X.append(X_scaled[i-look_back:i])
-        y.append(y_raw[i])
-        
-    X, y = np.array(X), np.array(y)
-    y_cat = to_categorical(y, num_classes=3)
-    
-    # Création et Entraînement
-    model = build_model((X.shape[1], X.shape[2]))
-    history = model.fit(X, y_cat, epochs=10, batch_size=64, verbose=0)
+    # Scaling, séquençage, création et entraînement
+    model, scaler, history = fit_gru(X_raw, y_raw, look_back)
     
     # Sauvegarde
     if not os.path.exists('models'): os.makedirs('models')
     model.save(MODEL_PATH)
     joblib.dump(scaler, SCALER_PATH)
+    # Artefact léger pour le live (sans TensorFlow)
+    export_lite(model, scaler, lite_path(MODEL_PATH), FEATURE_COLS)
     
     acc = history.history['accuracy'][-1]
     return f"Modèle entraîné avec succès. Précision finale: {acc:.2%}"
 
-def predict_next(df_window):
+@timed("predict_next")
+def predict_next(df_window, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
     """Prédit le mouvement basé sur les 10 dernières bougies"""
     try:
-        if not os.path.exists(MODEL_PATH): return None, 0.0
+        if not os.path.exists(model_path): return None, 0.0
         
-        model = load_model(MODEL_PATH)
-        scaler = joblib.load(SCALER_PATH)
+        model, scaler = model_registry.get(model_path, scaler_path)
         
-        feature_cols = ['close', 'MA5', 'SMMA35', 'RSI5', 'Stoch_K', 'Stoch_D']
-        data = df_window[feature_cols].values
+        data = df_window[FEATURE_COLS].values
         
         # Scale
         data_scaled = scaler.transform(data)
-        # Reshape (1, 10, 6)
-        X = data_scaled.reshape(1, 10, 6)
+        # Reshape (1, look_back, 6)
+        X = data_scaled.reshape(1, *data_scaled.shape)
         
-        pred_prob = model.predict(X, verbose=0)
+        pred_prob = predict_proba(model, X)
         class_idx = np.argmax(pred_prob)
         confidence = np.max(pred_prob)
         
@@ -0,0 +1,84 @@
+# src/model_registry.py
+import os
+import threading
+from collections import OrderedDict
+from config import MODEL_PATH, SCALER_PATH
+
+
+class ModelRegistry:
+    """
+    Garde en mémoire les couples (modèle, scaler) déjà chargés.
+    - Un couple n'est rechargé que si un des fichiers a changé sur disque (mtime + taille).
+    - Au-delà de `max_models` couples, le moins récemment utilisé est libéré (LRU).
+    """
+
+    def __init__(self, loader, max_models=4):
+        # loader(model_path, scaler_path) -> (model, scaler)
+        self.loader = loader
+        self.max_models = max_models
+        self.loads = 0
+        self._entries = OrderedDict()  # (model_path, scaler_path) -> (signature, model, scaler)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _signature(*paths):
+        """Empreinte disque des fichiers : lève FileNotFoundError si l'un d'eux manque."""
+        sig = []
+        for path in paths:
+            stat = os.stat(path)
+            sig.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(sig)
+
+    def get(self, model_path, scaler_path):
+        """Retourne (model, scaler) depuis le cache, ou les charge si absents/modifiés."""
+        key = (model_path, scaler_path)
+        sig = self._signature(model_path, scaler_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == sig:
+                self._entries.move_to_end(key)
+                return entry[1], entry[2]
+
+            model, scaler = self.loader(model_path, scaler_path)
+            self.loads += 1
+            self._entries[key] = (sig, model, scaler)
+            self._entries.move_to_end(key)
+
+            # Éviction LRU
+            while len(self._entries) > self.max_models:
+                self._entries.popitem(last=False)
+
+            return model, scaler
+
+    def evict(self, model_path, scaler_path):
+        with self._lock:
+            self._entries.pop((model_path, scaler_path), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+def model_dir(symbol, timeframe):
+    """Répertoire des artefacts d'une paire : models/<symbol>_<timeframe>/."""
+    return os.path.join(os.path.dirname(MODEL_PATH) or '.', f"{symbol}_{timeframe}")
+
+
+def model_paths(symbol=None, timeframe=None):
+    """
+    Chemins (modèle, scaler) d'une paire : models/<symbol>_<timeframe>/ s'il existe,
+    sinon le modèle global MODEL_PATH / SCALER_PATH.
+    """
+    if symbol is not None and timeframe is not None:
+        directory = model_dir(symbol, timeframe)
+        keyed = (os.path.join(directory, 'model.h5'), os.path.join(directory, 'scaler.pkl'))
+        if os.path.exists(keyed[0]) and os.path.exists(keyed[1]):
+            return keyed
+    return MODEL_PATH, SCALER_PATH
@@ -0,0 +1,148 @@
+# src/pipeline.py
+"""
+Pipeline d'entraînement en flux (tf.data) pour les historiques plus gros que la RAM.
+Les bougies sont lues dans SQLite par paquets (pagination par epoch), les
+indicateurs calculés paquet par paquet, le scaler ajusté par partial_fit :
+la mémoire de pointe dépend de la taille des paquets, pas de la longueur
+de l'historique.
+"""
+import os
+import joblib
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from sklearn.preprocessing import MinMaxScaler
+from config import MODEL_PATH, SCALER_PATH
+from src.indicators import add_indicators
+from src.lite_model import export_lite, lite_path
+from src.ml_logic import FEATURE_COLS, build_model, make_windows, prepare_data
+
+CANDLE_COLS = ['epoch', 'open', 'high', 'low', 'close']
+
+
+def iter_candle_chunks(db, symbol, timeframe, chunk_rows=100000, start_epoch=None, end_epoch=None):
+    """Bougies de la paire par ordre chronologique, en DataFrames d'au plus chunk_rows lignes."""
+    last = start_epoch - 1 if start_epoch is not None else -1
+    end = end_epoch if end_epoch is not None else 2 ** 62
+    while True:
+        rows = db.query(
+            "SELECT epoch, open, high, low, close FROM candles "
+            "WHERE symbol=? AND timeframe=? AND epoch>? AND epoch<=? ORDER BY epoch LIMIT ?",
+            (symbol, timeframe, last, end, chunk_rows),
+        )
+        if not rows:
+            return
+        yield pd.DataFrame.from_records(rows, columns=CANDLE_COLS)
+        if len(rows) < chunk_rows:
+            return
+        last = rows[-1][0]
+
+
+class CandleStream:
+    """
+    Flux (features, cibles) d'une paire, relisible à volonté (une passe par epoch).
+    Chaque paquet est précédé des `warmup` dernières bougies du paquet précédent :
+    MA5 et Stoch sont exacts, SMMA35 et RSI5 (lissages exponentiels) convergent vers
+    les valeurs de add_indicators sur tout l'historique (écart ~ (34/35)^warmup).
+    La dernière ligne d'un paquet attend le paquet suivant pour connaître sa cible.
+    """
+
+    def __init__(self, db, symbol, timeframe, chunk_rows=100000, warmup=1000, start_epoch=None, end_epoch=None):
+        self.db = db
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.chunk_rows = chunk_rows
+        self.warmup = warmup
+        self.start_epoch = start_epoch
+        self.end_epoch = end_epoch
+        self.rows = None  # nombre de lignes (features, cible), connu après fit_scaler()
+        self.last_candle = None  # epoch de la dernière bougie lue
+
+    def chunks(self):
+        """Génère (epochs, X float32 (n, 6), y int8) ; mêmes lignes que prepare_data(add_indicators(df))."""
+        tail = None
+        emitted = None  # epoch de la dernière ligne émise
+        for chunk in iter_candle_chunks(self.db, self.symbol, self.timeframe, self.chunk_rows,
+                                        self.start_epoch, self.end_epoch):
+            self.last_candle = int(chunk['epoch'].iloc[-1])
+            frame = chunk if tail is None else pd.concat([tail, chunk], ignore_index=True)
+            tail = frame.iloc[-max(self.warmup, 2):]
+
+            data = add_indicators(frame)
+            if len(data) < 2:
+                continue
+            epochs = data['epoch'].to_numpy()
+            lo = 0 if emitted is None else np.searchsorted(epochs, emitted, side='right')
+            hi = len(data) - 1  # la dernière ligne n'a pas encore de bougie suivante
+            if lo >= hi:
+                continue
+            # La bougie hi ne sert qu'à la cible de la ligne hi - 1
+            X, y = prepare_data(data.iloc[lo:hi + 1])
+            emitted = epochs[hi - 1]
+            yield epochs[lo:hi], X, y
+
+    def fit_scaler(self):
+        """Première passe : MinMaxScaler ajusté par paquets. Fige la fin du flux pour les passes suivantes."""
+        scaler = MinMaxScaler()
+        self.rows = 0
+        for _, X, _ in self.chunks():
+            scaler.partial_fit(X)
+            self.rows += len(X)
+        if self.last_candle is not None:
+            # Les bougies arrivées ensuite ne changent ni les bornes du scaler ni le nombre d'exemples
+            self.end_epoch = self.last_candle
+        return scaler
+
+    def dataset(self, scaler, look_back=10, batch_size=64, shuffle=True, seed=None):
+        """
+        tf.data.Dataset de batches (fenêtres (batch, look_back, 6), cibles one-hot (batch, 3)).
+        Les fenêtres chevauchant deux paquets sont conservées (report des look_back dernières lignes).
+        shuffle=True : fenêtres mélangées à l'intérieur de chaque paquet (chunk_rows exemples),
+        chaque paquet est redécoupé en batches par rebatch (pas d'unbatch élément par élément).
+        """
+        n_features = len(FEATURE_COLS)
+        rng = np.random.default_rng(seed)
+
+        def chunks():
+            carry_X = np.empty((0, n_features), dtype=np.float32)
+            carry_y = np.empty(0, dtype=np.int8)
+            for _, X, y in self.chunks():
+                X = np.concatenate([carry_X, scaler.transform(X).astype(np.float32, copy=False)])
+                y = np.concatenate([carry_y, y])
+                carry_X, carry_y = X[-look_back:], y[-look_back:]
+                if len(X) <= look_back:
+                    continue
+                w, t = make_windows(X, y, look_back)
+                order = rng.permutation(len(w)) if shuffle else slice(None)
+                yield w[order], t[order].astype(np.int32)
+
+        # Un élément = un paquet entier, redécoupé en batches par rebatch (sans passer par Python)
+        ds = tf.data.Dataset.from_generator(chunks, output_signature=(
+            tf.TensorSpec((None, look_back, n_features), tf.float32),
+            tf.TensorSpec((None,), tf.int32),
+        )).rebatch(batch_size)
+        ds = ds.map(lambda x, y: (x, tf.one_hot(y, 3)), num_parallel_calls=tf.data.AUTOTUNE)
+        return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def train_gru_streaming(db, symbol, timeframe, look_back=10, epochs=10, batch_size=64, chunk_rows=100000,
+                        model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """Équivalent de train_gru_model lisant la base en flux, sans charger l'historique en mémoire."""
+    stream = CandleStream(db, symbol, timeframe, chunk_rows)
+    scaler = stream.fit_scaler()
+    if stream.rows < 100:
+        return "Pas assez de données pour l'entraînement."
+
+    # Flux répété + nombre de pas fixe : une epoch = un passage, même si la base bouge entre deux passes
+    steps = int(np.ceil((stream.rows - look_back) / batch_size))
+    model = build_model((look_back, len(FEATURE_COLS)))
+    history = model.fit(stream.dataset(scaler, look_back, batch_size).repeat(),
+                        steps_per_epoch=steps, epochs=epochs, verbose=0)
+
+    os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+    model.save(model_path)
+    joblib.dump(scaler, scaler_path)
+    export_lite(model, scaler, lite_path(model_path), FEATURE_COLS)
+
+    acc = history.history['accuracy'][-1]
+    return f"Modèle entraîné avec succès. Précision finale: {acc:.2%}"
@@ -0,0 +1,116 @@
+# src/resample.py
+"""
+Granularités dérivées : les bougies 5m / 15m / 1h (et tout multiple de la base)
+sont calculées localement à partir des bougies 60 s stockées, par réductions
+NumPy vectorisées. Les barres dérivées sont écrites dans la table candles comme
+les autres : load_data, le cache mémoire et les instantanés Arrow les voient
+sans changement. Seule la granularité de base est téléchargée chez Deriv.
+"""
+import numpy as np
+from config import BASE_TIMEFRAME, TIMEFRAMES
+
+UPSERT_CANDLES = 'INSERT OR REPLACE INTO candles VALUES (?,?,?,?,?,?,?)'
+
+
+def resample_ohlc(epochs, opens, highs, lows, closes, timeframe):
+    """
+    Agrège des bougies triées par epoch en bougies de `timeframe` secondes
+    (alignées sur l'epoch, comme Deriv). Retourne (epochs, open, high, low, close).
+    """
+    epochs = np.asarray(epochs, dtype=np.int64)
+    if not len(epochs):
+        empty = np.empty(0)
+        return epochs, empty, empty, empty, empty
+    buckets = epochs - epochs % timeframe
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(epochs)] - 1
+    return (
+        buckets[starts],
+        np.asarray(opens)[starts],
+        np.maximum.reduceat(np.asarray(highs), starts),
+        np.minimum.reduceat(np.asarray(lows), starts),
+        np.asarray(closes)[ends],
+    )
+
+
+class Resampler:
+    """
+    Met à jour les granularités dérivées d'un symbole sur un intervalle d'epochs de base.
+    Une barre n'est écrite que complète : sa dernière minute est présente, ou une
+    bougie de base plus récente existe (trou de marché). Une barre réécrite plus tard
+    (minutes arrivées après coup) remplace l'ancienne (INSERT OR REPLACE).
+    """
+
+    def __init__(self, db, base=BASE_TIMEFRAME, timeframes=None):
+        self.db = db
+        self.base = base
+        self.timeframes = sorted(timeframes or [tf for tf in TIMEFRAMES.values() if self.derives(tf)])
+        self.bars_written = 0
+
+    def derives(self, timeframe):
+        """Vrai si `timeframe` se calcule à partir de la base (multiple strict)."""
+        return timeframe != self.base and timeframe % self.base == 0
+
+    def update(self, symbol, start_epoch, end_epoch, timeframes=None):
+        """
+        Recalcule les barres dérivées qui recouvrent [start_epoch, end_epoch] (epochs de base).
+        Retourne les lignes (symbol, tf, epoch, o, h, l, c) écrites : nouvelles ou modifiées.
+        """
+        timeframes = timeframes or self.timeframes
+        if not timeframes:
+            return []
+        # La barre précédente est recalculée aussi : restée incomplète, elle se termine
+        # dès qu'une bougie plus récente existe
+        lo = min(start_epoch - start_epoch % tf - tf for tf in timeframes)
+        hi = max(end_epoch - end_epoch % tf + tf - 1 for tf in timeframes)
+
+        with self.db.connection() as conn:
+            base = np.array(conn.execute(
+                "SELECT epoch, open, high, low, close FROM candles "
+                "WHERE symbol=? AND timeframe=? AND epoch BETWEEN ? AND ? ORDER BY epoch",
+                (symbol, self.base, lo, hi),
+            ).fetchall(), dtype=np.float64).reshape(-1, 5)
+            if not len(base):
+                return []
+            epochs = base[:, 0].astype(np.int64)
+            # Epoch de la première bougie de base après l'intervalle lu (barre en cours ou non)
+            after = conn.execute(
+                "SELECT MIN(epoch) FROM candles WHERE symbol=? AND timeframe=? AND epoch>?",
+                (symbol, self.base, hi),
+            ).fetchone()[0]
+            last_known = after if after is not None else int(epochs[-1])
+
+            # Barres dérivées déjà en base : celles qui n'ont pas changé ne sont pas réécrites
+            existing = {
+                (tf, e): bar for tf, e, *bar in conn.execute(
+                    "SELECT timeframe, epoch, open, high, low, close FROM candles "
+                    f"WHERE symbol=? AND timeframe IN ({','.join('?' * len(timeframes))}) AND epoch BETWEEN ? AND ?",
+                    (symbol, *timeframes, lo, hi),
+                )
+            }
+
+            rows = []
+            for tf in timeframes:
+                first = start_epoch - start_epoch % tf - tf
+                last = end_epoch - end_epoch % tf + tf - 1
+                i, j = np.searchsorted(epochs, [first, last + 1])
+                bars = resample_ohlc(epochs[i:j], *base[i:j, 1:].T, tf)
+                # Complète si la dernière minute est là ou si une bougie plus récente existe
+                complete = bars[0] + tf - self.base <= last_known
+                rows.extend(
+                    (symbol, tf, int(e), float(o), float(h), float(l), float(c))
+                    for e, o, h, l, c in zip(*(col[complete] for col in bars))
+                    if existing.get((tf, int(e))) != [float(o), float(h), float(l), float(c)]
+                )
+            if rows:
+                with conn:
+                    conn.executemany(UPSERT_CANDLES, rows)
+        self.bars_written += len(rows)
+        return rows
+
+    def rebuild(self, symbol):
+        """Recalcule toutes les barres dérivées d'un symbole depuis sa base."""
+        lo, hi = self.db.query(
+            "SELECT MIN(epoch), MAX(epoch) FROM candles WHERE symbol=? AND timeframe=?", (symbol, self.base)
+        )[0]
+        return self.update(symbol, lo, hi) if lo is not None else []
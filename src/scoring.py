@@ -0,0 +1,61 @@
+# src/scoring.py
+import numpy as np
+from src.ml_logic import FEATURE_COLS, model_paths, model_registry, predict_proba
+
+
+class ScoringService:
+    """
+    Score en un seul passage modèle les fenêtres de plusieurs (symbol, timeframe).
+    Les fenêtres qui partagent le même modèle sont empilées en un batch
+    (batch, look_back, 6) et passent dans la fonction d'inférence compilée.
+    """
+
+    def __init__(self, registry=model_registry, resolve_paths=model_paths):
+        self.registry = registry
+        self.resolve_paths = resolve_paths  # resolve_paths(symbol, timeframe) -> (model_path, scaler_path)
+
+    @staticmethod
+    def _features(window):
+        """DataFrame (colonnes FEATURE_COLS) ou tableau (look_back, 6) -> tableau float."""
+        if hasattr(window, 'columns'):
+            return window[FEATURE_COLS].to_numpy(dtype=np.float64)
+        return np.asarray(window, dtype=np.float64)
+
+    def score(self, windows):
+        """
+        windows : {(symbol, timeframe): fenêtre}
+        Retourne {(symbol, timeframe): (classe, confiance)} ; (None, 0.0) si pas de modèle
+        ou fenêtre invalide, comme predict_next.
+        """
+        results = {}
+        groups = {}
+        for key, window in windows.items():
+            data = self._features(window)
+            if data.ndim != 2 or not len(data) or not np.isfinite(data).all():
+                results[key] = (None, 0.0)
+                continue
+            groups.setdefault(self.resolve_paths(*key), []).append((key, data))
+
+        for (model_path, scaler_path), items in groups.items():
+            try:
+                model, scaler = self.registry.get(model_path, scaler_path)
+            except Exception:
+                results.update({key: (None, 0.0) for key, _ in items})
+                continue
+
+            look_back = model.input_shape[1]
+            ok = [(key, data) for key, data in items if len(data) == look_back]
+            results.update({key: (None, 0.0) for key, data in items if len(data) != look_back})
+            if not ok:
+                continue
+
+            # Un seul transform et un seul appel modèle pour tout le groupe
+            stacked = np.concatenate([data for _, data in ok])
+            X = scaler.transform(stacked).astype(np.float32).reshape(len(ok), look_back, -1)
+            probs = predict_proba(model, X)
+            classes = probs.argmax(axis=1)
+            confidences = probs.max(axis=1)
+            for (key, _), cls, conf in zip(ok, classes, confidences):
+                results[key] = (int(cls), float(conf))
+
+        return results
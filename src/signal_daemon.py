@@ -0,0 +1,303 @@
+# src/signal_daemon.py
+"""
+Daemon de signaux sans interface : une connexion de ticks pour tous les actifs de
+config.ASSETS, bougies construites localement (CandleAggregator, écrites en base),
+indicateurs incrémentaux par (symbol, timeframe), et à chaque clôture de bougie un
+score de toutes les paires concernées dans un pool de processus (src.lite_model.score_windows).
+Les signaux sont publiés dans la table `signals` (src/signals.py) et dans `queue`.
+
+    python -m src.signal_daemon [--workers N] [--timeframes 60 300] [--trade --min-confidence 0.6]
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from datetime import datetime
+
+import numpy as np
+from config import ASSETS, TIMEFRAMES
+from src.aggregator import CandleAggregator
+from src.data_fetcher import DataFetcher
+from src.indicators import StreamingIndicators
+from src.lite_model import model_look_back, score_windows
+from src.metrics import metrics
+from src.signals import SignalStore
+from src.tick_hub import TickHub
+from src.training import init_worker
+
+# Colonnes de StreamingIndicators.rows dans l'ordre de FEATURE_COLS (close, MA5, SMMA35, RSI5, Stoch_K, Stoch_D)
+FEATURE_INDEX = [StreamingIndicators.COLUMNS.index(c) for c in ['close'] + StreamingIndicators.FEATURES]
+
+
+class SignalDaemon:
+    def __init__(self, symbols=None, timeframes=None, fetcher=None, url=None, workers=None,
+                 look_back=10, warmup=500, batch_delay=0.5, backfill_days=7,
+                 trade=False, min_confidence=0.6, stake=1, duration=1):
+        self.symbols = symbols or [s for group in ASSETS.values() for s in group]
+        self.timeframes = sorted(timeframes or TIMEFRAMES.values())
+        self.fetcher = fetcher or DataFetcher(ws_url=url)  # url : ticks et rattrapage sur le même serveur
+        self.store = SignalStore(self.fetcher.db)
+        self.url = url
+        self.workers = workers or max(1, min(len(self.symbols), (os.cpu_count() or 2) - 1))
+        self.look_back = look_back        # fenêtre des paires sans modèle ; sinon look_back du modèle
+        self.warmup = warmup              # bougies d'historique pour amorcer les indicateurs
+        self.batch_delay = batch_delay    # regroupe les clôtures d'un même instant en un lot
+        self.backfill_days = backfill_days
+        self.trade = trade
+        self.min_confidence = min_confidence
+        self.stake = stake
+        self.duration = duration
+        self.queue = queue.Queue()        # signaux publiés (dicts), pour un consommateur du même processus
+        self.on_signal = []               # callbacks(signal) appelés après publication
+        self.orders = []                  # résultats des ordres, ajoutés à leur réception
+        self._orders_pending = set()
+        self.published = 0
+        self.engines = {}
+        self.hub = None
+        self.aggregator = None
+        self._started = set()             # paires dont la première bougie (partielle) est passée
+        self._pending = {}                # (symbol, tf) -> (epoch de la bougie clôturée, heure de clôture)
+        self._gaps = {}                   # (symbol, tf) -> epoch de la première bougie (partielle), à redemander
+        self._held = {}                   # (symbol, tf) -> bougies clôturées en attendant le rattrapage
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._pool = None
+        self._thread = None
+
+    # --- Démarrage ---
+    def look_backs(self, keys):
+        """
+        look_back du modèle de chaque paire {(symbol, tf): look_back}. Résolu dans le pool quand
+        il existe : un modèle Keras sans artefact léger n'est chargé que dans les workers.
+        """
+        keys = list(keys)
+        args = ([s for s, _ in keys], [tf for _, tf in keys], [self.look_back] * len(keys))
+        resolved = self._pool.map(model_look_back, *args) if self._pool is not None else map(model_look_back, *args)
+        return dict(zip(keys, resolved))
+
+    def seed(self):
+        """
+        Indicateurs amorcés sur les `warmup` dernières bougies en base de chaque paire,
+        fenêtre à la taille du modèle de la paire (relancer le daemon si un modèle change de look_back).
+        """
+        pairs = [(symbol, tf) for symbol in self.symbols for tf in self.timeframes]
+        for (symbol, tf), look_back in self.look_backs(pairs).items():
+            epochs = self.fetcher.candles_since(symbol, tf, None)['epoch']
+            start = int(epochs[-self.warmup]) if len(epochs) >= self.warmup else None
+            history = self.fetcher.store.frame(symbol, tf, start_epoch=start)
+            self.engines[(symbol, tf)] = StreamingIndicators(window=look_back).seed(history)
+
+    def backfill(self):
+        """Historique récent (base 60 s, granularités dérivées calculées localement)."""
+        if self.backfill_days:
+            end = datetime.now()
+            self.fetcher.fetch_history_all(self.symbols, self.timeframes,
+                                           datetime.fromtimestamp(end.timestamp() - self.backfill_days * 86400), end)
+
+    def start(self):
+        self.backfill()
+        ctx = multiprocessing.get_context('spawn')
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=ctx, initializer=init_worker, initargs=(1, False))
+        self.seed()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="signal-scorer", daemon=True)
+        self._thread.start()
+        self.aggregator = CandleAggregator(self.timeframes, writer=self.fetcher.writer)
+        self.aggregator.on_close.append(self._on_bar_close)
+        self.hub = TickHub(self.url)
+        self.hub.add_listener(self.aggregator.on_tick)
+        self.hub.subscribe(self.symbols).start()
+        return self
+
+    def stop(self):
+        if self.hub is not None:
+            self.hub.stop()
+        if self.aggregator is not None:
+            self.aggregator.flush()
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(30)
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+        wait(list(self._orders_pending), timeout=30)  # ordres déjà partis : réponses enregistrées
+        self.fetcher.writer.flush()
+
+    # --- Bougies (thread du hub) ---
+    def _on_bar_close(self, symbol, timeframe, bar):
+        key = (symbol, timeframe)
+        with self._lock:
+            if key not in self._started:
+                # Première bougie : commencée avant le premier tick reçu, incomplète et non écrite.
+                # Elle est redemandée à l'API (avec le trou éventuel depuis l'amorçage) avant la suite.
+                self._started.add(key)
+                self._gaps[key] = bar[0]
+                self._held[key] = []
+                self._wake.set()
+                return
+            if key in self._held:
+                self._held[key].append(bar)
+                return
+            engine = self.engines.get(key)
+            if engine is None or (engine.last_epoch is not None and bar[0] <= engine.last_epoch):
+                return
+            engine.push(*bar)
+            self._pending[key] = (bar[0], time.perf_counter())
+        self._wake.set()
+
+    def fill_gaps(self):
+        """
+        Bougies entre la fin de l'historique amorcé et la première bougie live (partielle) :
+        téléchargées, écrites en base puis poussées dans les indicateurs avant les bougies
+        clôturées entre-temps. Sans cela les fenêtres enjamberaient un trou d'une bougie.
+        """
+        with self._lock:
+            gaps, self._gaps = self._gaps, {}
+        for (symbol, tf), epoch in gaps.items():
+            engine = self.engines.get((symbol, tf))
+            start = epoch if engine is None or engine.last_epoch is None else engine.last_epoch + tf
+            try:
+                self.fetcher.fetch_history_all([symbol], [tf], datetime.fromtimestamp(start),
+                                               datetime.fromtimestamp(epoch + tf - 1), connections=1)
+            except Exception as e:
+                print(f"Erreur rattrapage {symbol} {tf}: {e}")
+            with self._lock:
+                held = self._held.pop((symbol, tf), [])
+                if engine is None:
+                    continue
+                last = engine.last_epoch
+                new = self.fetcher.candles_since(symbol, tf, last)
+                for row in zip(new['epoch'], new['open'], new['high'], new['low'], new['close']):
+                    engine.push(*row)
+                for bar in held:
+                    if engine.last_epoch is None or bar[0] > engine.last_epoch:
+                        engine.push(*bar)
+                if engine.last_epoch is not None and engine.last_epoch != last:
+                    self._pending[(symbol, tf)] = (engine.last_epoch, time.perf_counter())
+
+    def windows(self, keys):
+        """Fenêtres (look_back du modèle, 6) des paires prêtes, dans l'ordre de FEATURE_COLS."""
+        out = {}
+        with self._lock:
+            for key in keys:
+                engine = self.engines[key]
+                if engine.ready:
+                    out[key] = np.array(engine.rows, dtype=np.float64)[:, FEATURE_INDEX]
+        return out
+
+    # --- Scoring (thread dédié, calcul dans le pool) ---
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            if self._stop.is_set():
+                return
+            # Les ticks des autres actifs clôturent la même bougie quelques instants plus tard
+            time.sleep(self.batch_delay)
+            self._wake.clear()
+            if self._gaps:
+                self.fill_gaps()
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if pending:
+                self.score(pending)
+
+    def score(self, pending):
+        """Score les paires {(symbol, tf): (epoch, heure de clôture)} réparties sur les workers."""
+        windows = self.windows(pending)
+        if not windows:
+            return []
+        keys = list(windows)
+        chunks = [keys[i::self.workers] for i in range(min(self.workers, len(keys)))]
+        t0 = time.perf_counter()
+        futures = [self._pool.submit(score_windows, {k: windows[k] for k in chunk}) for chunk in chunks]
+        published = []
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"Erreur scoring: {e}")
+                continue
+            rows = [(s, tf, pending[(s, tf)][0], cls, conf)
+                    for (s, tf), (cls, conf) in results.items() if cls is not None]
+            published += self.publish(rows, [pending[(s, tf)][1] for s, tf, *_ in rows])
+        metrics.observe("score_batch", time.perf_counter() - t0)
+        return published
+
+    def publish(self, rows, closed_at=()):
+        signals = self.store.publish(rows)
+        now = time.perf_counter()
+        for at in closed_at:
+            metrics.observe("signal_latency", now - at)  # clôture de bougie -> signal en base
+        metrics.count("signals_published", len(signals))
+        self.published += len(signals)
+        for signal in signals:
+            self.queue.put(signal)
+            for callback in self.on_signal:
+                callback(signal)
+            if self.trade and signal['signal'] != 0 and signal['confidence'] >= self.min_confidence:
+                self.place_order(signal)
+        return signals
+
+    # --- Ordres (session de trading, sans bloquer le scoring) ---
+    def place_order(self, signal):
+        """Envoie l'ordre sur la boucle de la session persistante ; le résultat arrive dans `orders`."""
+        from src.executor import submit_trade
+        future = submit_trade(signal['symbol'], signal['action'], self.stake, self.duration)
+        with self._lock:
+            self._orders_pending.add(future)
+        future.add_done_callback(lambda f: self._order_done(signal, f))
+        return future
+
+    def _order_done(self, signal, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {"status": "error", "message": str(e) or type(e).__name__}
+        metrics.count("orders_" + result.get("status", "error"))
+        with self._lock:
+            self._orders_pending.discard(future)
+            self.orders.append({'symbol': signal['symbol'], 'timeframe': signal['timeframe'],
+                                'epoch': signal['epoch'], **result})
+
+    def status(self):
+        return {
+            'symbols': len(self.symbols), 'pairs_ready': sum(e.ready for e in self.engines.values()),
+            'ticks': metrics.counters['ticks_received'], 'published': self.published,
+            'orders': len(self.orders), 'orders_pending': len(self._orders_pending),
+            'connected': bool(self.hub and self.hub.connected), 'error': self.hub.error if self.hub else None,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daemon de signaux multi-actifs (sans interface)")
+    parser.add_argument("--symbols", nargs="*", help="défaut : tous les actifs de config.ASSETS")
+    parser.add_argument("--timeframes", nargs="*", type=int, help="secondes ; défaut : config.TIMEFRAMES")
+    parser.add_argument("--workers", type=int, help="processus de scoring (défaut : cœurs - 1)")
+    parser.add_argument("--backfill-days", type=int, default=7)
+    parser.add_argument("--trade", action="store_true", help="passe les ordres via execute_trade (DERIV_TOKEN)")
+    parser.add_argument("--min-confidence", type=float, default=0.6)
+    parser.add_argument("--stake", type=float, default=1)
+    parser.add_argument("--duration", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    daemon = SignalDaemon(args.symbols, args.timeframes, workers=args.workers, backfill_days=args.backfill_days,
+                          trade=args.trade, min_confidence=args.min_confidence, stake=args.stake,
+                          duration=args.duration)
+    print(f"Daemon : {len(daemon.symbols)} actifs x {daemon.timeframes}, {daemon.workers} worker(s)")
+    daemon.start()
+    try:
+        while True:
+            time.sleep(30)
+            print(daemon.status(), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# src/signals.py
+"""
+Table `signals` : signaux publiés par le daemon (src/signal_daemon.py) à chaque
+clôture de bougie, lus par le tableau de bord et par le passage d'ordres.
+"""
+import time
+
+# Libellés compris par src.executor.execute_trade ('ACHAT' -> CALL, sinon PUT)
+ACTIONS = {0: "ATTENTE", 1: "🚀 SIGNAL ACHAT (CALL)", 2: "📉 SIGNAL VENTE (PUT)"}
+
+COLUMNS = ['symbol', 'timeframe', 'epoch', 'signal', 'confidence', 'action', 'published']
+
+
+class SignalStore:
+    def __init__(self, db):
+        # db : src.db.Database (pool partagé avec les bougies)
+        self.db = db
+        self.init_table()
+
+    def init_table(self):
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS signals (
+                symbol TEXT,
+                timeframe INTEGER,
+                epoch INTEGER,
+                signal INTEGER,
+                confidence REAL,
+                action TEXT,
+                published REAL,
+                PRIMARY KEY (symbol, timeframe, epoch)
+            )
+        ''')
+
+    def publish(self, signals):
+        """signals : [(symbol, timeframe, epoch, classe, confiance)] ; epoch = bougie clôturée."""
+        now = time.time()
+        rows = [(s, tf, int(e), int(c), float(conf), ACTIONS[int(c)], now) for s, tf, e, c, conf in signals]
+        if rows:
+            with self.db.connection() as conn:
+                with conn:
+                    conn.executemany('INSERT OR REPLACE INTO signals VALUES (?,?,?,?,?,?,?)', rows)
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def latest(self, timeframe=None):
+        """Dernier signal de chaque (symbol, timeframe), en dicts."""
+        where, params = ("WHERE timeframe=?", (timeframe,)) if timeframe is not None else ("", ())
+        rows = self.db.query(
+            "SELECT s.* FROM signals s JOIN (SELECT symbol, timeframe, MAX(epoch) AS epoch FROM signals "
+            f"{where} GROUP BY symbol, timeframe) last USING (symbol, timeframe, epoch) "
+            "ORDER BY s.timeframe, s.symbol", params
+        )
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def since(self, published):
+        """Signaux publiés après l'horodatage `published` (lecture par scrutation)."""
+        rows = self.db.query("SELECT * FROM signals WHERE published > ? ORDER BY published, symbol", (published,))
+        return [dict(zip(COLUMNS, row)) for row in rows]
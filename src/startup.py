@@ -0,0 +1,108 @@
+# src/startup.py
+"""
+Mesure du coût de démarrage :
+- StartupProfile chronomètre les blocs d'imports de l'application (au démarrage
+  et au premier usage des imports différés), avec le nombre de modules chargés ;
+- import_costs() lance un processus neuf avec `python -X importtime` et agrège
+  le coût propre de chaque paquet, pour repérer une régression de démarrage.
+Uniquement la bibliothèque standard : ce module est importé en premier.
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports de main.py au démarrage, puis imports différés (chargés dans l'onglet qui s'en sert)
+STARTUP_MODULES = ['streamlit', 'plotly.graph_objects', 'src.data_fetcher', 'src.indicators', 'src.lite_model',
+                   'src.training', 'src.tick_hub', 'src.aggregator', 'src.live_chart', 'src.signals']
+LAZY_MODULES = ['src.pipeline', 'src.scoring', 'src.backtest', 'talib']
+
+
+class StartupProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.records = []  # dicts : label, seconds, modules, at (secondes depuis le lancement)
+        self.ready_after = None  # durée lancement -> fin du premier rendu
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, label):
+        """Chronomètre un bloc d'imports ; rien n'est enregistré si tout était déjà chargé."""
+        before = len(sys.modules)
+        t0 = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - t0
+        loaded = len(sys.modules) - before
+        if loaded > 0:
+            with self._lock:
+                self.records.append({'label': label, 'seconds': elapsed, 'modules': loaded,
+                                     'at': t0 - self.started})
+
+    def mark_ready(self):
+        """Fin du premier rendu ; retourne True la première fois seulement."""
+        with self._lock:
+            if self.ready_after is not None:
+                return False
+            self.ready_after = time.perf_counter() - self.started
+            return True
+
+    def report(self):
+        """Blocs mesurés, du plus coûteux au moins coûteux."""
+        with self._lock:
+            return sorted(self.records, key=lambda r: r['seconds'], reverse=True)
+
+    def as_text(self):
+        lines = [f"{'bloc':40s} {'durée':>9s} {'modules':>8s}"]
+        for r in self.report():
+            lines.append(f"{r['label']:40s} {r['seconds'] * 1000:7.0f} ms {r['modules']:8d}")
+        if self.ready_after is not None:
+            lines.append(f"{'premier rendu':40s} {self.ready_after * 1000:7.0f} ms")
+        return "\n".join(lines)
+
+
+# Un seul profil par processus (le module n'est importé qu'une fois, même entre deux reruns Streamlit)
+startup_profile = StartupProfile()
+
+
+def parse_importtime(stderr):
+    """Lignes `import time: self [us] | cumulative | module` -> [(module, self_us, cumulative_us)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_costs(modules, top=15, python=sys.executable):
+    """
+    Coût d'import de `modules` dans un processus neuf : liste de dicts
+    {package, self_ms, modules} triée par coût propre (paquet = premier composant du nom).
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    out = subprocess.run([python, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                         cwd=ROOT, env={**os.environ, 'TF_CPP_MIN_LOG_LEVEL': '3'})
+    packages = {}
+    for name, self_us, _ in parse_importtime(out.stderr):
+        entry = packages.setdefault(name.split('.')[0], {'package': name.split('.')[0], 'self_ms': 0.0, 'modules': 0})
+        entry['self_ms'] += self_us / 1000
+        entry['modules'] += 1
+    return sorted(packages.values(), key=lambda p: p['self_ms'], reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    # python -m src.startup [modules...] : coût d'import par paquet
+    groups = {"modules": sys.argv[1:]} if sys.argv[1:] else {
+        "démarrage de main.py": STARTUP_MODULES,
+        "imports différés": STARTUP_MODULES + LAZY_MODULES,
+    }
+    for title, targets in groups.items():
+        costs = import_costs(targets, top=None)
+        print(f"--- {title} : {sum(p['self_ms'] for p in costs):.0f} ms ---")
+        for p in costs[:10]:
+            print(f"{p['package']:24s} {p['self_ms']:9.1f} ms   {p['modules']:5d} modules")
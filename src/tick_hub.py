@@ -0,0 +1,175 @@
+# src/tick_hub.py
+"""
+Hub de ticks en arrière-plan : une seule connexion WebSocket (boucle asyncio
+dans un thread dédié) abonnée à plusieurs symboles via l'API `ticks`.
+Chaque tick est rangé dans le ring buffer de son symbole ; l'UI ne fait que
+lire des instantanés, elle ne bloque plus jamais sur ws.recv().
+"""
+import asyncio
+import json
+import threading
+import time
+import numpy as np
+import websockets
+from config import APP_ID, WS_URL
+from src.metrics import metrics
+
+
+class TickBuffer:
+    """Ring buffer NumPy (epoch, prix, heure de réception) d'un symbole, thread-safe."""
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.epochs = np.zeros(capacity, dtype=np.int64)
+        self.quotes = np.zeros(capacity, dtype=np.float64)
+        self.received = np.zeros(capacity, dtype=np.float64)
+        self.count = 0  # nombre total de ticks reçus (sert aussi de numéro de version)
+        self._lock = threading.Lock()
+
+    def append(self, epoch, quote, received):
+        with self._lock:
+            i = self.count % self.capacity
+            self.epochs[i] = epoch
+            self.quotes[i] = quote
+            self.received[i] = received
+            self.count += 1
+
+    def snapshot(self, n=None):
+        """Copie (epochs, quotes) des n derniers ticks, du plus ancien au plus récent."""
+        with self._lock:
+            size = min(self.count, self.capacity)
+            n = size if n is None else min(n, size)
+            idx = (np.arange(self.count - n, self.count)) % self.capacity
+            return self.epochs[idx], self.quotes[idx]
+
+    def last(self):
+        """(epoch, prix, heure de réception) du dernier tick, ou None."""
+        with self._lock:
+            if not self.count:
+                return None
+            i = (self.count - 1) % self.capacity
+            return int(self.epochs[i]), float(self.quotes[i]), float(self.received[i])
+
+
+class TickHub:
+    def __init__(self, url=None, capacity=1000, reconnect_delay=1.0):
+        self.url = url or f"{WS_URL}?app_id={APP_ID}"
+        self.capacity = capacity
+        self.reconnect_delay = reconnect_delay
+        self.symbols = set()
+        self.buffers = {}
+        self.listeners = []  # callback(symbol, epoch, quote, tick) appelé dans le thread du hub
+        self.connected = False
+        self.connections = 0
+        self.error = None
+        self._ws = None
+        self._loop = None
+        self._thread = None
+        self._stop = None
+        self._lock = threading.Lock()
+
+    # --- API (appelable depuis n'importe quel thread) ---
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run_loop, args=(ready,), name="tick-hub", daemon=True)
+                self._thread.start()
+                ready.wait(5)
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._thread.join(5)
+        self._thread = None
+
+    def subscribe(self, symbols):
+        """Ajoute des symboles ; les nouveaux sont abonnés sur la connexion existante."""
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        new = []
+        with self._lock:
+            for s in symbols:
+                if s not in self.symbols:
+                    self.symbols.add(s)
+                    self.buffers[s] = TickBuffer(self.capacity)
+                    new.append(s)
+        if new and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._send_subscriptions(new), self._loop)
+        return self
+
+    def buffer(self, symbol):
+        return self.buffers.get(symbol)
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    # --- Boucle asyncio ---
+    def _run_loop(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._stop = asyncio.Event()
+        ready.set()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    async def _send_subscriptions(self, symbols):
+        if self._ws is None:
+            return  # envoyés à la (re)connexion
+        for s in symbols:
+            await self._ws.send(json.dumps({"ticks": s, "subscribe": 1}))
+
+    async def _run(self):
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    self._ws = ws
+                    self.connected = True
+                    self.connections += 1
+                    await self._send_subscriptions(sorted(self.symbols))
+                    stop_task = asyncio.ensure_future(self._stop.wait())
+                    try:
+                        while True:
+                            recv_task = asyncio.ensure_future(ws.recv())
+                            done, _ = await asyncio.wait({recv_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+                            if stop_task in done:
+                                recv_task.cancel()
+                                return
+                            self._dispatch(recv_task.result())
+                    finally:
+                        stop_task.cancel()
+            except Exception as e:
+                self.error = str(e)
+            finally:
+                self._ws = None
+                self.connected = False
+            # Reconnexion après une coupure
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.reconnect_delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch(self, message):
+        received = time.perf_counter()
+        data = json.loads(message)
+        if 'error' in data:
+            self.error = data['error'].get('message')
+            return
+        tick = data.get('tick')
+        if not tick:
+            return
+        symbol = tick['symbol']
+        buf = self.buffers.get(symbol)
+        if buf is None:
+            return
+        epoch, quote = int(tick['epoch']), float(tick['quote'])
+        buf.append(epoch, quote, received)
+        metrics.count("ticks_received")
+        for callback in self.listeners:
+            try:
+                callback(symbol, epoch, quote, tick)
+            except Exception as e:
+                self.error = f"listener: {e}"
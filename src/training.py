@@ -0,0 +1,199 @@
+# src/training.py
+"""
+Entraînement en parallèle de plusieurs paires (symbol, timeframe) :
+validation walk-forward et grille d'hyper-paramètres, un processus par paire.
+Chaque worker limite les threads TensorFlow (intra-op / inter-op) pour que
+les workers ne se disputent pas les cœurs. Les artefacts de chaque paire sont
+écrits dans models/<symbol>_<timeframe>/ (model.h5, scaler.pkl, model.npz, metrics.json),
+là où model_paths() les cherche.
+"""
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from config import DB_PATH
+
+DEFAULT_GRID = {'look_back': [10], 'epochs': [10], 'batch_size': [64], 'units': [(64, 32)]}
+
+
+def param_grid(grid=None):
+    """Produit cartésien {param: [valeurs]} -> liste de dicts."""
+    grid = grid or DEFAULT_GRID
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def walk_forward_splits(n, n_splits=3, embargo=1):
+    """
+    Découpage walk-forward à fenêtre d'entraînement croissante : liste de
+    (fin_train, début_test, fin_test). Le test k suit immédiatement le train k ;
+    `embargo` lignes sont retirées à la fin du train (leur cible regarde la bougie suivante).
+    """
+    size = n // (n_splits + 1)
+    if size < 1:
+        return []
+    return [(k * size - embargo, k * size, (k + 1) * size if k < n_splits else n)
+            for k in range(1, n_splits + 1)]
+
+
+def worker_threads(workers=None, cpus=None):
+    """Threads TensorFlow par worker pour ne pas dépasser le nombre de cœurs."""
+    cpus = cpus or os.cpu_count() or 1
+    workers = workers or cpus
+    return max(1, cpus // workers)
+
+
+def init_worker(threads, tensorflow=True):
+    """
+    Initialisation d'un worker, avant le premier import de TensorFlow.
+    tensorflow=False : variables d'environnement seulement (TensorFlow importé plus tard, s'il l'est).
+    """
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS'):
+        os.environ[var] = str(threads)
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    if not tensorflow:
+        return
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+
+
+def _score(model, scaler, X_raw, y_raw, look_back):
+    """Précision globale et précision des signaux (classes 1/2) sur un segment de test."""
+    from src.ml_logic import make_windows, predict_proba
+
+    X = scaler.transform(X_raw).astype(np.float32)
+    windows, y = make_windows(X, y_raw, look_back)
+    if not len(windows):
+        return {'accuracy': float('nan'), 'signal_precision': float('nan'), 'signals': 0}
+    pred = predict_proba(model, windows).argmax(axis=1)
+    signals = pred != 0
+    return {
+        'accuracy': float((pred == y).mean()),
+        'signal_precision': float((pred[signals] == y[signals]).mean()) if signals.any() else float('nan'),
+        'signals': int(signals.sum()),
+    }
+
+
+def evaluate_params(X_raw, y_raw, params, n_splits=3):
+    """Walk-forward d'un jeu de paramètres : métriques de chaque pli + moyenne."""
+    from src.ml_logic import fit_gru
+
+    look_back = params['look_back']
+    folds = []
+    for train_end, test_start, test_end in walk_forward_splits(len(X_raw), n_splits):
+        if train_end <= look_back * 2:
+            continue
+        model, scaler, _ = fit_gru(X_raw[:train_end], y_raw[:train_end], look_back, params['epochs'],
+                                   params['batch_size'], tuple(params['units']))
+        # Le test reprend look_back lignes avant test_start : la 1re cible est test_start
+        lo = test_start - look_back
+        folds.append(_score(model, scaler, X_raw[lo:test_end], y_raw[lo:test_end], look_back))
+    return {
+        'params': params,
+        'folds': folds,
+        'accuracy': float(np.nanmean([f['accuracy'] for f in folds])) if folds else float('nan'),
+    }
+
+
+def train_pair(symbol, timeframe, db_path=DB_PATH, start_epoch=None, end_epoch=None,
+               grid=None, n_splits=3, out_root=None):
+    """
+    Tâche d'un worker : charge la paire depuis la base, évalue la grille en
+    walk-forward, ré-entraîne le meilleur jeu sur tout l'historique et sauvegarde.
+    Retourne le dict de métriques (aussi écrit dans metrics.json).
+    """
+    import joblib
+    from src.candle_store import CandleStore
+    from src.db import Database
+    from src.indicators import add_indicators
+    from src.lite_model import export_lite
+    from src.ml_logic import FEATURE_COLS, fit_gru, model_dir, prepare_data
+
+    started = time.time()
+    db = Database(db_path)
+    try:
+        df = CandleStore(db).frame(symbol, timeframe, start_epoch, end_epoch)
+    finally:
+        db.close_all()
+    metrics = {'symbol': symbol, 'timeframe': timeframe, 'rows': len(df)}
+    if len(df) < 100:
+        metrics['error'] = "Pas assez de données pour l'entraînement."
+        return metrics
+
+    X_raw, y_raw = prepare_data(add_indicators(df))
+    results = [evaluate_params(X_raw, y_raw, params, n_splits) for params in param_grid(grid)]
+    scored = [r for r in results if not np.isnan(r['accuracy'])]
+    if not scored:
+        metrics['error'] = "Historique trop court pour la validation walk-forward."
+        return metrics
+    best = max(scored, key=lambda r: r['accuracy'])
+
+    params = best['params']
+    model, scaler, history = fit_gru(X_raw, y_raw, params['look_back'], params['epochs'],
+                                     params['batch_size'], tuple(params['units']))
+
+    directory = os.path.join(out_root, f"{symbol}_{timeframe}") if out_root else model_dir(symbol, timeframe)
+    os.makedirs(directory, exist_ok=True)
+    model.save(os.path.join(directory, 'model.h5'))
+    joblib.dump(scaler, os.path.join(directory, 'scaler.pkl'))
+    export_lite(model, scaler, os.path.join(directory, 'model.npz'), FEATURE_COLS)
+    metrics.update({
+        'best_params': params,
+        'walk_forward_accuracy': best['accuracy'],
+        'train_accuracy': float(history.history['accuracy'][-1]),
+        'grid': results,
+        'trained_at': int(time.time()),
+        'duration_s': round(time.time() - started, 2),
+    })
+    with open(os.path.join(directory, 'metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=2)
+    return metrics
+
+
+def train_many(pairs, grid=None, db_path=DB_PATH, start_epoch=None, end_epoch=None,
+               n_splits=3, workers=None, threads=None, on_result=None, out_root=None):
+    """
+    Entraîne toutes les paires [(symbol, timeframe), ...] dans un pool de processus.
+    workers : nombre de processus (défaut : min(paires, cœurs)) ;
+    threads : threads TensorFlow par worker (défaut : cœurs // workers).
+    on_result(metrics) est appelé à chaque paire terminée. Retourne la liste des métriques.
+    out_root : racine des artefacts (défaut : le répertoire de MODEL_PATH).
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+    workers = workers or min(len(pairs), os.cpu_count() or 1)
+    threads = threads or worker_threads(workers)
+    # spawn : pas de fork d'un processus où TensorFlow tourne déjà (Streamlit, tests)
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    with ProcessPoolExecutor(workers, mp_context=ctx, initializer=init_worker, initargs=(threads,)) as pool:
+        futures = {
+            pool.submit(train_pair, symbol, tf, db_path, start_epoch, end_epoch, grid, n_splits, out_root): (symbol, tf)
+            for symbol, tf in pairs
+        }
+        for future in as_completed(futures):
+            symbol, tf = futures[future]
+            try:
+                metrics = future.result()
+            except Exception as e:
+                metrics = {'symbol': symbol, 'timeframe': tf, 'error': str(e)}
+            results.append(metrics)
+            if on_result is not None:
+                on_result(metrics)
+    return results
+
+
+def load_metrics(symbol, timeframe):
+    """metrics.json d'une paire entraînée, ou None."""
+    from src.ml_logic import model_dir
+
+    path = os.path.join(model_dir(symbol, timeframe), 'metrics.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,59 @@
+# test_aggregator.py
+import numpy as np
+import pandas as pd
+
+from src.aggregator import CandleAggregator
+
+
+class ListWriter:
+    def __init__(self):
+        self.batches = []
+
+    def put(self, rows):
+        self.batches.append(list(rows))
+
+
+def test_bars_match_resample_and_first_bar_is_not_written():
+    rng = np.random.default_rng(0)
+    epochs = np.arange(1_000_030, 1_000_030 + 1800, 2)  # un tick toutes les 2 s, départ en milieu de minute
+    quotes = 100 + np.cumsum(rng.normal(0, 0.1, len(epochs)))
+
+    writer = ListWriter()
+    closed = []
+    agg = CandleAggregator(timeframes=[60, 300], writer=writer, batch_size=10)
+    agg.on_close.append(lambda symbol, tf, bar: closed.append((tf, bar)))
+    for e, q in zip(epochs.tolist(), quotes.tolist()):
+        agg.on_tick("R_10", e, q)
+    agg.flush()
+
+    ticks = pd.Series(quotes, index=pd.to_datetime(epochs, unit='s'))
+    for tf in (60, 300):
+        expected = ticks.resample(f"{tf}s").ohlc()
+        bars = [bar for tf_, bar in closed if tf_ == tf]
+        # La bougie en cours n'est pas clôturée
+        assert len(bars) == len(expected) - 1
+        for bar, (_, exp) in zip(bars[1:], expected.iloc[1:-1].iterrows()):
+            assert bar[1:] == (exp['open'], exp['high'], exp['low'], exp['close'])
+
+        bar = agg.current_bar("R_10", tf)
+        assert bar[0] == epochs[-1] - epochs[-1] % tf and bar[4] == quotes[-1]
+
+    # Seule la base est écrite, sans la première bougie (incomplète) ; le Resampler dérive 300 s
+    written = [r for batch in writer.batches for r in batch]
+    assert {r[1] for r in written} == {60}
+    assert [r[2] for r in written] == [bar[0] for tf, bar in closed if tf == 60][1:]
+
+    assert len(closed) == agg.bars_closed
+    assert all(len(batch) >= 10 for batch in writer.batches[:-1])  # écritures par lots
+
+
+def test_base_is_written_even_when_not_requested():
+    writer = ListWriter()
+    closed = []
+    agg = CandleAggregator(timeframes=[300], writer=writer, batch_size=1)
+    agg.on_close.append(lambda symbol, tf, bar: closed.append(tf))
+    for e in range(1_000_030, 1_000_030 + 900, 5):
+        agg.on_tick("R_10", e, 100.0 + e % 7)
+    written = [r for batch in writer.batches for r in batch]
+    assert written and {r[1] for r in written} == {60}
+    assert set(closed) == {300}
@@ -0,0 +1,74 @@
+# test_backfill.py
+from datetime import datetime
+
+from src import backfill
+from src.backfill import BackfillEngine, BackfillJob
+from src.data_fetcher import DataFetcher
+from src.fake_deriv import FIXED_NOW as NOW, FakeDerivServer
+
+
+def test_concurrent_backfill_against_fake_server(tmp_path):
+    start_dt = datetime.fromtimestamp(NOW - 86400 * 5)
+    end_dt = datetime.fromtimestamp(NOW)
+
+    with FakeDerivServer(latency=0.01, now=NOW) as server:
+        fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"), ws_url=server.url)
+        jobs = fetcher.fetch_history_all(
+            ["R_10", "R_25", "1HZ10V"], [60, 300], start_dt, end_dt, connections=3, rate=200
+        )
+
+    assert all(j.status == "done" for j in jobs)
+    assert server.connections == 3
+    assert server.max_in_flight > 1  # plusieurs paires servies en même temps
+
+    start_epoch = int(start_dt.timestamp())
+    for job in jobs:
+        expected = (NOW - start_epoch) // job.timeframe + 1
+        assert job.fetched == expected
+        assert fetcher.store.count(job.symbol, job.timeframe) == expected
+
+
+def test_rate_budget_is_respected(tmp_path):
+    start_dt = datetime.fromtimestamp(NOW - 86400 * 14)
+    end_dt = datetime.fromtimestamp(NOW)
+
+    with FakeDerivServer(now=NOW) as server:
+        fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"), ws_url=server.url)
+        t0 = datetime.now()
+        fetcher.fetch_history_all(["R_10"], [60, 300], start_dt, end_dt, connections=2, rate=20)
+        elapsed = (datetime.now() - t0).total_seconds()
+
+    # 5 requêtes pour 14 jours en 1 minute ; les 5 minutes sont calculées localement
+    assert server.requests == 5
+    assert fetcher.store.count("R_10", 300) == 14 * 86400 // 300
+    assert elapsed >= (server.requests - 1) / 20
+
+
+def test_lost_connection_is_closed_before_reconnecting(monkeypatch):
+    opened = []
+
+    class BrokenWs:
+        def __init__(self):
+            self.closed = False
+            opened.append(self)
+
+        async def close(self):
+            self.closed = True
+            if len(opened) == 1:
+                raise OSError("déjà fermée")
+
+    async def connect(url, **kwargs):
+        return BrokenWs()
+
+    async def run_job(ws, limiter, job):
+        if len(opened) == 1:
+            raise OSError("connexion perdue")
+        job.status = "done"
+
+    monkeypatch.setattr(backfill.websockets, "connect", connect)
+    engine = BackfillEngine(save=lambda batch: None, url="ws://test", connections=1)
+    monkeypatch.setattr(engine, "_run_job", run_job)
+    jobs = engine.run_sync([BackfillJob("R_10", 60, 0, NOW)])
+
+    assert jobs[0].status == "done"
+    assert len(opened) == 2 and all(ws.closed for ws in opened)
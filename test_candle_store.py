@@ -0,0 +1,40 @@
+# test_candle_store.py
+from datetime import datetime
+
+from src.data_fetcher import DataFetcher
+
+
+def rows(symbol, tf, epochs):
+    return [(symbol, tf, e, 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i) for i, e in enumerate(epochs)]
+
+
+def test_delta_and_range(tmp_path):
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+    fetcher.save_to_db(rows("R_10", 60, range(0, 600, 60)))
+
+    df = fetcher.load_data("R_10", 60)
+    assert len(df) == 10 and list(df.columns)[:7] == ['symbol', 'timeframe', 'epoch', 'open', 'high', 'low', 'close']
+
+    # Bougies plus récentes : seul le delta est ajouté à la série existante
+    series = fetcher.store.refresh("R_10", 60)
+    fetcher.save_to_db(rows("R_10", 60, range(600, 900, 60)))
+    assert fetcher.store.refresh("R_10", 60) is series
+    assert series.size == 15
+
+    window = fetcher.load_data("R_10", 60, datetime.fromtimestamp(120), datetime.fromtimestamp(300))
+    assert window['epoch'].tolist() == [120, 180, 240, 300]
+    assert fetcher.count_period("R_10", 60, datetime.fromtimestamp(120), datetime.fromtimestamp(300)) == 4
+
+    new = fetcher.candles_since("R_10", 60, 780)
+    assert new['epoch'].tolist() == [840]
+
+
+def test_backfill_reloads_series(tmp_path):
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+    fetcher.save_to_db(rows("R_10", 60, range(600, 900, 60)))
+    assert fetcher.store.count("R_10", 60) == 5
+
+    # Historique plus ancien (backfill) : la série est rechargée entièrement
+    fetcher.save_to_db(rows("R_10", 60, range(0, 600, 60)))
+    df = fetcher.load_data("R_10", 60)
+    assert df['epoch'].tolist() == list(range(0, 900, 60))
@@ -0,0 +1,76 @@
+# test_coverage.py
+from datetime import datetime
+
+from src.coverage import merge_intervals, missing_ranges
+from src.data_fetcher import DataFetcher
+from src.fake_deriv import FIXED_NOW as NOW, FakeDerivServer, NullProgress
+
+DAY = 86400
+
+
+def test_missing_ranges():
+    covered = [(600, 1199), (1800, 2399)]
+    assert missing_ranges([], 0, 3000, 60) == [(0, 3000)]
+    assert missing_ranges(covered, 0, 3000, 60) == [(0, 599), (1200, 1799), (2400, 3000)]
+    assert missing_ranges(covered, 700, 1100, 60) == []
+    # Écart sans aucun epoch multiple de 60 : rien à demander
+    assert missing_ranges([(0, 1200), (1230, 3000)], 0, 3000, 60) == []
+    assert merge_intervals([(0, 1199), (1200, 1799), (1861, 2000)], 60) == [(0, 1799), (1861, 2000)]
+
+
+def test_extending_history_costs_one_request(tmp_path):
+    with FakeDerivServer(now=NOW) as server:
+        fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"), ws_url=server.url)
+        start_dt = datetime.fromtimestamp(NOW - 31 * DAY)
+
+        fetcher.fetch_history_all(["R_10"], [60], start_dt, datetime.fromtimestamp(NOW - DAY), rate=500)
+        first = server.requests
+        assert first >= 9
+
+        fetcher.fetch_history_all(["R_10"], [60], start_dt, datetime.fromtimestamp(NOW), rate=500)
+        assert server.requests - first == 1
+
+        # Tout est couvert : aucune requête
+        fetcher.fetch_history_all(["R_10"], [60], start_dt, datetime.fromtimestamp(NOW), rate=500)
+        assert server.requests - first == 1
+
+    assert fetcher.store.count("R_10", 60) == 31 * DAY // 60 + 1
+
+
+def test_fetch_history_reverse_skips_covered_ranges(tmp_path):
+    with FakeDerivServer(now=NOW) as server:
+        fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"), ws_url=server.url)
+        start_dt = datetime.fromtimestamp(NOW - 10 * DAY)
+        end_dt = datetime.fromtimestamp(NOW)
+
+        # 5 minutes : seule la base 60 s est téléchargée, les barres sont calculées localement
+        assert fetcher.fetch_history_reverse("R_25", 300, start_dt, end_dt, NullProgress()) == 10 * DAY // 60 + 1
+        requests = server.requests
+        assert fetcher.fetch_history_reverse("R_25", 300, start_dt, end_dt, NullProgress()) == 0
+        assert fetcher.fetch_history_reverse("R_25", 900, start_dt, end_dt, NullProgress()) == 0
+        assert server.requests == requests
+        fetcher.ws.close()
+
+    assert fetcher.store.count("R_25", 300) == 10 * DAY // 300
+
+
+def test_failed_write_is_not_marked_covered(tmp_path, monkeypatch):
+    with FakeDerivServer(now=NOW) as server:
+        fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"), ws_url=server.url)
+        fetcher.request_pause = 0
+        start_dt, end_dt = datetime.fromtimestamp(NOW - DAY), datetime.fromtimestamp(NOW)
+
+        def disk_full(rows, conn=None):
+            raise OSError("disk full")
+
+        with monkeypatch.context() as m:
+            m.setattr(fetcher.db, "bulk_ingest", disk_full)
+            fetcher.fetch_history_reverse("R_10", 60, start_dt, end_dt, NullProgress())
+            jobs = fetcher.fetch_history_all(["R_25"], [60], start_dt, end_dt, rate=500)
+        assert fetcher.coverage.missing("R_10", 60, int(start_dt.timestamp()), NOW)
+        assert jobs[0].status == "error" and fetcher.coverage.missing("R_25", 60, int(start_dt.timestamp()), NOW)
+
+        # Nouvelle tentative : l'intervalle est redemandé et cette fois écrit
+        assert fetcher.fetch_history_reverse("R_10", 60, start_dt, end_dt, NullProgress()) == DAY // 60 + 1
+        assert fetcher.store.count("R_10", 60) == DAY // 60 + 1
+        fetcher.ws.close()
@@ -0,0 +1,71 @@
+# test_db.py
+import threading
+
+from src.candle_writer import CandleWriter
+from src.data_fetcher import DataFetcher
+
+
+def candle_rows(n, symbol="R_50", tf=60):
+    for i in range(n):
+        yield (symbol, tf, i * tf, 1.0, 2.0, 0.5, 1.5)
+
+
+def test_connections_are_reused_and_in_wal(tmp_path):
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+    with fetcher.db.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    for _ in range(20):
+        fetcher.db.query("SELECT COUNT(*) FROM candles")
+    assert len(fetcher.db._all) == 1
+
+
+def test_bulk_ingest_generator(tmp_path):
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+    assert fetcher.store.count("R_50", 60) == 0
+    assert fetcher.bulk_ingest(candle_rows(250_000), chunk_size=50_000) == 250_000
+    assert fetcher.store.count("R_50", 60) == 250_000
+
+
+def test_reads_do_not_wait_for_writer(tmp_path):
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+    fetcher.save_to_db(list(candle_rows(10)))
+
+    # Transaction d'écriture ouverte (non validée) dans un autre thread
+    writer = fetcher.db.open()
+    writer.execute("BEGIN IMMEDIATE")
+    writer.executemany('INSERT INTO candles VALUES (?,?,?,?,?,?,?)', list(candle_rows(100, "R_75")))
+
+    result = []
+    reader = threading.Thread(target=lambda: result.append(fetcher.db.query("SELECT COUNT(*) FROM candles WHERE timeframe=60")))
+    reader.start()
+    reader.join(2)
+    writer.commit()
+
+    assert result == [[(10,)]]
+
+
+def test_writer_hook_error_is_not_a_write_error(tmp_path):
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+
+    def hook(rows):
+        raise RuntimeError("resampler")
+
+    writer = CandleWriter(fetcher.db, on_commit=hook)
+    writer.put(list(candle_rows(10)))
+    writer.flush()
+    writer.close()
+    assert writer.pop_error() is None
+    assert writer.rows_written == 10
+    assert fetcher.db.query("SELECT COUNT(*) FROM candles")[0][0] == 10
+
+
+def test_writer_restart_does_not_leak_connections(tmp_path):
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+    fetcher.db.query("SELECT 1")
+    before = len(fetcher.db._all)
+    writer = CandleWriter(fetcher.db)
+    for i in range(3):
+        writer.put(list(candle_rows(5, symbol=f"R_{i}")))
+        writer.flush()
+        writer.close()
+    assert len(fetcher.db._all) == before
@@ -0,0 +1,75 @@
+# test_executor.py
+import asyncio
+
+import config
+from src.executor import TradeExecutor, execute_trade
+from src.fake_deriv import FakeDerivServer
+
+
+def order(symbol, contract_type="CALL"):
+    return {"symbol": symbol, "contract_type": contract_type, "amount": 1, "duration": 1, "duration_unit": "m"}
+
+
+def test_concurrent_orders_on_one_session():
+    async def scenario():
+        async with FakeDerivServer(latency=0.05, concurrent=True, contract_time_scale=0.002) as server:
+            executor = TradeExecutor("token", url=server.url)
+            results = await executor.send_orders([order(f"R_{i}", "CALL" if i % 2 else "PUT") for i in range(10)])
+            assert all(r["status"] == "success" for r in results)
+            assert len({r["contract_id"] for r in results}) == 10
+            # Une connexion, un authorize, les 10 achats en vol en même temps
+            assert server.connections == 1 and server.authorizations == 1
+            assert server.max_in_flight >= 10
+
+            for _ in range(100):
+                if not executor.active_contracts:
+                    break
+                await asyncio.sleep(0.05)
+            assert executor.active_contracts == []
+            assert {executor.contracts[r["contract_id"]]["status"] for r in results} <= {"won", "lost"}
+
+            # Connexion perdue : l'ordre suivant reconnecte et ré-autorise
+            await executor._ws.close()
+            await asyncio.sleep(0.05)
+            assert (await executor.send_order(**order("R_10")))["status"] == "success"
+            assert server.connections == 2 and server.authorizations == 2
+            await executor.close()
+
+    asyncio.run(scenario())
+
+
+def test_errors_and_sync_bridge(monkeypatch):
+    with FakeDerivServer(concurrent=True) as server:
+        executor = TradeExecutor("", url=server.url).start()
+        result = executor.run(executor.send_order("R_10", "CALL", 1, 1), timeout=10)
+        assert result == {"status": "error", "message": "The token is invalid."}
+        executor.stop()
+
+        executor = TradeExecutor("token", url=server.url).start()
+        assert executor.run(executor.send_order("R_10", "RISE", 1, 1), timeout=10)["status"] == "error"
+        assert executor.run(executor.send_order("R_10", "PUT", 1, 5, "t"), timeout=10)["status"] == "success"
+        executor.stop()
+
+    monkeypatch.setattr(config, "DERIV_TOKEN", "")
+    assert execute_trade("R_10", "🚀 SIGNAL ACHAT (CALL)")["status"] == "error"
+
+
+def test_authorize_failure_does_not_keep_the_session():
+    async def scenario():
+        async with FakeDerivServer(latency=0.5, concurrent=True) as server:
+            executor = TradeExecutor("token", url=server.url, timeout=0.1)
+            try:
+                await executor.connect()
+                raise AssertionError("authorize aurait dû expirer")
+            except asyncio.TimeoutError:
+                pass
+            assert not executor.connected and executor.account is None
+
+            # Connexion suivante : nouvelle socket, authorize refait
+            server.latency = 0
+            assert (await executor.connect())["loginid"] == "VRTC0000001"
+            assert server.connections == 2
+            assert (await executor.send_order(**order("R_10")))["status"] == "success"
+            await executor.close()
+
+    asyncio.run(scenario())
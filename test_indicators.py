@@ -0,0 +1,50 @@
+# test_indicators.py
+import numpy as np
+import pandas as pd
+
+from src.indicators import StreamingIndicators, add_indicators
+
+
+def random_candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.3, n))
+    return pd.DataFrame({
+        'epoch': 1_700_000_000 + 60 * np.arange(n),
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+    })
+
+
+def test_streaming_matches_batch():
+    df = random_candles(600)
+    batch = add_indicators(df).set_index('epoch')
+
+    engine = StreamingIndicators(window=len(df))
+    engine.seed(df)
+    stream = engine.frame().set_index('epoch')
+
+    assert list(stream.index) == list(batch.index)
+    for col in StreamingIndicators.FEATURES:
+        np.testing.assert_allclose(stream[col], batch[col], rtol=1e-9, atol=1e-9)
+
+
+def test_incremental_push_and_peek():
+    df = random_candles(300, seed=1)
+    engine = StreamingIndicators(window=10).seed(df.iloc[:-1])
+
+    last = df.iloc[-1]
+    peeked = engine.peek(last['epoch'], last['open'], last['high'], last['low'], last['close'])
+    assert engine.last_epoch == df['epoch'].iloc[-2]  # peek ne modifie pas l'état
+
+    pushed = engine.push(last['epoch'], last['open'], last['high'], last['low'], last['close'])
+    assert peeked == pushed
+
+    batch = add_indicators(df).tail(10).reset_index(drop=True)
+    stream = engine.frame()
+    assert len(stream) == 10 and engine.ready
+    for col in StreamingIndicators.FEATURES:
+        np.testing.assert_allclose(stream[col], batch[col], rtol=1e-9, atol=1e-9)
@@ -0,0 +1,77 @@
+# test_lite_model.py
+import os
+import subprocess
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from src.lite_model import LiteModel, export_artifacts, lite_path, model_look_back, predict_live
+from src.ml_logic import FEATURE_COLS, build_model, predict_next, predict_proba
+
+
+def test_matches_keras(tmp_path):
+    rng = np.random.default_rng(0)
+    model = build_model((10, 6), units=(16, 8))
+    # Poids non nuls partout (les biais Keras démarrent à zéro)
+    model.set_weights([w + rng.normal(0, 0.1, w.shape) for w in model.get_weights()])
+    scaler = MinMaxScaler().fit(rng.random((200, 6)) * 50)
+    model_path, scaler_path = str(tmp_path / "model.h5"), str(tmp_path / "scaler.pkl")
+    model.save(model_path)
+    joblib.dump(scaler, scaler_path)
+
+    lite = LiteModel.load(export_artifacts(model_path, scaler_path))
+    assert lite.look_back == 10 and lite.features == FEATURE_COLS
+
+    raw = rng.random((32, 10, 6)) * 50
+    expected = predict_proba(model, scaler.transform(raw.reshape(-1, 6)).reshape(32, 10, 6).astype(np.float32))
+    np.testing.assert_allclose(lite.predict_proba(lite.transform(raw)), expected, atol=1e-5)
+
+    window = pd.DataFrame(raw[0], columns=FEATURE_COLS)
+    cls, conf = lite.predict(window)
+    ref_cls, ref_conf = predict_next(window, model_path, scaler_path)
+    assert cls == ref_cls and abs(conf - ref_conf) < 1e-5
+
+
+def test_predict_live_prefers_fresh_export(tmp_path, monkeypatch):
+    model_path, scaler_path = str(tmp_path / "model.h5"), str(tmp_path / "scaler.pkl")
+    build_model((10, 6)).save(model_path)
+    joblib.dump(MinMaxScaler().fit(np.random.default_rng(1).random((50, 6))), scaler_path)
+    monkeypatch.setattr("src.lite_model.model_paths", lambda symbol, tf: (model_path, scaler_path))
+    window = pd.DataFrame(np.random.default_rng(2).random((10, 6)), columns=FEATURE_COLS)
+
+    expected = predict_next(window, model_path, scaler_path)
+    assert predict_live(window, "R_10", 60)[0] == expected[0]  # pas encore d'export : Keras
+
+    export_artifacts(model_path, scaler_path)
+    cls, conf = predict_live(window, "R_10", 60)
+    assert cls == expected[0] and abs(conf - expected[1]) < 1e-5
+    assert predict_live(window.iloc[:5], "R_10", 60) == (None, 0.0)
+
+    # Modèle ré-entraîné après l'export : l'artefact léger est ignoré
+    later = time.time() + 10
+    os.utime(model_path, (later, later))
+    assert os.path.getmtime(lite_path(model_path)) < os.path.getmtime(model_path)
+    assert predict_live(window, "R_10", 60)[0] == expected[0]
+
+
+def test_model_look_back_per_pair(tmp_path, monkeypatch):
+    model_path, scaler_path = str(tmp_path / "model.h5"), str(tmp_path / "scaler.pkl")
+    monkeypatch.setattr("src.lite_model.model_paths", lambda symbol, tf: (model_path, scaler_path))
+    assert model_look_back("R_10", 60) == 10  # pas de modèle : valeur par défaut
+
+    build_model((20, 6)).save(model_path)
+    joblib.dump(MinMaxScaler().fit(np.random.default_rng(1).random((50, 6))), scaler_path)
+    assert model_look_back("R_10", 60) == 20  # modèle Keras seul
+    export_artifacts(model_path, scaler_path)
+    assert model_look_back("R_10", 60) == 20  # artefact léger
+
+
+def test_import_does_not_load_tensorflow():
+    code = "import sys; import src.lite_model; print('tensorflow' in sys.modules, 'sklearn' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert out.stdout.split() == ["False", "False"]
@@ -0,0 +1,44 @@
+# test_live_chart.py
+from src.live_chart import RenderScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fps_limit_and_coalescing():
+    clock = FakeClock()
+    sched = RenderScheduler(max_fps=4, window=10, clock=clock)
+
+    sched.push([1.0, 2.0], first_index=0)
+    mode, df = sched.frame()
+    assert mode == 'reset' and df['Prix'].tolist() == [1.0, 2.0]
+
+    # 3 ticks en 0.1 s : pas d'image avant 0.25 s, puis un seul envoi regroupé
+    for i, t in enumerate((0.05, 0.1, 0.15)):
+        clock.now = t
+        sched.push([10.0 + i], first_index=2 + i)
+        assert not sched.due()
+    clock.now = 0.25
+    assert sched.due()
+    mode, df = sched.frame()
+    assert mode == 'append' and df.index.tolist() == [2, 3, 4]
+    assert not sched.due()
+
+
+def test_reset_keeps_chart_bounded():
+    clock = FakeClock()
+    sched = RenderScheduler(max_fps=1000, window=5, clock=clock)
+    modes = []
+    for i in range(20):
+        clock.now += 1
+        sched.push([float(i)], first_index=i)
+        mode, df = sched.frame()
+        modes.append(mode)
+        if mode == 'reset':
+            assert len(df) <= 5 and df.index[-1] == i
+    assert modes.count('reset') == 4
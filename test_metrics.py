@@ -0,0 +1,70 @@
+# test_metrics.py
+import time
+import urllib.request
+from datetime import datetime
+
+from src.data_fetcher import DataFetcher
+from src.fake_deriv import FIXED_NOW as NOW, FakeDerivServer, NullProgress
+from src.metrics import LoopProfiler, MetricsRegistry, metrics, serve_prometheus
+
+
+def test_quantiles_and_prometheus_text():
+    registry = MetricsRegistry()
+    for ms in range(1, 101):
+        registry.observe("load_data", ms / 1000)
+    registry.count("candles_fetched", 5000)
+    registry.count("candles_fetched", 10)
+
+    row = registry.summary()[0]
+    assert row['étape'] == "load_data" and row['appels'] == 100
+    assert row['p50_ms'] == 51 and row['p99_ms'] == 100 and row['max_ms'] == 100
+
+    text = registry.prometheus()
+    assert '# TYPE trading_stage_seconds histogram' in text
+    assert 'trading_stage_seconds_bucket{stage="load_data",le="0.01"} 10' in text
+    assert 'trading_stage_seconds_bucket{stage="load_data",le="+Inf"} 100' in text
+    assert 'trading_stage_seconds_count{stage="load_data"} 100' in text
+    assert 'trading_events_total{event="candles_fetched"} 5010' in text
+
+
+def test_http_exporter():
+    registry = MetricsRegistry()
+    with registry.timer("predict_next"):
+        pass
+    server = serve_prometheus(0, registry, host="127.0.0.1")
+    try:
+        body = urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics").read().decode()
+    finally:
+        server.shutdown()
+    assert 'trading_stage_seconds_count{stage="predict_next"} 1' in body
+
+
+def test_fetch_path_is_instrumented(tmp_path):
+    metrics.reset()
+    with FakeDerivServer(now=NOW) as server:
+        fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"), ws_url=server.url)
+        fetcher.fetch_history_reverse("R_10", 60, datetime.fromtimestamp(NOW - 86400),
+                                      datetime.fromtimestamp(NOW), NullProgress())
+        fetcher.ws.close()
+    fetcher.load_data("R_10", 60)
+
+    stages = {row['étape']: row['appels'] for row in metrics.summary()}
+    assert stages['ws_recv'] == stages['fetch_batch'] == server.requests
+    assert stages['load_data'] == 1 and stages['writer_commit'] >= 1
+    assert metrics.counters['candles_fetched'] == metrics.counters['candles_written'] == 86400 // 60 + 1
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+
+def test_loop_profiler_modes():
+    with LoopProfiler('sampling', interval=0.002).running() as profiler:
+        busy_loop(0.2)
+    assert profiler.n_samples > 10 and "busy_loop" in profiler.report
+
+    with LoopProfiler('cprofile').running() as profiler:
+        busy_loop(0.05)
+    assert "busy_loop" in profiler.report
@@ -0,0 +1,62 @@
+# test_model_registry.py
+import os
+
+from src.model_registry import ModelRegistry
+
+
+def make_files(tmp_path, name):
+    model_path = tmp_path / f"{name}.h5"
+    scaler_path = tmp_path / f"{name}.pkl"
+    model_path.write_text("model")
+    scaler_path.write_text("scaler")
+    return str(model_path), str(scaler_path)
+
+
+def fake_loader(calls):
+    def loader(model_path, scaler_path):
+        calls.append(model_path)
+        return object(), object()
+    return loader
+
+
+def test_model_is_loaded_once(tmp_path):
+    calls = []
+    registry = ModelRegistry(fake_loader(calls))
+    paths = make_files(tmp_path, "a")
+
+    first = registry.get(*paths)
+    second = registry.get(*paths)
+
+    assert first[0] is second[0]
+    assert len(calls) == 1
+
+
+def test_reload_when_file_changes(tmp_path):
+    calls = []
+    registry = ModelRegistry(fake_loader(calls))
+    model_path, scaler_path = make_files(tmp_path, "a")
+    first = registry.get(model_path, scaler_path)
+
+    with open(model_path, "w") as f:
+        f.write("model v2")
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    second = registry.get(model_path, scaler_path)
+    assert first[0] is not second[0]
+    assert len(calls) == 2
+
+
+def test_lru_eviction(tmp_path):
+    calls = []
+    registry = ModelRegistry(fake_loader(calls), max_models=2)
+    a, b, c = (make_files(tmp_path, n) for n in "abc")
+
+    registry.get(*a)
+    registry.get(*b)
+    registry.get(*a)  # 'a' devient le plus récent
+    registry.get(*c)  # 'b' est évincé
+
+    assert a in registry and c in registry
+    assert b not in registry
+    assert len(registry) == 2
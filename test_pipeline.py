@@ -0,0 +1,61 @@
+# test_pipeline.py
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+
+from src.data_fetcher import DataFetcher
+from src.indicators import add_indicators
+from src.ml_logic import make_windows, prepare_data
+from src.pipeline import CandleStream, iter_candle_chunks, train_gru_streaming
+
+
+@pytest.fixture
+def fetcher(tmp_path):
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+    rng = np.random.default_rng(1)
+    close = 100 + np.cumsum(rng.normal(0, 3, 3000))
+    fetcher.save_to_db([("R_10", 60, i * 60, c, c + rng.random(), c - rng.random(), c) for i, c in enumerate(close)])
+    return fetcher
+
+
+def test_chunks_match_prepare_data(fetcher):
+    assert [len(c) for c in iter_candle_chunks(fetcher.db, "R_10", 60, chunk_rows=1000)] == [1000, 1000, 1000]
+
+    X_ref, y_ref = prepare_data(add_indicators(fetcher.load_data("R_10", 60)))
+    stream = CandleStream(fetcher.db, "R_10", 60, chunk_rows=400, warmup=800)
+    parts = list(stream.chunks())
+    X = np.concatenate([X for _, X, _ in parts])
+    y = np.concatenate([y for _, _, y in parts])
+
+    assert X.shape == X_ref.shape and y.dtype == np.int8
+    np.testing.assert_allclose(X, X_ref, rtol=1e-6)
+    assert (y == y_ref).all()
+
+    scaler = stream.fit_scaler()
+    ref = MinMaxScaler().fit(X_ref)
+    np.testing.assert_allclose(scaler.data_min_, ref.data_min_)
+    np.testing.assert_allclose(scaler.data_max_, ref.data_max_)
+    assert stream.rows == len(X_ref)
+
+
+def test_dataset_windows_cross_chunks(fetcher):
+    stream = CandleStream(fetcher.db, "R_10", 60, chunk_rows=500)
+    scaler = stream.fit_scaler()
+    X_ref, y_ref = prepare_data(add_indicators(fetcher.load_data("R_10", 60)))
+    w_ref, t_ref = make_windows(scaler.transform(X_ref).astype(np.float32), y_ref, 10)
+
+    batches = list(stream.dataset(scaler, look_back=10, batch_size=256, shuffle=False).as_numpy_iterator())
+    w = np.concatenate([b[0] for b in batches])
+    t = np.concatenate([b[1] for b in batches])
+    assert w.shape == w_ref.shape and t.shape == (len(t_ref), 3)
+    np.testing.assert_allclose(w, w_ref, atol=1e-6)
+    assert (t.argmax(axis=1) == t_ref).all()
+
+
+def test_train_gru_streaming(fetcher, tmp_path):
+    model_path, scaler_path = str(tmp_path / "m" / "model.h5"), str(tmp_path / "m" / "scaler.pkl")
+    msg = train_gru_streaming(fetcher.db, "R_10", 60, epochs=1, chunk_rows=1000,
+                              model_path=model_path, scaler_path=scaler_path)
+    assert msg.startswith("Modèle entraîné")
+    assert all((tmp_path / "m" / name).exists() for name in ("model.h5", "scaler.pkl", "model.npz"))
+    assert train_gru_streaming(fetcher.db, "R_99", 60).startswith("Pas assez")
@@ -0,0 +1,55 @@
+# test_prepare_data.py
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.ml_logic import FEATURE_COLS, prepare_data
+
+
+def legacy_prepare_data(df):
+    """Ancienne version : colonnes ajoutées au DataFrame puis dropna().copy()."""
+    df['future_close'] = df['close'].shift(-1)
+    df['pct_change'] = ((df['future_close'] - df['close']) / df['close']) * 100
+    df['target'] = np.select([df['pct_change'] >= 2.5, df['pct_change'] <= -2.5], [1, 2], default=0)
+    df_clean = df.dropna().copy()
+    return df_clean[FEATURE_COLS].values, df_clean['target'].values
+
+
+def frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    df = pd.DataFrame({c: close * rng.uniform(0.9, 1.1, n) for c in FEATURE_COLS})
+    df['close'] = close
+    df['epoch'] = np.arange(n) * 60
+    return df
+
+
+def peak(func, df):
+    tracemalloc.start()
+    func(df)
+    _, used = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used
+
+
+def test_matches_legacy_without_mutation():
+    df = frame(5000)
+    df.loc[3, 'RSI5'] = np.nan  # ligne incomplète au milieu
+    columns = list(df.columns)
+
+    X, y = prepare_data(df)
+    X_ref, y_ref = legacy_prepare_data(df.copy())
+    assert list(df.columns) == columns
+    assert X.dtype == np.float32 and y.dtype == np.int8
+    np.testing.assert_allclose(X, X_ref, rtol=1e-6)
+    assert (y == y_ref).all() and set(np.unique(y)) == {0, 1, 2}
+
+
+def test_peak_memory():
+    df = frame(500_000)
+    before = peak(lambda d: legacy_prepare_data(d.copy()), df) - df.memory_usage().sum()
+    after = peak(prepare_data, df)
+    # Après : features float32 (12 Mo) + cibles int8 + un vecteur de travail float64
+    assert after < 4 * 500_000 * len(FEATURE_COLS) * 4
+    assert after * 3 < before
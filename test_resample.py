@@ -0,0 +1,93 @@
+# test_resample.py
+import numpy as np
+import pandas as pd
+
+from src.data_fetcher import DataFetcher
+from src.resample import resample_ohlc
+
+
+def base_rows(symbol, epochs, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, len(epochs)))
+    opens = close + rng.normal(0, 0.3, len(epochs))
+    high = np.maximum(opens, close) + rng.random(len(epochs))
+    low = np.minimum(opens, close) - rng.random(len(epochs))
+    return [(symbol, 60, int(e), float(o), float(h), float(l), float(c))
+            for e, o, h, l, c in zip(epochs, opens, high, low, close)]
+
+
+def pandas_resample(rows, tf):
+    df = pd.DataFrame(rows, columns=['symbol', 'timeframe', 'epoch', 'open', 'high', 'low', 'close'])
+    df.index = pd.to_datetime(df['epoch'], unit='s')
+    out = df.resample(f'{tf}s').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last'}).dropna()
+    return (out.index - pd.Timestamp(0)) // pd.Timedelta(seconds=1), out
+
+
+def test_matches_pandas_with_gaps():
+    epochs = np.r_[np.arange(0, 3600 * 3, 60), np.arange(3600 * 5 + 120, 3600 * 7, 60)]
+    rows = base_rows("R_10", epochs)
+    cols = np.array([r[2:] for r in rows])
+    for tf in (300, 900, 3600):
+        e, o, h, l, c = resample_ohlc(cols[:, 0], *cols[:, 1:].T, tf)
+        ref_epochs, ref = pandas_resample(rows, tf)
+        assert e.tolist() == ref_epochs.tolist()
+        np.testing.assert_array_equal(o, ref['open'])
+        np.testing.assert_array_equal(h, ref['high'])
+        np.testing.assert_array_equal(l, ref['low'])
+        np.testing.assert_array_equal(c, ref['close'])
+
+
+def test_incremental_refresh(tmp_path):
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+    rows = base_rows("R_10", np.arange(0, 7200, 60))
+
+    # Première heure + 2 minutes : la barre 5 min en cours n'est pas écrite
+    fetcher.save_to_db(rows[:62])
+    assert fetcher.load_data("R_10", 300)['epoch'].tolist() == list(range(0, 3600, 300))
+    assert fetcher.count_period("R_10", 3600, pd.Timestamp(0, unit='s'), pd.Timestamp(7200, unit='s')) == 1
+
+    # Suite puis backfill d'un trou : les barres touchées sont recalculées
+    fetcher.save_to_db(rows[62:])
+    df = fetcher.load_data("R_10", 900)
+    _, ref = pandas_resample(rows, 900)
+    np.testing.assert_allclose(df[['open', 'high', 'low', 'close']].to_numpy(), ref.to_numpy())
+
+    # Les 60 s arrivées hors ordre (écrites par le thread writer) réécrivent la barre
+    fetcher.db.execute("DELETE FROM candles WHERE timeframe=60 AND epoch BETWEEN 3600 AND 3840")
+    fetcher.resampler.rebuild("R_10")
+    fetcher.writer.put(rows[60:65])
+    fetcher.writer.flush()
+    df = fetcher.load_data("R_10", 3600, columnar=True)
+    _, ref = pandas_resample(rows, 3600)
+    np.testing.assert_allclose(df[['open', 'high', 'low', 'close']].to_numpy(), ref.to_numpy())
+
+
+def test_derived_timeframes_fetch_base_only(tmp_path):
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+    assert fetcher.fetch_timeframe(900) == 60
+    assert fetcher.fetch_timeframe(60) == 60
+    assert fetcher.fetch_timeframe(90) == 90
+
+
+def test_new_base_candle_keeps_derived_caches(tmp_path):
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+    rows = base_rows("R_10", np.arange(0, 3600, 60))
+    # Minute 30 absente (trou), dernière minute pas encore arrivée
+    fetcher.save_to_db(rows[:30] + rows[31:-1])
+    fetcher.columnar.sync("R_10", 300)
+    parts = fetcher.columnar.parts("R_10", 300)
+    series = fetcher.store.refresh("R_10", 300)
+
+    # Nouvelle minute : la barre précédente est inchangée, rien n'est invalidé
+    fetcher.save_to_db(rows[-1:])
+    assert fetcher.columnar.parts("R_10", 300) == parts
+    assert fetcher.store.refresh("R_10", 300) is series and series.size == 12
+
+    # Minute manquante arrivée après coup dans une barre exportée : seule la fin est tronquée puis relue
+    fetcher.save_to_db(rows[30:31])
+    assert fetcher.store.refresh("R_10", 300) is series
+    assert fetcher.columnar.last_epoch("R_10", 300) == 1500
+    fetcher.columnar.sync("R_10", 300)
+    _, ref = pandas_resample(rows, 300)
+    for cols in (fetcher.columnar.arrays("R_10", 300), series.view(0, series.size)):
+        np.testing.assert_allclose(np.column_stack([cols[f] for f in ('open', 'high', 'low', 'close')]), ref.to_numpy())
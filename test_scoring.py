@@ -0,0 +1,43 @@
+# test_scoring.py
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from src.ml_logic import build_model, load_artifacts, predict_next
+from src.model_registry import ModelRegistry
+from src.scoring import ScoringService
+
+FEATURES = ['close', 'MA5', 'SMMA35', 'RSI5', 'Stoch_K', 'Stoch_D']
+
+
+def save_model(tmp_path, look_back=10):
+    rng = np.random.default_rng(0)
+    model = build_model((look_back, 6))
+    model_path, scaler_path = str(tmp_path / "model.h5"), str(tmp_path / "scaler.pkl")
+    model.save(model_path)
+    joblib.dump(MinMaxScaler().fit(rng.random((100, 6)) * 100), scaler_path)
+    return model_path, scaler_path
+
+
+def test_batched_scores_match_single_predictions(tmp_path):
+    paths = save_model(tmp_path)
+    rng = np.random.default_rng(1)
+    windows = {(f"R_{i}", 60): pd.DataFrame(rng.random((10, 6)) * 100, columns=FEATURES) for i in range(11)}
+    windows[("R_short", 60)] = windows[("R_0", 60)].head(5)  # mauvaise longueur
+
+    service = ScoringService(ModelRegistry(load_artifacts), lambda symbol, tf: paths)
+    results = service.score(windows)
+
+    assert results[("R_short", 60)] == (None, 0.0)
+    for key, window in windows.items():
+        if key == ("R_short", 60):
+            continue
+        cls, conf = predict_next(window, *paths)
+        assert results[key][0] == cls
+        assert abs(results[key][1] - conf) < 1e-5
+
+
+def test_missing_model(tmp_path):
+    service = ScoringService(ModelRegistry(load_artifacts), lambda symbol, tf: (str(tmp_path / "absent.h5"), "x"))
+    assert service.score({("R_10", 60): np.zeros((10, 6))}) == {("R_10", 60): (None, 0.0)}
@@ -0,0 +1,56 @@
+# test_shared_resources.py
+import os
+import subprocess
+import sys
+import threading
+from datetime import datetime
+
+from src.data_fetcher import DataFetcher
+from src.fake_deriv import FIXED_NOW as NOW, FakeDerivServer, NullProgress
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_concurrent_sessions_download_once(tmp_path):
+    # Deux sessions demandent le même historique au fetcher partagé : une seule série de requêtes
+    with FakeDerivServer(now=NOW) as server:
+        fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"), ws_url=server.url)
+        start_dt, end_dt = datetime.fromtimestamp(NOW - 3 * 86400), datetime.fromtimestamp(NOW)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            fetcher.fetch_history_reverse("R_10", 60, start_dt, end_dt, NullProgress()))) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+        fetcher.ws.close()
+
+    assert sorted(results) == [0, 3 * 86400 // 60 + 1]
+    assert server.requests == 1 and server.connections == 1
+
+
+def test_sessions_share_process_resources(tmp_path):
+    # Plusieurs sessions Streamlit dans un même processus : un seul DataFetcher, pool SQLite constant
+    (tmp_path / "database").mkdir()
+    code = (
+        "from streamlit.testing.v1 import AppTest\n"
+        "import src.data_fetcher as data_fetcher\n"
+        "created = []\n"
+        "init = data_fetcher.DataFetcher.__init__\n"
+        "def counting_init(self, *args, **kwargs):\n"
+        "    created.append(self)\n"
+        "    init(self, *args, **kwargs)\n"
+        "data_fetcher.DataFetcher.__init__ = counting_init\n"
+        "connections = []\n"
+        "for _ in range(4):\n"
+        f"    at = AppTest.from_file({os.path.join(ROOT, 'main.py')!r}, default_timeout=120)\n"
+        "    at.run()\n"
+        "    assert not at.exception, [e.value for e in at.exception]\n"
+        "    connections.append(len(created[0].db._all))\n"
+        "print(len(created), len(set(connections)))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=tmp_path,
+                         env={**os.environ, "PYTHONPATH": ROOT})
+    assert out.returncode == 0, out.stderr[-2000:]
+    # 1 DataFetcher créé, même nombre de connexions SQLite après chaque session
+    assert out.stdout.strip().splitlines()[-1] == "1 1"
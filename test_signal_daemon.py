@@ -0,0 +1,89 @@
+# test_signal_daemon.py
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import joblib
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+
+from src.data_fetcher import DataFetcher
+from src.fake_deriv import FIXED_NOW as NOW, FakeDerivServer
+from src.lite_model import export_lite, score_windows
+from src.ml_logic import FEATURE_COLS, build_model
+from src.signal_daemon import SignalDaemon
+from src.synthetic import candle_rows, synthetic_candles
+
+SYMBOLS = ["R_10", "R_25"]
+
+
+def test_daemon_publishes_signals_on_bar_close(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # models/model_v1.npz relatif, comme en production
+    (tmp_path / "models").mkdir()
+    scaler = MinMaxScaler().fit(np.random.default_rng(0).random((100, 6)) * 1000)
+    export_lite(build_model((10, 6)), scaler, "models/model_v1.npz", FEATURE_COLS)
+    # Modèle propre à R_25 entraîné avec look_back=20
+    os.makedirs("models/R_25_60")
+    model = build_model((20, 6))
+    model.save("models/R_25_60/model.h5")
+    joblib.dump(scaler, "models/R_25_60/scaler.pkl")
+    export_lite(model, scaler, "models/R_25_60/model.npz", FEATURE_COLS)
+
+    fetcher = DataFetcher(db_path=str(tmp_path / "candles.db"))
+    for symbol in SYMBOLS:
+        fetcher.save_to_db(list(candle_rows(symbol, 60, synthetic_candles(symbol, 600, start_epoch=NOW - 600 * 60))))
+
+    with FakeDerivServer(now=NOW, tick_interval=0.002) as server:
+        fetcher.ws_url = server.url  # rattrapage de la première bougie
+        daemon = SignalDaemon(SYMBOLS, [60], fetcher=fetcher, url=server.url, workers=2,
+                              batch_delay=0.05, backfill_days=0)
+        assert all(engine.ready for engine in (daemon.start().engines.values()))
+        assert daemon.engines[("R_10", 60)].window == 10 and daemon.engines[("R_25", 60)].window == 20
+        deadline = time.time() + 60
+        while daemon.published < 6 and time.time() < deadline:
+            time.sleep(0.1)
+        daemon.stop()
+
+    latest = daemon.store.latest(60)
+    assert [s['symbol'] for s in latest] == SYMBOLS
+    assert all(s['epoch'] > NOW and s['epoch'] % 60 == 0 and s['signal'] in (0, 1, 2) for s in latest)
+    assert daemon.queue.qsize() == daemon.published >= 6
+    # Les bougies construites à partir des ticks sont en base, sans trou à la jonction avec l'historique
+    epochs = fetcher.candles_since("R_10", 60, None)['epoch']
+    assert len(epochs) > 600 and np.all(np.diff(epochs) == 60)
+
+
+def test_score_windows_batches_lite_models(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "models").mkdir()
+    rng = np.random.default_rng(1)
+    export_lite(build_model((10, 6)), MinMaxScaler().fit(rng.random((50, 6))), "models/model_v1.npz", FEATURE_COLS)
+
+    windows = {("R_10", 60): rng.random((10, 6)), ("R_25", 60): rng.random((10, 6)),
+               ("R_50", 60): np.full((10, 6), np.nan), ("R_75", 60): rng.random((5, 6))}
+    results = score_windows(windows)
+    assert results[("R_50", 60)] == (None, 0.0) and results[("R_75", 60)] == (None, 0.0)
+    assert all(results[k][0] in (0, 1, 2) and 0 < results[k][1] <= 1 for k in [("R_10", 60), ("R_25", 60)])
+
+
+def test_orders_do_not_block_publishing(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def slow_submit(symbol, action, amount=1, duration=1):
+        future = Future()
+        threading.Thread(target=lambda: release.wait(5) and future.set_result({"status": "success"})).start()
+        return future
+
+    monkeypatch.setattr("src.executor.submit_trade", slow_submit)
+    daemon = SignalDaemon(["R_10", "R_25"], [60], fetcher=DataFetcher(db_path=str(tmp_path / "candles.db")),
+                          trade=True, min_confidence=0.5)
+    t0 = time.perf_counter()
+    signals = daemon.publish([("R_10", 60, NOW, 1, 0.9), ("R_25", 60, NOW, 2, 0.8), ("R_50", 60, NOW, 1, 0.1)])
+    assert len(signals) == 3 and time.perf_counter() - t0 < 1
+    assert daemon.orders == [] and daemon.status()['orders_pending'] == 2
+
+    release.set()
+    daemon.stop()
+    assert sorted(o['symbol'] for o in daemon.orders) == ["R_10", "R_25"]
+    assert all(o['status'] == "success" and o['epoch'] == NOW for o in daemon.orders)
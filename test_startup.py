@@ -0,0 +1,47 @@
+# test_startup.py
+import os
+import subprocess
+import sys
+import types
+
+from src.startup import StartupProfile, parse_importtime
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_profile_records_only_new_imports():
+    profile = StartupProfile()
+    with profile.measure("déjà chargé"):
+        import os  # noqa: F401
+    with profile.measure("nouveau"):
+        sys.modules["_startup_test_module"] = types.ModuleType("_startup_test_module")
+    del sys.modules["_startup_test_module"]
+
+    assert [r['label'] for r in profile.report()] == ["nouveau"]
+    assert profile.mark_ready() and not profile.mark_ready()
+    assert "premier rendu" in profile.as_text()
+
+
+def test_parse_importtime():
+    stderr = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        120 |   talib._ta_lib\n"
+              "import time:        80 |        200 | talib\n"
+              "noise\n")
+    assert parse_importtime(stderr) == [("talib._ta_lib", 120, 120), ("talib", 80, 200)]
+
+
+def test_main_starts_without_heavy_imports(tmp_path):
+    # Premier rendu de l'application dans un processus neuf : ni TensorFlow, ni sklearn, ni TA-Lib
+    (tmp_path / "database").mkdir()
+    code = (
+        "import sys\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        f"at = AppTest.from_file({os.path.join(ROOT, 'main.py')!r}, default_timeout=120)\n"
+        "at.run()\n"
+        "assert not at.exception, [e.value for e in at.exception]\n"
+        "print(sorted(m for m in ('tensorflow', 'sklearn', 'talib') if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=tmp_path,
+                         env={**os.environ, "PYTHONPATH": ROOT})
+    assert out.returncode == 0, out.stderr[-2000:]
+    assert out.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,49 @@
+# test_synthetic.py
+import numpy as np
+
+from benchmarks.suite import compare
+from src.aggregator import CandleAggregator
+from src.synthetic import candle_rows, candles_from_ticks, synthetic_candles, synthetic_ticks
+
+
+def test_candles_are_deterministic_and_consistent():
+    a = synthetic_candles("R_100", 200_000)
+    b = synthetic_candles("R_100", 200_000)
+    assert all(np.array_equal(a[k], b[k]) for k in a)
+    assert not np.array_equal(a['close'], synthetic_candles("R_50", 200_000)['close'])
+
+    assert np.all(np.diff(a['epoch']) == 60)
+    assert np.all(a['high'] >= np.maximum(a['open'], a['close']))
+    assert np.all(a['low'] <= np.minimum(a['open'], a['close']))
+    rows = list(candle_rows("R_100", 60, a, chunk_rows=7000))
+    assert len(rows) == 200_000 and rows[-1][2] == a['epoch'][-1]
+
+
+def test_ticks_to_candles_match_aggregator():
+    epochs, quotes = synthetic_ticks("1HZ100V", 3600)
+    bars = candles_from_ticks(epochs, quotes, 300)
+
+    closed = []
+    aggregator = CandleAggregator(timeframes=[300])
+    aggregator.on_close.append(lambda symbol, tf, bar: closed.append(bar))
+    for epoch, quote in zip(epochs.tolist(), quotes.tolist()):
+        aggregator.on_tick("1HZ100V", epoch, quote)
+    expected = np.array(closed)
+    np.testing.assert_array_equal(np.column_stack([bars[k] for k in ('epoch', 'open', 'high', 'low', 'close')])[:-1],
+                                  expected)
+
+
+def test_compare_flags_regressions():
+    old = {'results': {'storage': {'save_to_db_s': 1.0, 'load_data_day_p50_ms': 2.0, 'rows': 10},
+                       'fetch': {'candles_per_s': 1000.0}}}
+    new = {'results': {'storage': {'save_to_db_s': 1.5, 'load_data_day_p50_ms': 1.0, 'rows': 10},
+                       'fetch': {'candles_per_s': 950.0}}}
+    rows = {(bench, key): (change, regression) for bench, key, _, _, change, regression in compare(new, old)}
+    assert rows[('storage', 'save_to_db_s')][1] is True
+    assert rows[('storage', 'load_data_day_p50_ms')] == (1.0, False)
+    assert rows[('fetch', 'candles_per_s')][1] is False
+    assert ('storage', 'rows') not in rows
+
+    # Charge différente (taille des données) : pas de comparaison
+    new['results']['storage']['rows'] = 20
+    assert all(bench != 'storage' for bench, *_ in compare(new, old))
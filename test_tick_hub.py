@@ -0,0 +1,47 @@
+# test_tick_hub.py
+import time
+
+import numpy as np
+
+from src.fake_deriv import FakeDerivServer
+from src.tick_hub import TickBuffer, TickHub
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_ring_buffer_snapshot():
+    buf = TickBuffer(capacity=5)
+    for i in range(8):
+        buf.append(i, float(i), 0.0)
+    epochs, quotes = buf.snapshot()
+    assert epochs.tolist() == [3, 4, 5, 6, 7]
+    assert buf.snapshot(2)[1].tolist() == [6.0, 7.0]
+    assert buf.last()[:2] == (7, 7.0)
+
+
+def test_one_connection_many_symbols_and_latency():
+    symbols = ["R_10", "R_25", "1HZ100V"]
+    latencies = []
+
+    def on_tick(symbol, epoch, quote, tick):
+        # "Signal" minimal : le tick est pris en compte par le consommateur
+        latencies.append(time.perf_counter() - tick['ts'])
+
+    with FakeDerivServer(tick_interval=0.01) as server:
+        hub = TickHub(url=server.url, capacity=100)
+        hub.add_listener(on_tick)
+        hub.subscribe(symbols[:2]).start()
+        assert wait_until(lambda: all(hub.buffer(s).count >= 5 for s in symbols[:2]))
+
+        hub.subscribe(symbols[2])  # abonnement à chaud, même connexion
+        assert wait_until(lambda: all(hub.buffer(s).count >= 20 for s in symbols))
+        hub.stop()
+
+    assert server.connections == 1 and hub.connections == 1
+    assert hub.error is None
+    assert np.percentile(latencies, 99) < 0.25
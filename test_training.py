@@ -0,0 +1,46 @@
+# test_training.py
+import json
+import os
+
+import numpy as np
+
+from src.data_fetcher import DataFetcher
+from src.training import param_grid, train_many, walk_forward_splits, worker_threads
+
+
+def test_walk_forward_splits():
+    splits = walk_forward_splits(100, n_splits=3)
+    assert splits == [(24, 25, 50), (49, 50, 75), (74, 75, 100)]
+    # Jamais de chevauchement train / test
+    assert all(train_end < test_start < test_end for train_end, test_start, test_end in splits)
+    assert walk_forward_splits(2, n_splits=3) == []
+
+
+def test_param_grid_and_threads():
+    grid = param_grid({'look_back': [5, 10], 'epochs': [1], 'batch_size': [32, 64], 'units': [(8, 4)]})
+    assert len(grid) == 4 and {g['look_back'] for g in grid} == {5, 10}
+    assert worker_threads(workers=4, cpus=8) == 2
+    assert worker_threads(workers=16, cpus=8) == 1
+
+
+def test_train_many_writes_keyed_artifacts(tmp_path):
+    db_path = str(tmp_path / "candles.db")
+    fetcher = DataFetcher(db_path=db_path)
+    rng = np.random.default_rng(0)
+    for symbol in ("R_10", "R_25"):
+        close = 100 + np.cumsum(rng.normal(0, 3, 400))
+        fetcher.save_to_db([(symbol, 60, i * 60, c, c + 1, c - 1, c) for i, c in enumerate(close)])
+
+    done = []
+    grid = {'look_back': [5, 10], 'epochs': [1], 'batch_size': [64], 'units': [(8, 4)]}
+    results = train_many([("R_10", 60), ("R_25", 60)], grid, db_path=db_path, n_splits=2,
+                         workers=2, on_result=done.append, out_root=str(tmp_path / "models"))
+
+    assert len(results) == len(done) == 2
+    for metrics in results:
+        assert 'error' not in metrics, metrics
+        directory = tmp_path / "models" / f"{metrics['symbol']}_60"
+        assert all((directory / name).exists() for name in ("model.h5", "scaler.pkl", "model.npz"))
+        saved = json.loads((directory / "metrics.json").read_text())
+        assert saved['best_params']['look_back'] in (5, 10)
+        assert len(saved['grid']) == 2 and len(saved['grid'][0]['folds']) == 2